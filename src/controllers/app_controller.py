@@ -1,3 +1,9 @@
+import asyncio
+
+from src.models.importer import ImportProgress
+from src.models.pivot import PivotCache, PivotPrefetcher
+
+
 class AppController:
     def __init__(self, **kwargs):
 
@@ -19,6 +25,14 @@ class AppController:
         self.importer = kwargs.get('importer')
         self.state_manager = kwargs.get('state_manager')
 
+        # Кэш построенных таблиц журнала, сбрасывается изменениями в базе
+        self.pivot_cache = kwargs.get('pivot_cache')
+        if self.pivot_cache is None:
+            self.pivot_cache = PivotCache(self.db)
+        self.prefetcher = PivotPrefetcher(self.pivot_cache)
+        # Ход выполняющегося импорта; одновременно идёт не больше одного
+        self._import_progress = None
+
         # UI функции
         self.show_info = kwargs.get('show_info', self._default_show_info)
         self.show_error = kwargs.get('show_error', self._default_show_error)
@@ -289,72 +303,57 @@ class AppController:
                 "2": "#FF8477",
             }
 
-            temp_journal = self.db.select_where(
-                "Journal",
-                ["date", "group", "surname", "name", "patronymic", "lesson", "missed_hours"],
-                {
-                    "date": f"{self.view.year.get()}-{self.view.month.get()}",
-                    "group": self.view.groups.get(),
-                    "lesson": self.view.lessons.get()
-                },
-                ["surname", "name", "patronymic", "date"]
-            )
+            pivot = self.pivot_cache.load(PivotCache.key(
+                self.view.year.get(), self.view.month.get(), self.view.groups.get(), self.view.lessons.get()
+            ))
 
-            if not temp_journal:
+            if not pivot:
                 if hasattr(self.view, 'root'):
                     # Показываем ошибку только если UI готов
                     self.show_error("Нет данных", "Нет данных для отображения")
                 return
 
-            days = []
-            students = []
-            spreadsheet_set_values = []
-            temp_student = 0
-
-            for i in temp_journal:
-                day = i[0].split("-")[-1]
-                student = f"{i[2]} {i[3]} {i[4]}"
-                if student != temp_student:
-                    temp_student = student
-                    spreadsheet_set_values.append([])
-                spreadsheet_set_values[-1].append(i[6])
-                if day not in days:
-                    days.append(day)
-                if student not in students:
-                    students.append(student)
-
-            spreadsheet_width = len(days)
-            spreadsheet_height = len(students)
-            spreadsheet_cells_values = tuple(
-                tuple(
-                    ("-", 0, 1, 2)
-                    for _ in range(spreadsheet_width)
-                )
-                for _ in range(spreadsheet_height)
-            )
-
             # Создаем таблицу
             if hasattr(self.view, 'spreadsheet'):
                 self.view.spreadsheet.create(
-                    columns=spreadsheet_width,
-                    rows=spreadsheet_height,
-                    columns_headers=days,
-                    rows_headers=students,
-                    set_values=spreadsheet_set_values,
-                    cells_values=spreadsheet_cells_values,
-                    cells_colors=colors
+                    columns=pivot.width,
+                    rows=pivot.height,
+                    columns_headers=pivot.columns_headers,
+                    rows_headers=pivot.rows_headers,
+                    set_values=pivot.set_values(),
+                    cells_values=pivot.cells_values(),
+                    cells_colors=colors,
+                    rows_ids=pivot.rows_ids,
+                    columns_ids=pivot.columns_ids,
+                    info={"id_lesson": pivot.id_lesson}
                 )
 
                 if self.logger:
-                    self.logger.info(f"Spreadsheet created with {len(students)} students and {len(days)} days")
+                    self.logger.info(f"Spreadsheet created with {pivot.height} students and {pivot.width} days")
 
-            temp_journal.clear()
+            if hasattr(self.view, 'lessons'):
+                self.prefetch_neighbours(self.view.year.get(), self.view.month.get(), self.view.groups.get(),
+                                         self.view.lessons.get(), self.view.lessons["values"])
 
         except Exception as e:
             if self.logger:
                 self.logger.error(f"Error creating spreadsheet: {e}")
             self.show_error("Ошибка", f"Не удалось создать таблицу: {str(e)}")
 
+    def prefetch_neighbours(self, year, month, group, lesson, lessons=()):
+        """Подгрузить в фоне соседние месяцы и другие предметы группы"""
+        keys = []
+        for shift in (1, -1):
+            neighbour_year, neighbour_month = divmod(int(year) * 12 + int(month) - 1 + shift, 12)
+            keys.append(PivotCache.key(neighbour_year, f"{neighbour_month + 1:02d}", group, lesson))
+        keys += [PivotCache.key(year, month, group, other) for other in lessons if other and other != lesson]
+        # Подгрузка не должна вытеснять из кэша недавно открытые таблицы
+        self.prefetcher.prefetch(keys[:self.pivot_cache.maxsize // 2])
+
+    def cancel_prefetch(self):
+        """Отменить фоновую подгрузку (выбор изменился)"""
+        self.prefetcher.cancel()
+
     def _generate_all_events(self):
         """Сгенерировать события для всех комбобоксов"""
         try:
@@ -428,6 +427,22 @@ class AppController:
             if self.logger:
                 self.logger.error(f"JSON export failed: {message}")
 
+    def export_ndjson(self):
+        """Экспорт всех данных в NDJSON"""
+        if not self.exporter:
+            self.show_error("Error", "Экспортер не доступен")
+            return
+
+        success, message = self.exporter.export_full_backup_to_ndjson()
+        if success:
+            self.show_info("Export", message)
+            if self.logger:
+                self.logger.info(f"NDJSON export successful: {message}")
+        else:
+            self.show_error("Error", message)
+            if self.logger:
+                self.logger.error(f"NDJSON export failed: {message}")
+
     def export_xml_groups(self):
         """Экспорт групп в XML"""
         if not self.exporter:
@@ -511,33 +526,71 @@ class AppController:
 
     # --- ИМПОРТ МЕТОДЫ ---
 
+    @property
+    def import_running(self) -> bool:
+        """Идёт ли фоновый импорт (он держит блокировку записи до конца своей транзакции)"""
+        return self._import_progress is not None and not self._import_progress.finished
+
+    def cancel_import(self):
+        """Отменить выполняющийся импорт; его транзакция откатывается"""
+        if self.import_running:
+            self._import_progress.cancel()
+
     def auto_detect_and_import(self, filename: str):
-        """Автоматическое определение формата и импорт"""
+        """Автоматическое определение формата и импорт.
+
+        Файл проверяется без разбора и разбирается один раз. При наличии интерфейса
+        импорт идёт в фоновом потоке, ход показывается в окне с кнопкой отмены.
+        Пока импорт не завершён, второй не начинается.
+        Возвращает ImportProgress или None, если импорт не начат.
+        """
         if not self.importer:
             self.show_error("Error", "Импортер не доступен")
-            return
+            return None
+
+        if self.import_running:
+            self.show_error("Import Error", "Импорт уже выполняется, дождитесь его завершения")
+            return None
 
         if self.logger:
             self.logger.info(f"Starting auto-detect import for file: {filename}")
 
-        success, message = self.importer.auto_detect_and_import(filename)
+        format_type, file_size = self.importer.inspect_file(filename)
+        if format_type is None:
+            self._finish_import((False, file_size))
+            return None
 
         # Обработка большого файла
-        if success and message == "large_file":
-            # В этом случае второй элемент кортежа - размер файла
-            file_size = self.importer.auto_detect_and_import(filename)[1]
+        if self.importer.needs_confirmation(format_type, file_size):
             confirm = self.ask_confirmation(
                 "Large File",
                 f"Файл очень большой ({file_size / 1024 / 1024:.1f} MB). Продолжить импорт?"
             )
-            if confirm:
-                # Повторяем импорт с подтверждением
-                success, message = self.importer.auto_detect_and_import(filename)
-            else:
+            if not confirm:
                 if self.logger:
                     self.logger.info("Import cancelled by user (large file)")
-                return
+                return None
+
+        progress = ImportProgress(file_size)
+        self._import_progress = progress
+        bridge = getattr(self.view, 'db_async', None)
+        if bridge is None or not hasattr(self.view, 'show_import_progress'):
+            # Без интерфейса импортируем сразу
+            self._finish_import(self.importer.import_file(filename, format_type, progress))
+            return progress
+
+        self.view.show_import_progress(progress)
+        bridge.run(
+            asyncio.to_thread(self.importer.import_file, filename, format_type, progress),
+            callback=self._finish_import,
+            errback=lambda e: self._finish_import((False, f"Ошибка импорта: {str(e)}"))
+        )
+        return progress
 
+    def _finish_import(self, result):
+        """Показать результат импорта (в потоке интерфейса)"""
+        self._import_progress = None
+        success, message = result
         if success:
             self.show_info("Импорт завершен", message)
             if self.logger:
@@ -597,6 +650,7 @@ class AppController:
 
     def close_program(self):
         """Закрыть программу"""
+        self.prefetcher.close()
         self.db.close()
         if self.root:
             self.root.destroy()
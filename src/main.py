@@ -1,12 +1,14 @@
+import argparse
 import os
 from tkinter import messagebox
 
-from src.models.database import DatabaseWork
+from src.models.database import DatabaseWork, DatabaseProfiles
 from src.views.main_window import MainWindow
 from src.controllers.app_controller import AppController
 from src.utils.i18n import I18n
 from src.utils.serializer import Serializer
 from src.utils.xml_serializer import XMLSerializer
+from src.utils.ndjson_serializer import NDJSONSerializer
 from src.utils.validators import Validator
 from src.utils.logger import setup_logger
 from src.models.exporter import DataExporter
@@ -14,7 +16,22 @@ from src.models.importer import DataImporter
 from src.utils.state_manager import StateManager
 
 
+def parse_args(argv=None):
+    """Аргументы командной строки"""
+    parser = argparse.ArgumentParser(description="AttendanceTracker")
+    parser.add_argument("--db-profile", choices=list(DatabaseProfiles.All),
+                        help="профиль производительности SQLite (по умолчанию из app_state.json "
+                             f"или {DatabaseProfiles.Default})")
+    parser.add_argument("--sparse", action=argparse.BooleanOptionalAction, default=None,
+                        help="разреженный журнал: хранить только проставленные отметки "
+                             "(по умолчанию из app_state.json или выключен)")
+    args, _ = parser.parse_known_args(argv)
+    return args
+
+
 def main():
+    args = parse_args()
+
     # Инициализация менеджера состояния ПЕРВЫМ ДЕЛОМ
     state_manager = StateManager()
 
@@ -47,17 +64,28 @@ def main():
         os.makedirs(os.path.dirname(db_path))
         logger.info(f"Created data directory: {os.path.dirname(db_path)}")
 
+    # Профиль БД: командная строка -> сохранённое состояние -> по умолчанию
+    db_profile = args.db_profile
+    if not db_profile and saved_state and saved_state.get("db_profile") in DatabaseProfiles.All:
+        db_profile = saved_state["db_profile"]
+
+    # Разреженный журнал: командная строка -> сохранённое состояние -> выключен
+    sparse = args.sparse
+    if sparse is None and saved_state and isinstance(saved_state.get("sparse_journal"), bool):
+        sparse = saved_state["sparse_journal"]
+
     # Создание экземпляров зависимостей
-    db = DatabaseWork(db_path)
+    db = DatabaseWork(db_path, sparse=bool(sparse), profile=db_profile or DatabaseProfiles.Default)
     db.create()
     logger.info(f"Database initialized at: {db_path}")
 
     serializer = Serializer()
     xml_serializer = XMLSerializer()
+    ndjson_serializer = NDJSONSerializer()
     validator = Validator()
 
-    exporter = DataExporter(db, serializer, xml_serializer, os)
-    importer = DataImporter(db, serializer, xml_serializer, os)
+    exporter = DataExporter(db, serializer, xml_serializer, os, ndjson_serializer)
+    importer = DataImporter(db, serializer, xml_serializer, os, ndjson_serializer)
 
     # Создание контроллера с ВСЕМИ зависимостями через kwargs
     controller = AppController(
@@ -110,6 +138,14 @@ def main():
         except Exception as e:
             logger.error(f"Error saving state on shutdown: {e}")
 
+        # Незавершённый импорт откатывается; db.close() дождётся конца его транзакции
+        controller.cancel_import()
+        # Дописываем отложенные изменения ячеек и останавливаем фоновые потоки
+        unwritten = app.write_behind.close()
+        if unwritten:
+            logger.error(f"Write-behind: {len(unwritten)} cells not saved on shutdown: {unwritten}")
+        controller.prefetcher.close()
+        app.db_async.close()
         db.close()
         logger.info("Application shutdown")
 
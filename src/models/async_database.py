@@ -0,0 +1,41 @@
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+
+
+class AsyncDatabase:
+    """Асинхронный фасад над DatabaseWork.
+
+    Методы запросов и изменений доступны как корутины и выполняются в пуле потоков:
+    чтение идёт через пул читающих соединений, запись - под блокировкой пишущего.
+
+        groups = await async_db.having_individual_return("Groups", ["group"])
+    """
+
+    QUERIES = ("having", "having_many", "having_individual_return", "select_where", "date_parts")
+    MUTATIONS = (
+        "insert_date", "insert_dates", "insert_group", "insert_student", "insert_students", "insert_lesson",
+        "insert_journal", "upsert_journal", "upsert_journal_cells", "set_missed_hours",
+        "update_date", "update_group", "update_student", "update_lesson", "update_journal",
+        "delete_date", "delete_group", "delete_student", "delete_lesson", "delete_journal",
+    )
+
+    def __init__(self, db, max_workers: int = 4):
+        self.db = db
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="db")
+
+    def submit(self, method: str, *args, **kwargs) -> Future:
+        """Запустить метод DatabaseWork в пуле потоков без asyncio"""
+        return self._executor.submit(getattr(self.db, method), *args, **kwargs)
+
+    async def call(self, method: str, *args, **kwargs):
+        """Выполнить метод DatabaseWork в пуле потоков и дождаться результата"""
+        return await asyncio.wrap_future(self.submit(method, *args, **kwargs))
+
+    def __getattr__(self, name: str):
+        if name in self.QUERIES or name in self.MUTATIONS:
+            return partial(self.call, name)
+        raise AttributeError(f"{type(self).__name__} has no attribute {name}")
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
@@ -0,0 +1,71 @@
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Callable
+
+from src.utils.logger import setup_logger
+
+logger = setup_logger()
+
+
+class ReaderPool:
+    """Пул соединений только для чтения.
+
+    Соединения создаются по мере необходимости (не больше size) и выдаются
+    потоку в монопольное пользование, поэтому check_same_thread отключён
+    безопасно: одно соединение никогда не используется двумя потоками сразу.
+    """
+
+    def __init__(self, db_file: str, size: int = 4,
+                 setup: Callable[[sqlite3.Connection], None] = None):
+        self.db_file = db_file
+        self.size = size
+        self._setup = setup
+        self._idle = queue.LifoQueue()
+        self._all = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.db_file, cached_statements=256, check_same_thread=False)
+        # Запись через читающее соединение запрещена
+        connection.execute("PRAGMA query_only = ON;")
+        if self._setup:
+            self._setup(connection)
+        return connection
+
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._closed:
+                raise sqlite3.ProgrammingError("Reader pool is closed")
+            if len(self._all) < self.size:
+                connection = self._connect()
+                self._all.append(connection)
+                logger.debug(f"Reader connection {len(self._all)}/{self.size} opened")
+                return connection
+        # Все соединения заняты - ждём освобождения
+        return self._idle.get()
+
+    @contextmanager
+    def connection(self):
+        """Взять соединение из пула на время блока"""
+        connection = self._acquire()
+        try:
+            yield connection
+        finally:
+            if connection.in_transaction:
+                connection.rollback()
+            self._idle.put(connection)
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            for connection in self._all:
+                connection.close()
+            self._all.clear()
+            self._idle = queue.LifoQueue()
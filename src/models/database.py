@@ -1,7 +1,13 @@
 import sqlite3
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from functools import lru_cache, wraps
+import threading
+import datetime
 from random import randint
+from typing import Any, Callable, Iterable, Iterator
 
+from src.models.connections import ReaderPool
 from src.utils.logger import setup_logger
 
 logger = setup_logger()
@@ -12,7 +18,160 @@ class DatabaseTables:
     Students = "Students"
     Lessons = "Lessons"
     Journal = "Journal"
-    All = (Dates, Groups, Students, Lessons, Journal)
+    JournalView = "JournalView"
+    JournalGrid = "JournalGrid"
+    All = (Journal, Dates, Groups, Students, Lessons)
+    Views = (JournalView, JournalGrid)
+
+
+class Between:
+    """Условие диапазона для having/select_where: low <= column <= high"""
+
+    __slots__ = ("low", "high")
+
+    def __init__(self, low: Any, high: Any):
+        self.low = low
+        self.high = high
+
+    def __repr__(self):
+        return f"Between({self.low!r}, {self.high!r})"
+
+
+class DatabaseIndexes:
+    # (имя, таблица, колонки)
+    # Выборка таблицы (ученики группы -> предмет -> даты) идёт по ключу UNIQUE("id_person", "id_lesson", "id_date")
+    # Каскадное удаление даты и предмета
+    JournalDate = ("idx_journal_date", "Journal", ("id_date",))
+    JournalLesson = ("idx_journal_lesson", "Journal", ("id_lesson",))
+    # Поиск студента по полному кортежу (update_student / delete_student)
+    StudentsTuple = ("idx_students_group_fio", "Students", ("group", "surname", "name", "patronymic"))
+    DatesDate = ("idx_dates_date", "Dates", ("date",))
+    GroupsGroup = ("idx_groups_group", "Groups", ("group",))
+    LessonsLesson = ("idx_lessons_lesson", "Lessons", ("lesson",))
+    All = (JournalDate, JournalLesson, StudentsTuple, DatesDate, GroupsGroup, LessonsLesson)
+
+
+class DatabaseProfiles:
+    # PRAGMA, применяемые при подключении (порядок важен: journal_mode до synchronous)
+    # Классический журнал отката и полный fsync на каждый commit
+    Safe = {
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+        "cache_size": -2000,
+        "temp_store": "DEFAULT",
+        "busy_timeout": 5000,
+    }
+    # WAL: чтение не блокирует запись, fsync только при checkpoint
+    Balanced = {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -16000,
+        "mmap_size": 64 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    }
+    # Без fsync: последние транзакции могут потеряться при сбое питания
+    Fast = {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "cache_size": -64000,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 10000,
+    }
+    All = {"safe": Safe, "balanced": Balanced, "fast": Fast}
+    Default = "balanced"
+
+# Значение ячейки, для которой отметка не ставилась
+DEFAULT_MISSED_HOURS = "-"
+
+# Режим журнала, в котором база открывалась последней (PRAGMA user_version; 0 - неизвестен)
+JOURNAL_DENSE = 1
+JOURNAL_SPARSE = 2
+
+# Сколько параметров передаётся в один запрос having_many (предел SQLite по умолчанию - 32766)
+HAVING_MANY_VARIABLES = 900
+
+# Части даты для date_parts: формат strftime
+DATE_PARTS = {"year": "%Y", "month": "%m", "day": "%d"}
+
+# Журнал хранит только целочисленные ссылки на справочники
+JOURNAL_TABLE = """
+CREATE TABLE "{table}" (
+    "id"           INTEGER NOT NULL,
+    "id_date"      INTEGER NOT NULL REFERENCES "Dates"("id_date") ON DELETE CASCADE,
+    "id_person"    INTEGER NOT NULL REFERENCES "Students"("id_person") ON DELETE CASCADE,
+    "id_lesson"    INTEGER NOT NULL REFERENCES "Lessons"("id_lesson") ON DELETE CASCADE,
+    "missed_hours" INTEGER,
+
+    PRIMARY KEY("id" AUTOINCREMENT),
+    UNIQUE("id_person", "id_lesson", "id_date")
+);
+"""
+
+# Недостающие ячейки журнала (студент x дата x предмет); фильтр по студентам дописывается через AND
+MISSING_JOURNAL_ENTRIES = """
+INSERT INTO "Journal" ("id_date", "id_person", "id_lesson", "missed_hours")
+SELECT d."id_date", s."id_person", l."id_lesson", '-'
+FROM "Students" AS s
+CROSS JOIN "Dates" AS d
+CROSS JOIN "Lessons" AS l
+WHERE NOT EXISTS (SELECT 1 FROM "Journal" AS j
+                  WHERE j."id_person" = s."id_person" AND
+                        j."id_lesson" = l."id_lesson" AND
+                        j."id_date" = d."id_date")
+"""
+
+# Запись журнала: (date, group, surname, name, patronymic, lesson, missed_hours)
+JOURNAL_RECORD = """
+INSERT {conflict}INTO "Journal" ("id_date", "id_person", "id_lesson", "missed_hours")
+SELECT "Dates"."id_date", "Students"."id_person", "Lessons"."id_lesson", ?7
+FROM "Dates", "Students", "Lessons"
+WHERE "Dates"."date" = ?1 AND
+      "Students"."group" = ?2 AND
+      "Students"."surname" = ?3 AND
+      "Students"."name" = ?4 AND
+      "Students"."patronymic" = ?5 AND
+      "Lessons"."lesson" = ?6
+"""
+
+JOURNAL_UPSERT = JOURNAL_RECORD.format(conflict="") + """\
+ON CONFLICT ("id_person", "id_lesson", "id_date")
+DO UPDATE SET "missed_hours" = "excluded"."missed_hours"
+"""
+
+# Ячейка журнала по идентификаторам: (id_date, id_person, id_lesson, missed_hours)
+JOURNAL_CELL_UPSERT = """
+INSERT INTO "Journal" ("id_date", "id_person", "id_lesson", "missed_hours") VALUES (?, ?, ?, ?)
+ON CONFLICT ("id_person", "id_lesson", "id_date")
+DO UPDATE SET "missed_hours" = "excluded"."missed_hours"
+"""
+
+JOURNAL_CELL_DELETE = """
+DELETE FROM "Journal" WHERE "id_person" = ?2 AND "id_lesson" = ?3 AND "id_date" = ?1
+"""
+
+# Ключ журнала: (date, group, surname, name, patronymic, lesson)
+JOURNAL_KEY_DELETE = """
+DELETE FROM "Journal"
+WHERE "id_date" IN (SELECT "id_date" FROM "Dates" WHERE "date" = ?) AND
+      "id_person" IN (SELECT "id_person" FROM "Students"
+                      WHERE "group" = ? AND
+                            "surname" = ? AND
+                            "name" = ? AND
+                            "patronymic" = ?) AND
+      "id_lesson" IN (SELECT "id_lesson" FROM "Lessons" WHERE "lesson" = ?)
+"""
+
+
+def _writer(method):
+    """Выполнять метод под блокировкой пишущего соединения"""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._write_lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
 
 class IDatabase(ABC):
     @abstractmethod
@@ -23,11 +182,110 @@ class IDatabase(ABC):
 
 
 class DatabaseWork(IDatabase):
-    def __init__(self, db_file: str):
+    def __init__(self, db_file: str, sparse: bool = False, profile: str = DatabaseProfiles.Default,
+                 readers: int = 4):
+        if profile not in DatabaseProfiles.All:
+            raise ValueError(f'Unknown database profile {profile}')
         self.db_file = db_file
-        self._db = sqlite3.connect(db_file)
+        # В разреженном режиме в журнал пишутся только проставленные отметки
+        self.sparse = sparse
+        self.profile = profile
+        # Единственное пишущее соединение; доступ из разных потоков сериализуется _write_lock
+        self._db = sqlite3.connect(db_file, cached_statements=256, check_same_thread=False)
+        self._write_lock = threading.RLock()
+        self._db.execute("PRAGMA foreign_keys = ON;")
+        self._apply_profile(self._db, profile)
+        # Читающие соединения; база в памяти видна только своему соединению
+        self._readers = None
+        if readers and db_file != ":memory:" and not db_file.startswith("file::memory:"):
+            self._readers = ReaderPool(db_file, readers,
+                                       setup=lambda connection: self._apply_profile(connection, profile, True))
+        # Глубина вложенности transaction(): пока она больше нуля, commit() откладывается
+        self._transaction_depth = 0
+        # Подписчики на изменения данных и изменения, ещё не зафиксированные commit
+        self._listeners = []
+        self._changed_scopes = set()
+        self._changed_cells = {}
         logger.info(f"Connected to database: {db_file}")
 
+    @staticmethod
+    def _apply_profile(connection: sqlite3.Connection, profile: str, readonly: bool = False):
+        """Применить к соединению PRAGMA выбранного профиля"""
+        for pragma, value in DatabaseProfiles.All[profile].items():
+            if readonly and pragma in ("journal_mode", "synchronous"):
+                # Режим журнала задаёт пишущее соединение
+                continue
+            connection.execute(f"PRAGMA {pragma} = {value};")
+        if not readonly:
+            logger.info(f"Database profile: {profile} "
+                        f"(journal_mode={connection.execute('PRAGMA journal_mode;').fetchone()[0]})")
+
+    @contextmanager
+    def transaction(self):
+        """Единица работы: все изменения внутри блока фиксируются одним commit.
+
+        Промежуточные commit() методов DatabaseWork подавляются; при исключении
+        весь блок откатывается. Вложенные блоки входят во внешний.
+        Пока блок открыт, другие потоки не могут писать в базу.
+        """
+        with self._write_lock:
+            self._transaction_depth += 1
+            try:
+                yield self
+            except BaseException:
+                self._transaction_depth -= 1
+                if not self._transaction_depth:
+                    self._db.rollback()
+                    self._changed_scopes.clear()
+                    self._changed_cells.clear()
+                raise
+            self._transaction_depth -= 1
+            if not self._transaction_depth:
+                self._db.commit()
+                self._notify()
+
+    def _commit(self):
+        if not self._transaction_depth:
+            self._db.commit()
+            self._notify()
+
+    def _rollback(self):
+        # Внутри transaction() откат выполнит внешний блок
+        if not self._transaction_depth:
+            self._db.rollback()
+            self._changed_scopes.clear()
+            self._changed_cells.clear()
+
+    # --- УВЕДОМЛЕНИЯ ОБ ИЗМЕНЕНИЯХ ---
+
+    def add_listener(self, listener: Callable[[list[tuple], list[tuple]], None]):
+        """Подписаться на изменения данных (например, для сброса кэша).
+
+        После каждого commit вызывается listener(scopes, cells):
+        scopes - затронутые области (month "YYYY-MM", group, lesson), где None означает "любой";
+        cells - изменённые ячейки (id_date, id_person, id_lesson, missed_hours).
+        Вызов происходит в потоке, выполнившем запись.
+        """
+        self._listeners.append(listener)
+
+    def _changed(self, *scopes: tuple):
+        """Запомнить затронутые области (month, group, lesson) до commit"""
+        self._changed_scopes.update(scopes)
+
+    def _notify(self):
+        if not (self._changed_scopes or self._changed_cells):
+            return
+        scopes = list(self._changed_scopes)
+        cells = [(*key, value) for key, value in self._changed_cells.items()]
+        self._changed_scopes.clear()
+        self._changed_cells.clear()
+        for listener in self._listeners:
+            try:
+                listener(scopes, cells)
+            except Exception as e:
+                logger.error(f"Database change listener failed: {e}")
+
+    @_writer
     def create(self):
         try:
             self._db.execute("""
@@ -65,24 +323,195 @@ class DatabaseWork(IDatabase):
                 PRIMARY KEY("id_lesson" AUTOINCREMENT)
             );
             """)
-            self._db.execute("""
-            CREATE TABLE "Journal" (
-                "id"           INTEGER NOT NULL,
-                "date"         DATE,
-                "group"        varchar(255),
-                "surname"      varchar(255),
-                "name"         varchar(255),
-                "patronymic"   varchar(255),
-                "lesson"       varchar(255),
-                "missed_hours" INTEGER,
-
-                PRIMARY KEY("id" AUTOINCREMENT)
-            );
-            """)
-            self._db.commit()
+            self._db.execute(JOURNAL_TABLE.format(table="Journal"))
+            self._commit()
             print("db was created")
         except sqlite3.OperationalError:
             print("db already exists")
+        self._migrate_journal()
+        self._create_views()
+        self._create_indexes()
+        self._apply_journal_mode()
+
+    def _apply_journal_mode(self):
+        """Привести журнал к режиму подключения и запомнить режим в базе.
+
+        Разреженная база при открытии в плотном режиме получает недостающие ячейки,
+        иначе студенты без отметок пропали бы из таблицы.
+        """
+        stored = self._db.execute("PRAGMA user_version;").fetchone()[0]
+        if self.sparse:
+            self.compact_journal()
+        elif stored == JOURNAL_SPARSE:
+            self.fill_journal()
+        mode = JOURNAL_SPARSE if self.sparse else JOURNAL_DENSE
+        if stored != mode:
+            self._db.execute(f"PRAGMA user_version = {mode};")
+
+    def _create_views(self):
+        """Представления журнала в "плоском" виде (как до нормализации)"""
+        # Только сохранённые записи
+        self._db.execute("""
+        CREATE VIEW IF NOT EXISTS "JournalView" AS
+        SELECT "Journal"."id"           AS "id",
+               "Dates"."date"           AS "date",
+               "Students"."group"       AS "group",
+               "Students"."surname"     AS "surname",
+               "Students"."name"        AS "name",
+               "Students"."patronymic"  AS "patronymic",
+               "Lessons"."lesson"       AS "lesson",
+               "Journal"."missed_hours" AS "missed_hours",
+               "Journal"."id_date"      AS "id_date",
+               "Journal"."id_person"    AS "id_person",
+               "Journal"."id_lesson"    AS "id_lesson"
+        FROM "Journal"
+        JOIN "Dates"    ON "Dates"."id_date" = "Journal"."id_date"
+        JOIN "Students" ON "Students"."id_person" = "Journal"."id_person"
+        JOIN "Lessons"  ON "Lessons"."id_lesson" = "Journal"."id_lesson";
+        """)
+        # Все ячейки дата x студент x предмет; у отсутствующих записей missed_hours IS NULL
+        # (значение по умолчанию подставляется при чтении, чтобы не терять INTEGER affinity)
+        self._db.execute("""
+        CREATE VIEW IF NOT EXISTS "JournalGrid" AS
+        SELECT "Journal"."id"           AS "id",
+               "Dates"."date"           AS "date",
+               "Students"."group"       AS "group",
+               "Students"."surname"     AS "surname",
+               "Students"."name"        AS "name",
+               "Students"."patronymic"  AS "patronymic",
+               "Lessons"."lesson"       AS "lesson",
+               "Journal"."missed_hours" AS "missed_hours",
+               "Dates"."id_date"        AS "id_date",
+               "Students"."id_person"   AS "id_person",
+               "Lessons"."id_lesson"    AS "id_lesson"
+        FROM "Students"
+        CROSS JOIN "Lessons"
+        CROSS JOIN "Dates"
+        LEFT JOIN "Journal" ON "Journal"."id_person" = "Students"."id_person" AND
+                               "Journal"."id_lesson" = "Lessons"."id_lesson" AND
+                               "Journal"."id_date" = "Dates"."id_date";
+        """)
+        self._commit()
+
+    @_writer
+    def compact_journal(self) -> int:
+        """Удалить из журнала ячейки со значением по умолчанию"""
+        deleted = self._db.execute('DELETE FROM "Journal" WHERE "missed_hours" IS ?;',
+                                   (DEFAULT_MISSED_HOURS,)).rowcount
+        self._commit()
+        if deleted:
+            logger.info(f"Journal compacted: {deleted} default cells removed")
+        return deleted
+
+    @_writer
+    def fill_journal(self) -> int:
+        """Создать недостающие ячейки журнала со значением по умолчанию"""
+        created = self._db.execute(MISSING_JOURNAL_ENTRIES + ";").rowcount
+        self._commit()
+        if created:
+            logger.info(f"Journal filled: {created} default cells created")
+        return created
+
+    def _create_indexes(self):
+        """Создать недостающие индексы (и для новой, и для существующей базы)"""
+        for name, table, columns in DatabaseIndexes.All:
+            columns = ", ".join(f'"{i}"' for i in columns)
+            self._db.execute(f'CREATE INDEX IF NOT EXISTS "{name}" ON "{table}" ({columns});')
+        self._commit()
+
+    def _journal_columns(self) -> list[str]:
+        return [row[1] for row in self._db.execute('PRAGMA table_info("Journal");').fetchall()]
+
+    def _migrate_journal(self) -> bool:
+        """Перевести журнал со старой текстовой схемы на целочисленные ключи"""
+        if "surname" not in self._journal_columns():
+            return False
+
+        logger.info(f"Migrating Journal of {self.db_file} to the normalized schema")
+        self._db.commit()
+        self._db.execute("PRAGMA foreign_keys = OFF;")
+        try:
+            self._db.execute("BEGIN;")
+            # Справочники могут не содержать всех значений, встречающихся в журнале
+            self._db.execute("""
+            INSERT INTO "Groups" ("group")
+            SELECT DISTINCT "group" FROM (SELECT "group" FROM "Journal" UNION SELECT "group" FROM "Students")
+            WHERE "group" IS NOT NULL AND "group" NOT IN (SELECT "group" FROM "Groups" WHERE "group" IS NOT NULL);
+            """)
+            self._db.execute("""
+            INSERT INTO "Dates" ("date")
+            SELECT DISTINCT j."date" FROM "Journal" AS j
+            WHERE j."date" IS NOT NULL AND
+                  NOT EXISTS (SELECT 1 FROM "Dates" AS d WHERE d."date" IS j."date");
+            """)
+            self._db.execute("""
+            INSERT INTO "Lessons" ("lesson")
+            SELECT DISTINCT j."lesson" FROM "Journal" AS j
+            WHERE j."lesson" IS NOT NULL AND
+                  NOT EXISTS (SELECT 1 FROM "Lessons" AS l WHERE l."lesson" IS j."lesson");
+            """)
+            self._db.execute("""
+            INSERT INTO "Students" ("group", "surname", "name", "patronymic")
+            SELECT DISTINCT j."group", j."surname", j."name", j."patronymic" FROM "Journal" AS j
+            WHERE NOT EXISTS (SELECT 1 FROM "Students" AS s
+                              WHERE s."group" IS j."group" AND
+                                    s."surname" IS j."surname" AND
+                                    s."name" IS j."name" AND
+                                    s."patronymic" IS j."patronymic");
+            """)
+            self._db.execute(JOURNAL_TABLE.format(table="Journal_new"))
+            # Дубликаты в справочниках сводим к минимальному id, повторные ячейки отбрасываем
+            self._db.execute("""
+            INSERT OR IGNORE INTO "Journal_new" ("id", "id_date", "id_person", "id_lesson", "missed_hours")
+            SELECT j."id",
+                   (SELECT MIN(d."id_date") FROM "Dates" AS d WHERE d."date" IS j."date"),
+                   (SELECT MIN(s."id_person") FROM "Students" AS s
+                    WHERE s."group" IS j."group" AND
+                          s."surname" IS j."surname" AND
+                          s."name" IS j."name" AND
+                          s."patronymic" IS j."patronymic"),
+                   (SELECT MIN(l."id_lesson") FROM "Lessons" AS l WHERE l."lesson" IS j."lesson"),
+                   j."missed_hours"
+            FROM "Journal" AS j
+            ORDER BY j."id";
+            """)
+            migrated = self._db.execute('SELECT COUNT(*) FROM "Journal_new";').fetchone()[0]
+            # Строки с NULL в ключах и повторные ячейки не переносятся
+            dropped = self._db.execute('SELECT COUNT(*) FROM "Journal";').fetchone()[0] - migrated
+            for view in DatabaseTables.Views:
+                self._db.execute(f'DROP VIEW IF EXISTS "{view}";')
+            self._db.execute('DROP TABLE "Journal";')
+            self._db.execute('ALTER TABLE "Journal_new" RENAME TO "Journal";')
+            self._db.commit()
+        except sqlite3.Error:
+            self._db.rollback()
+            raise
+        finally:
+            self._db.execute("PRAGMA foreign_keys = ON;")
+
+        # Освобождаем место, занятое строковыми колонками
+        self._db.execute("VACUUM;")
+        logger.info(f"Journal migrated: {migrated} rows")
+        if dropped:
+            logger.warning(f"Journal migration dropped {dropped} rows with missing or duplicate keys")
+        return True
+
+    def _source(self, table: str) -> str:
+        """Источник для чтения: журнал читается через представление,
+        в разреженном режиме - через сетку всех ячеек"""
+        if table != DatabaseTables.Journal:
+            return table
+        return DatabaseTables.JournalGrid if self.sparse else DatabaseTables.JournalView
+
+    @staticmethod
+    def _fill_defaults(table: str, columns: list[str], rows: list[tuple]) -> list[tuple]:
+        """Подставить "-" в ячейки журнала, которые не хранятся в базе"""
+        if table != DatabaseTables.Journal or "missed_hours" not in columns:
+            return rows
+        index = columns.index("missed_hours")
+        return [row if row[index] is not None
+                else (*row[:index], DEFAULT_MISSED_HOURS, *row[index + 1:])
+                for row in rows]
 
     @staticmethod
     def _fixing(values: list[tuple]) -> list[tuple]:
@@ -113,60 +542,189 @@ class DatabaseWork(IDatabase):
             for entry in value)
             for value in values]
 
+    @staticmethod
+    def _conditions(values: dict[str, object] | None, prefix_first: bool = False) -> tuple[tuple, list]:
+        """Форма условий (для кэша запросов) и параметры к ним"""
+        shape, parameters = [], []
+        for position, (column, value) in enumerate((values or {}).items()):
+            if isinstance(value, Between):
+                shape.append((column, "between", 2))
+                parameters.extend((value.low, value.high))
+            elif isinstance(value, (list, tuple, set, frozenset)):
+                value = list(value)
+                shape.append((column, "in", len(value)))
+                parameters.extend(value)
+            elif prefix_first and position == 0:
+                shape.append((column, "like", 1))
+                parameters.append(f"{value}%")
+            else:
+                shape.append((column, "is", 1))
+                parameters.append(value)
+        return tuple(shape), parameters
+
+    @staticmethod
+    def _quote(names: Iterable[str]) -> str:
+        return ", ".join(f'"{i}"' for i in names)
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _compile(select: str, source: str, columns: tuple[str, ...],
+                 conditions: tuple, order_by: tuple[str, ...]) -> str:
+        """Собрать текст запроса; один текст на каждую форму запроса, значения передаются параметрами"""
+        if select == "count":
+            command = f'SELECT COUNT(*) FROM "{source}" '
+        else:
+            distinct = "DISTINCT " if select == "distinct" else ""
+            command = f'SELECT {distinct}{DatabaseWork._quote(columns)} FROM "{source}" '
+        predicates = []
+        for column, operator, count in conditions:
+            if operator == "like":
+                predicates.append(f'"{column}" LIKE ?')
+            elif operator == "between":
+                predicates.append(f'"{column}" BETWEEN ? AND ?')
+            elif operator == "in":
+                predicates.append(f'"{column}" IN ({", ".join("?" * count)})' if count else "0")
+            else:
+                predicates.append(f'"{column}" IS ?')
+        if predicates:
+            command += f'WHERE {" AND ".join(predicates)} '
+        if order_by:
+            command += f'ORDER BY {DatabaseWork._quote(order_by)} '
+        return command + ";"
+
+    def _read(self, command: str, parameters: Iterable = ()) -> list[tuple]:
+        """Выполнить запрос на чтение.
+
+        Запросы идут в пул читающих соединений. Если у пишущего соединения есть
+        незафиксированные изменения этого же потока, читаем через него, чтобы их видеть.
+        """
+        parameters = tuple(parameters)
+        if self._readers is not None:
+            if not self._db.in_transaction or not self._write_lock.acquire(blocking=False):
+                with self._readers.connection() as connection:
+                    return connection.execute(command, parameters).fetchall()
+        else:
+            self._write_lock.acquire()
+        try:
+            return self._db.execute(command, parameters).fetchall()
+        finally:
+            self._write_lock.release()
+
     def having(self, table: str, values: dict[str, str]) -> bool:
-        cursor = self._db.cursor()
-        command = f'SELECT COUNT(*) FROM "{table}" '
-        values = [(k, v) for k, v in values.items()]
-        command += f'WHERE "{values[0][0]}" IS "{values[0][1]}" '
-        if len(values) > 1:
-            for column, value in values[1:]:
-                command += f'AND "{column}" IS "{value}" '
-        command += ";"
-        cursor.execute(command)
-        result = bool(cursor.fetchone()[0])
-        cursor.close()
-        return result
+        conditions, parameters = self._conditions(values)
+        command = self._compile("count", self._source(table), (), conditions, ())
+        return bool(self._read(command, parameters)[0][0])
+
+    def having_many(self, table: str, columns: list[str], rows: Iterable[Iterable]) -> set[tuple]:
+        """Вернуть те кортежи значений columns из rows, которые уже есть в таблице.
+
+        Кандидаты передаются параметрами в VALUES, по HAVING_MANY_VARIABLES значений
+        на запрос. Запрос только читает и выполняется в пуле читающих соединений.
+        """
+        rows = list(dict.fromkeys(tuple(row)[:len(columns)] for row in rows))
+        size = max(1, HAVING_MANY_VARIABLES // len(columns))
+        existing = set()
+        for start in range(0, len(rows), size):
+            chunk = rows[start:start + size]
+            command = self._compile_having_many(self._source(table), tuple(columns), len(chunk))
+            existing.update(self._read(command, (value for row in chunk for value in row)))
+        return existing
+
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def _compile_having_many(source: str, columns: tuple[str, ...], count: int) -> str:
+        keys = [f"k{i}" for i in range(len(columns))]
+        values = ", ".join([f'({", ".join("?" * len(keys))})'] * count)
+        selected = ", ".join(f'k."{key}"' for key in keys)
+        match = " AND ".join(f't."{column}" IS k."{key}"' for column, key in zip(columns, keys))
+        return (f'WITH "k" ({DatabaseWork._quote(keys)}) AS (VALUES {values}) '
+                f'SELECT {selected} FROM "k" AS k '
+                f'WHERE EXISTS (SELECT 1 FROM "{source}" AS t WHERE {match});')
+
+    def _stage(self, table: str, columns: list[str], rows: Iterable[Iterable]) -> str:
+        """Загрузить rows во временную таблицу "Stage{table}" и вернуть её имя"""
+        stage = f"Stage{table}"
+        self._db.execute(f'CREATE TEMP TABLE IF NOT EXISTS "{stage}" ({self._quote(columns)});')
+        self._db.execute(f'DELETE FROM "temp"."{stage}";')
+        self._db.executemany(f'INSERT INTO "temp"."{stage}" VALUES ({", ".join("?" * len(columns))});',
+                             (tuple(row)[:len(columns)] for row in rows))
+        return stage
+
+    def _merge_staged(self, table: str, columns: list[str]) -> int:
+        """Перенести из "Stage{table}" строки, которых ещё нет в table.
+
+        Один INSERT ... SELECT с анти-соединением; повторы внутри пакета схлопываются,
+        порядок первого появления сохраняется. Возвращает число добавленных строк (changes()).
+        """
+        match = " AND ".join(f't."{column}" IS s."{column}"' for column in columns)
+        staged = ", ".join(f's."{column}"' for column in columns)
+        self._db.execute(f'''
+        INSERT INTO "{table}" ({self._quote(columns)})
+        SELECT {staged} FROM "temp"."Stage{table}" AS s
+        WHERE NOT EXISTS (SELECT 1 FROM "{table}" AS t WHERE {match})
+        GROUP BY {staged}
+        ORDER BY MIN(s."rowid")
+        ;''')
+        return self._db.execute('SELECT changes();').fetchone()[0]
 
     def having_individual_return(self, table: str, columns: list[str], order_by: list[str] = None) -> list[tuple]:
-        cursor = self._db.cursor()
-        columns = [f'"{i}"' for i in columns]
-        command = f'SELECT DISTINCT {", ".join(columns)} FROM "{table}" '
-        if order_by:
-            order_by = [f'"{i}"' for i in order_by]
-            command += f'ORDER BY {", ".join(order_by)} '
-        command += ";"
-        cursor.execute(command)
-        result = cursor.fetchall()
-        cursor.close()
+        command = self._compile("distinct", self._source(table), tuple(columns), (), tuple(order_by or ()))
+        result = self._read(command)
         # return self._fixing(result)
-        return result
+        return self._fill_defaults(table, columns, result)
 
     def select_where(self, table: str, columns: list[str], values: dict[str, str], order_by: list[str] = None) -> list[
         tuple]:
-        cursor = self._db.cursor()
-        columns = [f'"{i}"' for i in columns]
-        command = f'SELECT {", ".join(columns)} FROM "{table}" '
-        values = [(k, v) for k, v in values.items()]
-        command += f'WHERE "{values[0][0]}" LIKE "{values[0][1]}%" '
-        if len(values) > 1:
-            for column, value in values[1:]:
-                command += f'AND "{column}" IS "{value}" '
-        if order_by:
-            order_by = [f'"{i}"' for i in order_by]
-            command += f'ORDER BY {", ".join(order_by)} '
-        command += ";"
-        cursor.execute(command)
-        result = cursor.fetchall()
-        cursor.close()
+        # Первое условие - совпадение по началу строки (например, "YYYY-MM" для дат)
+        conditions, parameters = self._conditions(values, prefix_first=True)
+        command = self._compile("select", self._source(table), tuple(columns), conditions, tuple(order_by or ()))
+        result = self._read(command, parameters)
         # return self._fixing(result)
-        return result
+        return self._fill_defaults(table, columns, result)
+
+    def date_parts(self, part: str = "year", year: str = None, month: str = None) -> list[str]:
+        """Годы, месяцы года year или дни месяца year-month, для которых есть даты (по возрастанию)"""
+        if part not in DATE_PARTS:
+            raise ValueError(f"Unknown date part {part}")
+        predicates = []
+        parameters = []
+        if part in ("month", "day"):
+            predicates.append("strftime('%Y', \"date\") IS ?")
+            parameters.append(str(year))
+        if part == "day":
+            predicates.append("strftime('%m', \"date\") IS ?")
+            parameters.append(str(month))
+        where = f'WHERE {" AND ".join(predicates)} ' if predicates else ""
+        command = (f'SELECT DISTINCT strftime(\'{DATE_PARTS[part]}\', "date") AS "part" FROM "Dates" '
+                   f'{where}ORDER BY "part";')
+        return [row[0] for row in self._read(command, parameters)]
+
+    def iter_rows(self, table: str, columns: list[str], order_by: list[str] = None,
+                  batch_size: int = 1000) -> Iterator[tuple]:
+        """Построчно прочитать таблицу (без DISTINCT), держа в памяти не больше batch_size строк.
+
+        Чтение идёт через соединение из пула, которое занято, пока генератор не исчерпан
+        или не закрыт. Без пула (база в памяти) выборка читается целиком через _read.
+        """
+        command = self._compile("select", self._source(table), tuple(columns), (), tuple(order_by or ()))
+        if self._readers is None:
+            yield from self._fill_defaults(table, columns, self._read(command))
+            return
+        with self._readers.connection() as connection:
+            cursor = connection.execute(command)
+            try:
+                while rows := cursor.fetchmany(batch_size):
+                    yield from self._fill_defaults(table, columns, rows)
+            finally:
+                cursor.close()
 
+    @_writer
     def _insert(self, table: str, values: list[str | int], autocommit: bool = True) -> None:
         if table == "Journal":
-            table_info = ('("date", "group", "surname", "name", "patronymic", '
-                          '"lesson", "missed_hours") '
-                          'VALUES (?, ?, ?, ?, ?, ?, ?)')
-        elif table == "Students":
+            # values: date, group, surname, name, patronymic, lesson, missed_hours
+            self.insert_journal([values], autocommit)
+            return
+        if table == "Students":
             table_info = ('("group", "surname", "name", "patronymic") '
                           'VALUES (?, ?, ?, ?)')
         elif table == "Groups":
@@ -179,9 +737,15 @@ class DatabaseWork(IDatabase):
             raise ValueError(f'Unknown table {table}')
         self._db.execute(f'INSERT INTO {table} '
                          f'{table_info}', tuple(values))
+        if table == "Dates":
+            self._changed((str(values[0])[:7], None, None))
+        elif table == "Lessons":
+            self._changed((None, None, values[0]))
+        else:
+            self._changed((None, values[0], None))
 
         if autocommit:
-            self._db.commit()
+            self._commit()
 
     def insert_date(self, year: str | int, month: str | int, day: str | int, autocommit: bool = True) -> bool:
         # TODO: what if we don't wanna add all lessons on this date?
@@ -190,31 +754,66 @@ class DatabaseWork(IDatabase):
         month = f"0{int(month)}" if int(month) < 10 else month
         day = f"0{int(day)}" if int(day) < 10 else day
         date = f"{year}-{month}-{day}"
-        having = self.having("Dates", {"date": date})
-        if not having:
-            self._insert("Dates", [date], False)
-            # students = self._fixing(self.having_individual_return(
-            #     "Students",
-            #     ["group", "surname", "name", "patronymic"],
-            #     ["group", "surname", "name", "patronymic"]))
-            students = self.having_individual_return(
-                "Students",
-                ["group", "surname", "name", "patronymic"],
-                ["group", "surname", "name", "patronymic"])
-            lessons = [i[0] for i in self.having_individual_return("Lessons", ["lesson"], ["lesson"])]
-            for student in students:
-                for lesson in lessons:
-                    self._insert("Journal", [date, *student, lesson, "-"], False)
+        return self.insert_dates([date], autocommit) == 1
+
+    @staticmethod
+    def date_range(start: datetime.date | str, end: datetime.date | str) -> list[str]:
+        """Все даты от start до end включительно в формате YYYY-MM-DD"""
+        start = datetime.date.fromisoformat(start) if isinstance(start, str) else start
+        end = datetime.date.fromisoformat(end) if isinstance(end, str) else end
+        return [(start + datetime.timedelta(days=i)).isoformat() for i in range((end - start).days + 1)]
+
+    @_writer
+    def insert_dates(self, dates: Iterable[datetime.date | str], autocommit: bool = True) -> int:
+        """Добавить набор дат (например, семестр) одной транзакцией.
+
+        Для каждой новой даты журнал заполняется одним запросом
+        Students x Lessons (в разреженном режиме не заполняется).
+        Возвращает количество добавленных дат.
+        """
+        dates = sorted({i.isoformat() if isinstance(i, datetime.date) else i for i in dates})
+        if not dates:
+            return 0
+
+        last_id = self._db.execute('SELECT COALESCE(MAX("id_date"), 0) FROM "Dates";').fetchone()[0]
+        self._stage("Dates", ["date"], ((date,) for date in dates))
+        added = self._merge_staged("Dates", ["date"])
+        self._db.execute('DELETE FROM "temp"."StageDates";')
+        if not added:
             if autocommit:
-                self._db.commit()
-        return not having
+                # Закрываем транзакцию, открытую записью во временную таблицу
+                self._commit()
+            return 0
+
+        if not self.sparse:
+            self._db.execute('''
+            INSERT INTO "Journal" ("id_date", "id_person", "id_lesson", "missed_hours")
+            SELECT "Dates"."id_date", "Students"."id_person", "Lessons"."id_lesson", '-'
+            FROM "Dates"
+            CROSS JOIN "Students"
+            CROSS JOIN "Lessons"
+            WHERE "Dates"."id_date" > ?
+            ;''', (last_id,))
+        self._changed(*((month, None, None) for month, in self._db.execute(
+            'SELECT DISTINCT substr("date", 1, 7) FROM "Dates" WHERE "id_date" > ?;', (last_id,)
+        )))
+        if autocommit:
+            self._commit()
+        return added
 
+    @_writer
     def insert_group(self, group: str) -> bool:
         having = self.having("Groups", {"group": group})
         if not having:
             self._insert("Groups", [group])
         return not having
 
+    @_writer
+    def insert_groups(self, groups: Iterable[str], autocommit: bool = True) -> int:
+        """Добавить отсутствующие группы одним запросом, вернуть их количество"""
+        return self._insert_names("Groups", "group", groups, autocommit)
+
+    @_writer
     def insert_student(self, group: str, surname: str, name: str, patronymic: str,
                        create_journal_entries: bool = True) -> bool:
         info = {
@@ -228,66 +827,169 @@ class DatabaseWork(IDatabase):
             self._insert("Students", [group, surname, name, patronymic])
 
         # Если нужно, создаем записи в журнале
-        if create_journal_entries:
+        if create_journal_entries and not self.sparse:
             self._create_journal_entries_for_student(group, surname, name, patronymic)
         return not having
 
-    def _create_journal_entries_for_student(self, group: str, surname: str, name: str, patronymic: str):
-        """Создать записи в журнале для студента"""
+    @_writer
+    def insert_students(self, students: Iterable[Iterable[str]],
+                        create_journal_entries: bool = True, autocommit: bool = True) -> int:
+        """Добавить список студентов (group, surname, name, patronymic).
+
+        Студенты и их записи журнала вставляются по одному запросу на весь список.
+        Возвращает количество добавленных студентов.
+        """
+        columns = ["group", "surname", "name", "patronymic"]
+        students = [tuple(student)[:4] for student in students]
         try:
-            # Получаем все даты
-            dates = self.having_individual_return("Dates", ["date"], ["date"])
-            if not dates:
-                print("No dates found in database")
-                return
-
-            # Получаем все предметы
-            lessons = self.having_individual_return("Lessons", ["lesson"], ["lesson"])
-            if not lessons:
-                print("No lessons found in database")
-                return
-
-            print(f"Creating journal entries for student {surname} {name} {patronymic}")
-            print(f"Dates: {len(dates)}, Lessons: {len(lessons)}")
-
-            entries_created = 0
-            for date_tuple in dates:
-                date = date_tuple[0]
-                for lesson_tuple in lessons:
-                    lesson = lesson_tuple[0]
-
-                    # Проверяем, нет ли уже такой записи
-                    existing = self.having("Journal", {
-                        "date": date,
-                        "group": group,
-                        "surname": surname,
-                        "name": name,
-                        "patronymic": patronymic,
-                        "lesson": lesson
-                    })
-
-                    if not existing:
-                        self._insert("Journal", [date, group, surname, name, patronymic, lesson, "-"], False)
-                        entries_created += 1
+            self._stage("Students", columns, students)
+            students_added = self._merge_staged("Students", columns)
+
+            if create_journal_entries and not self.sparse:
+                entries_created = self._db.execute(MISSING_JOURNAL_ENTRIES + '''
+                AND EXISTS (SELECT 1 FROM "temp"."StageStudents" AS r
+                            WHERE r."group" IS s."group" AND
+                                  r."surname" IS s."surname" AND
+                                  r."name" IS s."name" AND
+                                  r."patronymic" IS s."patronymic")
+                ;''').rowcount
+                logger.debug(f"Created {entries_created} journal entries for {students_added} new students")
+
+            self._db.execute('DELETE FROM "temp"."StageStudents";')
+            if students_added:
+                self._changed(*{(None, student[0], None) for student in students})
+            if autocommit:
+                self._commit()
+            return students_added
+
+        except Exception as e:
+            logger.error(f"Error inserting students: {e}")
+            self._rollback()
+            raise
+
+    @_writer
+    def _create_journal_entries_for_student(self, group: str, surname: str, name: str, patronymic: str) -> int:
+        """Создать недостающие записи в журнале для студента, вернуть их количество"""
+        try:
+            entries_created = self._db.execute(MISSING_JOURNAL_ENTRIES + '''
+            AND s."group" IS ?
+            AND s."surname" IS ?
+            AND s."name" IS ?
+            AND s."patronymic" IS ?
+            ;''', (group, surname, name, patronymic)).rowcount
 
             # Коммитим изменения
-            self._db.commit()
+            self._commit()
             print(f"Created {entries_created} journal entries for student {surname} {name} {patronymic}")
+            return entries_created
 
         except Exception as e:
             print(f"Error creating journal entries for student: {e}")
-            self._db.rollback()
+            self._rollback()
             raise
 
+    @_writer
     def insert_lesson(self, lesson: str) -> bool:
         having = self.having("Lessons", {"lesson": lesson})
         if not having:
             self._insert("Lessons", [lesson])
         return not having
 
-    def insert_journal(self):  # TODO: insert journal
-        pass
+    @_writer
+    def insert_lessons(self, lessons: Iterable[str], autocommit: bool = True) -> int:
+        """Добавить отсутствующие занятия одним запросом, вернуть их количество"""
+        return self._insert_names("Lessons", "lesson", lessons, autocommit)
 
+    def _insert_names(self, table: str, column: str, names: Iterable[str], autocommit: bool) -> int:
+        names = list(names)
+        try:
+            self._stage(table, [column], ((name,) for name in names))
+            added = self._merge_staged(table, [column])
+            self._db.execute(f'DELETE FROM "temp"."Stage{table}";')
+        except sqlite3.Error:
+            if autocommit:
+                self._rollback()
+            raise
+        if added:
+            scope = {"Groups": lambda name: (None, name, None), "Lessons": lambda name: (None, None, name)}[table]
+            self._changed(*{scope(name) for name in names})
+        if autocommit:
+            self._commit()
+        return added
+
+    def _journal_executemany(self, sql: str, rows: Iterable[Iterable], autocommit: bool) -> int:
+        """Выполнить sql для всех rows одной транзакцией, вернуть число затронутых строк"""
+        before = self._db.total_changes
+        try:
+            self._db.executemany(sql, (tuple(row) for row in rows))
+        except sqlite3.Error:
+            if autocommit:
+                self._rollback()
+            raise
+        if autocommit:
+            self._commit()
+        return self._db.total_changes - before
+
+    @_writer
+    def insert_journal(self, records: Iterable[Iterable], autocommit: bool = True) -> int:
+        """Добавить записи журнала (date, group, surname, name, patronymic, lesson, missed_hours).
+
+        Уже существующие ячейки не изменяются. Возвращает число добавленных записей.
+        """
+        records = self._journal_records(records)
+        return self._journal_executemany(JOURNAL_RECORD.format(conflict="OR IGNORE "), records, autocommit)
+
+    def _journal_records(self, records: Iterable[Iterable]) -> list[tuple]:
+        """Записи (date, group, surname, name, patronymic, lesson, ...) списком, с учётом затронутых областей"""
+        records = [tuple(record) for record in records]
+        # Некорректные записи отвергнет сама SQLite
+        self._changed(*{(str(record[0])[:7], record[1], record[5]) for record in records if len(record) > 5})
+        return records
+
+    def _upsert_records(self, upsert: str, delete: str, records: Iterable[Iterable], key_size: int,
+                        autocommit: bool) -> int:
+        """Записать записи (ключ..., missed_hours); в разреженном режиме значения по умолчанию удаляются"""
+        if not self.sparse:
+            return self._journal_executemany(upsert, records, autocommit)
+        records = [tuple(record) for record in records]
+        defaults = [record[:key_size] for record in records if str(record[key_size]) == DEFAULT_MISSED_HOURS]
+        values = [record for record in records if str(record[key_size]) != DEFAULT_MISSED_HOURS]
+        try:
+            changed = self._journal_executemany(upsert, values, autocommit=False)
+            changed += self._journal_executemany(delete, defaults, autocommit=False)
+        except sqlite3.Error:
+            if autocommit:
+                self._rollback()
+            raise
+        if autocommit:
+            self._commit()
+        return changed
+
+    @_writer
+    def upsert_journal(self, records: Iterable[Iterable], autocommit: bool = True) -> int:
+        """Записать значения ячеек журнала, создавая недостающие.
+
+        В разреженном режиме значения по умолчанию удаляются из таблицы.
+        Возвращает число затронутых записей.
+        """
+        records = self._journal_records(records)
+        return self._upsert_records(JOURNAL_UPSERT, JOURNAL_KEY_DELETE, records, 6, autocommit)
+
+    @_writer
+    def upsert_journal_cells(self, cells: Iterable[Iterable], autocommit: bool = True) -> int:
+        """То же, что upsert_journal, но ячейки заданы идентификаторами
+        (id_date, id_person, id_lesson, missed_hours) - без поиска по именам.
+        """
+        cells = [tuple(cell) for cell in cells]
+        self._changed_cells.update((cell[:3], cell[3]) for cell in cells if len(cell) > 3)
+        return self._upsert_records(JOURNAL_CELL_UPSERT, JOURNAL_CELL_DELETE, cells, 3, autocommit)
+
+    @_writer
+    def set_missed_hours(self, date: str, group: str, surname: str, name: str, patronymic: str,
+                         lesson: str, missed_hours: str | int, autocommit: bool = True):
+        self.upsert_journal([(date, group, surname, name, patronymic, lesson, missed_hours)], autocommit)
+
+    @_writer
     def update_date(self,
                     old_year: str | int, old_month: str | int, old_day: str | int,
                     new_year: str | int, new_month: str | int, new_day: str | int,
@@ -307,11 +1009,12 @@ class DatabaseWork(IDatabase):
             raise ValueError(f'Date {old} not found')
         if self.having("Dates", {"date": new}):
             raise ValueError(f'Date {new} already exists')
-        self._db.execute(f'UPDATE "Dates" SET "date" = "{new}" WHERE "date" = "{old}"')
-        self._db.execute(f'UPDATE "Journal" SET "date" = "{new}" WHERE "date" = "{old}"')
+        self._db.execute('UPDATE "Dates" SET "date" = ? WHERE "date" = ?', (new, old))
+        self._changed((old[:7], None, None), (new[:7], None, None))
         if autocommit:
-            self._db.commit()
+            self._commit()
 
+    @_writer
     def update_group(self, old: str, new: str):
         if old == new:
             raise ValueError(f'Groups {old} and {new} are identical')
@@ -319,11 +1022,12 @@ class DatabaseWork(IDatabase):
             raise ValueError(f'Group {old} not found')
         if self.having("Groups", {"group": new}):
             raise ValueError(f'Group {new} already exists')
-        self._db.execute(f'UPDATE "Groups" SET "group" = "{new}" WHERE "group" = "{old}"')
-        self._db.execute(f'UPDATE "Students" SET "group" = "{new}" WHERE "group" = "{old}"')
-        self._db.execute(f'UPDATE "Journal" SET "group" = "{new}" WHERE "group" = "{old}"')
-        self._db.commit()
+        self._db.execute('UPDATE "Groups" SET "group" = ? WHERE "group" = ?', (new, old))
+        self._db.execute('UPDATE "Students" SET "group" = ? WHERE "group" = ?', (new, old))
+        self._changed((None, old, None), (None, new, None))
+        self._commit()
 
+    @_writer
     def update_student(self,
                        old_group: str, old_surname: str, old_name: str, old_patronymic: str,
                        new_group: str, new_surname: str, new_name: str, new_patronymic: str):
@@ -343,30 +1047,22 @@ class DatabaseWork(IDatabase):
                                     "name": new_name,
                                     "patronymic": new_patronymic}):
             raise ValueError(f'Student {new_surname} {new_name} {new_patronymic} in group {new_group} already exists')
-        self._db.execute(f'''
+        self._db.execute('''
         UPDATE "Students"
-        SET "group" = "{new_group}",
-            "surname" = "{new_surname}",
-            "name" = "{new_name}",
-            "patronymic" = "{new_patronymic}"
-        WHERE "group" = "{old_group}" AND
-              "surname" = "{old_surname}" AND
-              "name" = "{old_name}" AND
-              "patronymic" = "{old_patronymic}"
-        ;''')
-        self._db.execute(f'''
-        UPDATE "Journal"
-        SET "group" = "{new_group}",
-            "surname" = "{new_surname}",
-            "name" = "{new_name}",
-            "patronymic" = "{new_patronymic}"
-        WHERE "group" = "{old_group}" AND
-              "surname" = "{old_surname}" AND
-              "name" = "{old_name}" AND
-              "patronymic" = "{old_patronymic}"
-        ;''')
-        self._db.commit()
+        SET "group" = ?,
+            "surname" = ?,
+            "name" = ?,
+            "patronymic" = ?
+        WHERE "group" = ? AND
+              "surname" = ? AND
+              "name" = ? AND
+              "patronymic" = ?
+        ;''', (new_group, new_surname, new_name, new_patronymic,
+              old_group, old_surname, old_name, old_patronymic))
+        self._changed((None, old_group, None), (None, new_group, None))
+        self._commit()
 
+    @_writer
     def update_lesson(self, old: str, new: str):
         if old == new:
             raise ValueError(f'Lessons {old} and {new} are identical')
@@ -374,10 +1070,11 @@ class DatabaseWork(IDatabase):
             raise ValueError(f'Lesson {old} not found')
         if self.having("Lessons", {"lesson": new}):
             raise ValueError(f'Lesson {new} already exists')
-        self._db.execute(f'UPDATE "Lessons" SET "lesson" = "{new}" WHERE "lesson" = "{old}"')
-        self._db.execute(f'UPDATE "Journal" SET "lesson" = "{new}" WHERE "lesson" = "{old}"')
-        self._db.commit()
+        self._db.execute('UPDATE "Lessons" SET "lesson" = ? WHERE "lesson" = ?', (new, old))
+        self._changed((None, None, old), (None, None, new))
+        self._commit()
 
+    @_writer
     def update_journal(
             self,
             old_date, old_group, old_surname, old_name, old_patronymic, old_lesson, old_missed_hours,
@@ -407,25 +1104,29 @@ class DatabaseWork(IDatabase):
             raise ValueError("Presented old data are not found")
         if self.having("Journal", new_data):
             raise ValueError("Presented new data are already exists")
-        self._db.execute(f'''
+        self._db.execute('''
         UPDATE "Journal"
-        SET "date" = "{new_date}",
-            "group" = "{new_group}",
-            "surname" = "{new_surname}",
-            "name" = "{new_name}",
-            "patronymic" = "{new_patronymic}",
-            "lesson" = "{new_lesson}",
-            "missed_hours" = "{new_missed_hours}"
-        WHERE "date" = "{old_date}" AND
-              "group" = "{old_group}" AND
-              "surname" = "{old_surname}" AND
-              "name" = "{old_name}" AND
-              "patronymic" = "{old_patronymic}" AND
-              "lesson" = "{old_lesson}" AND
-              "missed_hours" = "{old_missed_hours}"
-        ;''')
-        self._db.commit()
+        SET "id_date" = (SELECT MIN("id_date") FROM "Dates" WHERE "date" = ?),
+            "id_person" = (SELECT MIN("id_person") FROM "Students"
+                           WHERE "group" = ? AND
+                                 "surname" = ? AND
+                                 "name" = ? AND
+                                 "patronymic" = ?),
+            "id_lesson" = (SELECT MIN("id_lesson") FROM "Lessons" WHERE "lesson" = ?),
+            "missed_hours" = ?
+        WHERE "id" IN (SELECT "id" FROM "JournalView"
+                       WHERE "date" = ? AND
+                             "group" = ? AND
+                             "surname" = ? AND
+                             "name" = ? AND
+                             "patronymic" = ? AND
+                             "lesson" = ? AND
+                             "missed_hours" = ?)
+        ;''', (*new_data.values(), *old_data.values()))
+        self._changed((str(old_date)[:7], old_group, old_lesson), (str(new_date)[:7], new_group, new_lesson))
+        self._commit()
 
+    @_writer
     def delete_date(self, year: str | int, month: str | int, day: str | int,
                     autocommit: bool = True):
         month = f"0{int(month)}" if int(month) < 10 else month
@@ -433,51 +1134,56 @@ class DatabaseWork(IDatabase):
         date = f"{year}-{month}-{day}"
         if not self.having("Dates", {"date": date}):
             raise ValueError(f'Date {date} not found')
-        self._db.execute(f'DELETE FROM "Dates" WHERE "date" = "{date}"')
-        self._db.execute(f'DELETE FROM "Journal" WHERE "date" = "{date}"')
+        # Записи журнала удаляются каскадно (ON DELETE CASCADE)
+        self._db.execute('DELETE FROM "Dates" WHERE "date" = ?', (date,))
+        self._changed((date[:7], None, None))
         if autocommit:
-            self._db.commit()
+            self._commit()
 
+    @_writer
     def delete_group(self, group: str):
         if not self.having("Groups", {"group": group}):
             raise ValueError(f'Group {group} not found')
-        self._db.execute(f'DELETE FROM "Groups" WHERE "group" = "{group}"')
-        self._db.execute(f'DELETE FROM "Students" WHERE "group" = "{group}"')
-        self._db.execute(f'DELETE FROM "Journal" WHERE "group" = "{group}"')
-        self._db.commit()
+        self._db.execute('DELETE FROM "Groups" WHERE "group" = ?', (group,))
+        self._db.execute('DELETE FROM "Students" WHERE "group" = ?', (group,))
+        self._changed((None, group, None))
+        self._commit()
 
+    @_writer
     def delete_student(self, group: str, surname: str, name: str, patronymic: str):
         if not self.having("Students", {"group": group,
                                         "surname": surname,
                                         "name": name,
                                         "patronymic": patronymic}):
             raise ValueError(f'Student {surname} {name} {patronymic} in group {group} not found')
-        self._db.execute(f'''
+        self._db.execute('''
         DELETE FROM "Students"
-        WHERE "group" = "{group}" AND
-              "surname" = "{surname}" AND
-              "name" = "{name}" AND
-              "patronymic" = "{patronymic}"
-        ;''')
-        self._db.execute(f'''
-        DELETE FROM "Journal"
-        WHERE "group" = "{group}" AND
-              "surname" = "{surname}" AND
-              "name" = "{name}" AND
-              "patronymic" = "{patronymic}"
-        ;''')
-        self._db.commit()
+        WHERE "group" = ? AND
+              "surname" = ? AND
+              "name" = ? AND
+              "patronymic" = ?
+        ;''', (group, surname, name, patronymic))
+        self._changed((None, group, None))
+        self._commit()
 
+    @_writer
     def delete_lesson(self, lesson: str):
         if not self.having("Lessons", {"lesson": lesson}):
             raise ValueError(f'Lesson {lesson} not found')
-        self._db.execute(f'DELETE FROM "Lessons" WHERE "lesson" = "{lesson}"')
-        self._db.execute(f'DELETE FROM "Journal" WHERE "lesson" = "{lesson}"')
-        self._db.commit()
+        self._db.execute('DELETE FROM "Lessons" WHERE "lesson" = ?', (lesson,))
+        self._changed((None, None, lesson))
+        self._commit()
 
-    def delete_journal(self):  # TODO: delete journal
-        pass
+    @_writer
+    def delete_journal(self, keys: Iterable[Iterable], autocommit: bool = True) -> int:
+        """Удалить записи журнала по ключам (date, group, surname, name, patronymic, lesson).
 
+        Возвращает число удалённых записей.
+        """
+        keys = self._journal_records(keys)
+        return self._journal_executemany(JOURNAL_KEY_DELETE, keys, autocommit)
+
+    @_writer
     def test_data(self):
         lessons = [
             'Численные методы', 'Теория информации', 'Разработка приложений в визуальных средах',
@@ -527,36 +1233,41 @@ class DatabaseWork(IDatabase):
             ['10701323', 'Шлык', 'Дарья', 'Валентиновна'],
         ]
 
-        for day in range(1, 31):
-            day = f"0{day}" if day < 10 else day
-            self._insert("Dates", [f"2007-09-{day}"], autocommit=False)
-
-        for lesson in lessons:
-            self._insert("Lessons", [lesson], autocommit=False)
+        with self.transaction():
+            for day in range(1, 31):
+                day = f"0{day}" if day < 10 else day
+                self._insert("Dates", [f"2007-09-{day}"])
 
-        for group in ['10701123', '10701223', '10701323']:
-            self._insert("Groups", [group], autocommit=False)
+            for lesson in lessons:
+                self._insert("Lessons", [lesson])
 
-        for student in students:
-            self._insert("Students", student, autocommit=False)
+            for group in ['10701123', '10701223', '10701323']:
+                self._insert("Groups", [group])
 
-        for day in range(1, 31):
-            day = f"0{day}" if day < 10 else day
             for student in students:
-                for lesson in lessons:
-                    self._insert("Journal",
-                                 [f"2007-09-{day}", *student, lesson, randint(0, 2)],
-                                 autocommit=False)
+                self._insert("Students", student)
+
+            self.upsert_journal(([f"2007-09-{day:02d}", *student, lesson, randint(0, 2)]
+                                 for day in range(1, 31)
+                                 for student in students
+                                 for lesson in lessons))
 
-        self._db.commit()
         print("test data inserted")
 
+    @_writer
     def clear(self):
+        for i in DatabaseTables.Views:
+            self._db.execute(f"DROP VIEW IF EXISTS {i};")
         for i in DatabaseTables.All:
             self._db.execute(f"DROP TABLE {i};")
-        self._db.commit()
+        self._changed((None, None, None))
+        self._commit()
         print("db was cleared")
         self.create()
 
+    @_writer
     def close(self):
+        # Под блокировкой записи: соединение не закроется посреди чужой транзакции
+        if self._readers is not None:
+            self._readers.close()
         self._db.close()
@@ -8,7 +8,7 @@ from datetime import datetime
 class DataExporter:
     """Класс для экспорта данных из базы данных"""
 
-    def __init__(self, db, serializer, xml_serializer, os_module=None):
+    def __init__(self, db, serializer, xml_serializer, os_module=None, ndjson_serializer=None):
         """
         Инициализация экспортера
 
@@ -17,11 +17,13 @@ class DataExporter:
             serializer: Экземпляр Serializer
             xml_serializer: Экземпляр XMLSerializer
             os_module: Модуль os (для тестирования)
+            ndjson_serializer: Экземпляр NDJSONSerializer
         """
         self.db = db
         self.serializer = serializer
         self.xml_serializer = xml_serializer
         self.os_module = os_module or os
+        self.ndjson_serializer = ndjson_serializer
 
     # --- JSON ЭКСПОРТ ---
 
@@ -42,6 +44,41 @@ class DataExporter:
         except Exception as e:
             return False, f"Ошибка экспорта JSON: {str(e)}"
 
+    # --- NDJSON ЭКСПОРТ ---
+
+    def _backup_records(self):
+        """Записи полного бэкапа (kind, values) в порядке, в котором их удобно импортировать"""
+        for row in self.db.iter_rows("Groups", ["group"], ["group"]):
+            yield 'group', row
+        for row in self.db.iter_rows("Students", ["group", "surname", "name", "patronymic"],
+                                     ["group", "surname", "name", "patronymic"]):
+            yield 'student', row
+        for row in self.db.iter_rows("Lessons", ["lesson"], ["lesson"]):
+            yield 'lesson', row
+        for row in self.db.iter_rows("Dates", ["date"], ["date"]):
+            yield 'date', row
+        # Только сохранённые отметки; пустые ячейки восстанавливаются при импорте
+        for row in self.db.iter_rows(
+                "JournalView",
+                ["date", "group", "surname", "name", "patronymic", "lesson", "missed_hours"]
+        ):
+            yield 'journal', row
+
+    def export_full_backup_to_ndjson(self, filename="full_backup.ndjson"):
+        """Экспорт всех данных в NDJSON (одна запись на строку, без загрузки базы в память)"""
+        if not self.ndjson_serializer:
+            return False, "NDJSON сериализатор не доступен"
+
+        try:
+            count = self.ndjson_serializer.save_to_ndjson(self._backup_records(), filename)
+            if count is not None:
+                return True, f"Полный бэкап сохранен в NDJSON: {filename}\nЗаписей: {count}"
+            else:
+                return False, "Ошибка экспорта в NDJSON"
+
+        except Exception as e:
+            return False, f"Ошибка экспорта NDJSON: {str(e)}"
+
     # --- XML ЭКСПОРТ ---
 
     def export_groups_to_xml(self, filename="groups_export.xml"):
@@ -171,6 +208,7 @@ class DataExporter:
         """Возвращает список поддерживаемых форматов экспорта"""
         return {
             'json': ['groups'],
+            'ndjson': ['full_backup'],
             'xml': ['groups', 'students', 'journal'],
             'pickle': ['full_backup'],
             'msgpack': ['groups']
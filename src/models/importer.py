@@ -1,10 +1,104 @@
 import os
+import threading
+import time
+from typing import Callable
+
+
+class ImportCancelled(Exception):
+    """Импорт отменён пользователем"""
+
+
+class ImportProgress:
+    """Ход импорта: прочитанные байты, перенесённые строки и оценка оставшегося времени.
+
+    Заполняется потоком импорта и читается потоком интерфейса. cancel() останавливает
+    импорт на ближайшей границе пакета, транзакция импорта при этом откатывается.
+    """
+
+    def __init__(self, total_bytes: int = 0, callback: Callable = None):
+        self.total_bytes = total_bytes
+        self.bytes_read = 0
+        # Число строк известно только после загрузки файла целиком (не для XML)
+        self.total_rows = 0
+        self.rows = 0
+        self.finished = False
+        self.callback = callback
+        self._cancelled = threading.Event()
+        self._started = time.monotonic()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def fraction(self) -> float:
+        """Выполненная доля импорта (0..1)"""
+        if self.total_rows:
+            return min(self.rows / self.total_rows, 1.0)
+        if self.total_bytes:
+            return min(self.bytes_read / self.total_bytes, 1.0)
+        return 0.0
+
+    @property
+    def eta(self) -> float | None:
+        """Оценка оставшегося времени в секундах"""
+        fraction = self.fraction
+        if fraction <= 0:
+            return None
+        elapsed = time.monotonic() - self._started
+        return elapsed * (1 - fraction) / fraction
+
+    def update(self, bytes_read: int = None, rows: int = 0):
+        """Отметить ход импорта; при запрошенной отмене бросает ImportCancelled"""
+        if bytes_read is not None:
+            self.bytes_read = bytes_read
+        self.rows += rows
+        if self.callback:
+            self.callback(self)
+        if self.cancelled:
+            raise ImportCancelled()
+
+
+class _ProgressReader:
+    """Файл, сообщающий ImportProgress о прочитанных байтах"""
+
+    def __init__(self, file, progress: ImportProgress):
+        self._file = file
+        self._progress = progress
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._file.read(size)
+        self._progress.update(bytes_read=self._file.tell())
+        return data
+
+    def readline(self) -> bytes:
+        line = self._file.readline()
+        self._progress.update(bytes_read=self._file.tell())
+        return line
 
 
 class DataImporter:
     """Класс для импорта данных в базу данных"""
 
-    def __init__(self, db, serializer, xml_serializer, os_module=None):
+    # Сколько элементов XML разбирается и записывается за один раз
+    XML_BATCH_SIZE = 1000
+    # Сколько записей журнала пишется одним executemany
+    JOURNAL_BATCH_SIZE = 10000
+    # Файлы больше этого размера загружаются целиком только после подтверждения (кроме XML)
+    LARGE_FILE_SIZE = 10 * 1024 * 1024  # 10 MB
+    STREAMING_FORMATS = ('xml', 'ndjson')
+    # Сколько строк NDJSON разбирается и записывается за один раз
+    NDJSON_BATCH_SIZE = 10000
+    # Вид записи NDJSON -> раздел бэкапа (см. _process_dict_data)
+    NDJSON_SECTIONS = {'group': 'groups', 'student': 'students', 'lesson': 'lessons',
+                       'date': 'dates', 'journal': 'journal'}
+    # Поля записи журнала в порядке экспорта
+    JOURNAL_FIELDS = ('date', 'group', 'surname', 'name', 'patronymic', 'lesson', 'missed_hours')
+
+    def __init__(self, db, serializer, xml_serializer, os_module=None, ndjson_serializer=None):
         """
         Инициализация импортера
 
@@ -13,37 +107,40 @@ class DataImporter:
             serializer: Экземпляр Serializer
             xml_serializer: Экземпляр XMLSerializer
             os_module: Модуль os (для тестирования)
+            ndjson_serializer: Экземпляр NDJSONSerializer
         """
         self.db = db
         self.serializer = serializer
         self.xml_serializer = xml_serializer
         self.os_module = os_module or os
+        self.ndjson_serializer = ndjson_serializer
 
     # --- АВТОДЕТЕКТ И ИМПОРТ ---
 
-    def auto_detect_and_import(self, filename: str):
-        """Автоматическое определение формата и импорт"""
+    def inspect_file(self, filename: str):
+        """Определить формат файла, не разбирая его.
+
+        Возвращает (format, size) или (None, сообщение об ошибке).
+        """
         try:
             # Проверка файла
             if not self.os_module.path.exists(filename):
-                return False, f"Файл {filename} не найден"
-
-            # Проверка размера файла
+                return None, f"Файл {filename} не найден"
             file_size = self.os_module.path.getsize(filename)
-            if file_size > 10 * 1024 * 1024:  # 10 MB
-                return True, "large_file", file_size  # Сигнал для подтверждения
 
             # Определяем формат по расширению файла
             filename_lower = filename.lower()
 
             if filename_lower.endswith('.json'):
-                return self._import_data(filename, 'json')
+                return 'json', file_size
             elif filename_lower.endswith('.xml'):
-                return self._import_data(filename, 'xml')
+                return 'xml', file_size
+            elif filename_lower.endswith('.ndjson') or filename_lower.endswith('.jsonl'):
+                return 'ndjson', file_size
             elif filename_lower.endswith('.pkl') or filename_lower.endswith('.pickle'):
-                return self._import_data(filename, 'pickle')
+                return 'pickle', file_size
             elif filename_lower.endswith('.msgpack') or filename_lower.endswith('.mpk'):
-                return self._import_data(filename, 'msgpack')
+                return 'msgpack', file_size
             else:
                 # Попробуем определить по содержимому
                 try:
@@ -52,25 +149,56 @@ class DataImporter:
 
                     # Грубая проверка форматов
                     if b'<?xml' in first_bytes:
-                        return self._import_data(filename, 'xml')
+                        return 'xml', file_size
                     elif b'{' in first_bytes or b'[' in first_bytes:
-                        return self._import_data(filename, 'json')
+                        return 'json', file_size
                     elif b'\x80' in first_bytes[:2] or b'pickle' in first_bytes.lower():
-                        return self._import_data(filename, 'pickle')
+                        return 'pickle', file_size
                     else:
-                        return False, (
+                        return None, (
                             f"Не удалось определить формат файла.\n"
-                            f"Поддерживаемые форматы: .json, .xml, .pkl, .msgpack"
+                            f"Поддерживаемые форматы: .json, .xml, .ndjson, .pkl, .msgpack"
                         )
                 except Exception as inner_e:
-                    return False, f"Не удалось прочитать файл: {str(inner_e)}"
+                    return None, f"Не удалось прочитать файл: {str(inner_e)}"
 
         except Exception as e:
-            return False, f"Ошибка импорта: {str(e)}"
+            return None, f"Ошибка импорта: {str(e)}"
+
+    def needs_confirmation(self, format_type: str, file_size: int) -> bool:
+        """Нужно ли подтверждение: большой файл, который загружается в память целиком"""
+        # XML читается потоково, его размер на память не влияет
+        return file_size > self.LARGE_FILE_SIZE and format_type not in self.STREAMING_FORMATS
+
+    def auto_detect_and_import(self, filename: str):
+        """Автоматическое определение формата и импорт"""
+        format_type, info = self.inspect_file(filename)
+        if format_type is None:
+            return False, info
+        if self.needs_confirmation(format_type, info):
+            return True, "large_file", info  # Сигнал для подтверждения
+        return self._import_data(filename, format_type)
+
+    def import_file(self, filename: str, format_type: str, progress: ImportProgress = None):
+        """Импорт файла известного формата (можно вызывать из фонового потока).
+
+        progress получает ход импорта и позволяет его отменить. Он передаётся
+        по цепочке вызовов, поэтому импортер не хранит состояние импорта.
+        """
+        try:
+            return self._import_data(filename, format_type, progress)
+        finally:
+            if progress:
+                progress.finished = True
+
+    @staticmethod
+    def _advance(progress: ImportProgress | None, bytes_read: int = None, rows: int = 0):
+        if progress:
+            progress.update(bytes_read, rows)
 
     # --- ОСНОВНОЙ МЕТОД ИМПОРТА ---
 
-    def _import_data(self, filename: str, format_type: str):
+    def _import_data(self, filename: str, format_type: str, progress: ImportProgress = None):
         """Универсальный импорт для всех форматов"""
         try:
             imported_counts = {
@@ -91,7 +219,20 @@ class DataImporter:
             elif format_type == 'xml':
                 if not self.xml_serializer:
                     return False, "XML сериализатор не доступен"
-                data = self.xml_serializer.load_from_xml(filename)
+                # Элементы пишутся в базу пачками по мере чтения файла
+                with open(filename, 'rb') as f, self.db.transaction():
+                    self._import_xml_stream(_ProgressReader(f, progress) if progress else f,
+                                            imported_counts, progress)
+                return True, self._generate_import_report(imported_counts)
+
+            elif format_type == 'ndjson':
+                if not self.ndjson_serializer:
+                    return False, "NDJSON сериализатор не доступен"
+                # Строки пишутся в базу пачками по мере чтения файла
+                with open(filename, 'rb') as f, self.db.transaction():
+                    self._import_ndjson_stream(_ProgressReader(f, progress) if progress else f,
+                                               imported_counts, progress)
+                return True, self._generate_import_report(imported_counts)
 
             elif format_type == 'pickle':
                 if not self.serializer:
@@ -109,43 +250,79 @@ class DataImporter:
             if not data:
                 return False, f"Не удалось загрузить данные из файла"
 
-            # Обрабатываем данные
-            self._process_import_data(data, imported_counts, format_type)
+            # Файл прочитан целиком; дальше ход импорта считается по строкам
+            if progress:
+                progress.total_rows = self._rows_total(data)
+                self._advance(progress, bytes_read=progress.total_bytes)
+
+            # Обрабатываем данные одной транзакцией
+            with self.db.transaction():
+                self._process_import_data(data, imported_counts, format_type, progress)
 
             # Формируем отчет
             report = self._generate_import_report(imported_counts)
             return True, report
 
+        except ImportCancelled:
+            return False, "Импорт отменён, изменения не сохранены"
+
         except Exception as e:
             return False, f"Ошибка при импорте {format_type.upper()}: {str(e)}"
 
     # --- ОБРАБОТКА ДАННЫХ ---
 
-    def _process_import_data(self, data, imported_counts, format_type):
-        """Обработка импортированных данных"""
-        if format_type == 'xml':
-            # Обработка XML данных
-            self._process_xml_data(data, imported_counts)
-
-        elif isinstance(data, dict):
+    def _process_import_data(self, data, imported_counts, format_type, progress=None):
+        """Обработка импортированных данных (XML импортируется потоково, см. _import_xml_stream)"""
+        if isinstance(data, dict):
             # Обработка словарных данных (например, из pickle)
-            self._process_dict_data(data, imported_counts)
+            self._process_dict_data(data, imported_counts, progress)
 
         elif isinstance(data, list):
             # Обработка списковых данных (например, из JSON)
-            self._process_list_data(data, imported_counts)
-
-    def _process_xml_data(self, data, imported_counts):
-        """Обработка XML данных"""
-        if 'data' not in data:
-            return
-
-        for item in data['data']:
+            self._process_list_data(data, imported_counts, progress)
+
+    def _import_xml_stream(self, source, imported_counts, progress=None):
+        """Потоковый импорт XML (имя или открытый файл): элементы читаются и записываются пачками"""
+        batch = []
+        for item in self.xml_serializer.iter_xml(source):
+            batch.append(item)
+            if len(batch) >= self.XML_BATCH_SIZE:
+                self._process_xml_items(batch, imported_counts, progress)
+                batch = []
+        self._process_xml_items(batch, imported_counts, progress)
+
+    def _import_ndjson_stream(self, source, imported_counts, progress=None):
+        """Потоковый импорт NDJSON (имя или открытый файл): строки читаются и записываются пачками"""
+        batch = []
+        for item in self.ndjson_serializer.iter_ndjson(source):
+            batch.append(item)
+            if len(batch) >= self.NDJSON_BATCH_SIZE:
+                self._process_ndjson_items(batch, imported_counts, progress)
+                batch = []
+        self._process_ndjson_items(batch, imported_counts, progress)
+
+    def _process_ndjson_items(self, items, imported_counts, progress=None):
+        """Обработка пачки записей NDJSON: записи раскладываются по разделам бэкапа"""
+        sections = {section: [] for section in self.NDJSON_SECTIONS.values()}
+        for item in items:
+            section = self.NDJSON_SECTIONS.get(item.get('kind')) if isinstance(item, dict) else None
+            if section:
+                sections[section].append(item)
+        self._process_dict_data(sections, imported_counts, progress)
+
+    def _process_xml_items(self, items, imported_counts, progress=None):
+        """Обработка элементов XML (группы, студенты и записи журнала)"""
+        groups = []
+        students = []
+        records = []
+        for item in items:
             # Обработка групп
             if item.get('tag') == 'group' or item.get('tag') == 'Group':
-                group_name = item.get('text') or item.get('name') or item.get('Name')
-                if group_name and self._import_group(group_name):
-                    imported_counts['groups'] += 1
+                # save_groups_to_xml пишет название в дочерний <Name>, текст самого элемента - отступы
+                names = [child.get('text', '').strip() for child in item.get('children', [])
+                         if child.get('tag', '').lower() == 'name']
+                group_name = (names[0] if names else item.get('text', '').strip()) or item.get('name') or item.get('Name')
+                groups.append(group_name)
 
             # Обработка студентов
             elif item.get('tag') == 'student' or item.get('tag') == 'Student':
@@ -154,108 +331,216 @@ class DataImporter:
                     for child in item['children']:
                         tag_lower = child.get('tag', '').lower()
                         student_data[tag_lower] = child.get('text', '')
+                students.append(student_data)
+
+            # Записи журнала (save_journal_to_xml)
+            elif item.get('tag') == 'record' or item.get('tag') == 'Record':
+                records.append({child.get('tag', '').lower(): child.get('text', '')
+                                for child in item.get('children', [])})
 
-                # Проверяем все необходимые поля
-                required_fields = ['group', 'surname', 'name', 'patronymic']
-                if all(field in student_data for field in required_fields):
-                    if self.db.insert_student(
-                            student_data['group'],
-                            student_data['surname'],
-                            student_data['name'],
-                            student_data['patronymic']
-                    ):
-                        imported_counts['students'] += 1
-
-    def _process_dict_data(self, data, imported_counts):
+        imported_counts['groups'] += self._import_groups(groups)
+        imported_counts['students'] += self._import_students(students)
+        self._advance(progress, rows=len(items) - len(records))
+        self._import_journal(records, imported_counts, progress)
+
+    def _process_dict_data(self, data, imported_counts, progress=None):
         """Обработка словарных данных (например, из pickle бэкапа)"""
         # Группы
         if 'groups' in data and isinstance(data['groups'], list):
-            for item in data['groups']:
-                if self._import_group_item(item):
-                    imported_counts['groups'] += 1
+            imported_counts['groups'] += self._import_groups(data['groups'])
+            self._advance(progress, rows=len(data['groups']))
 
         # Студенты
         if 'students' in data and isinstance(data['students'], list):
-            for item in data['students']:
-                if self._import_student_item(item):
-                    imported_counts['students'] += 1
+            imported_counts['students'] += self._import_students(data['students'])
+            self._advance(progress, rows=len(data['students']))
 
         # Занятия
         if 'lessons' in data and isinstance(data['lessons'], list):
-            for item in data['lessons']:
-                if self._import_lesson_item(item):
-                    imported_counts['lessons'] += 1
+            imported_counts['lessons'] += self._import_lessons(data['lessons'])
+            self._advance(progress, rows=len(data['lessons']))
 
         # Даты
         if 'dates' in data and isinstance(data['dates'], list):
-            for item in data['dates']:
-                if isinstance(item, str):
-                    # Формат: "YYYY-MM-DD"
-                    parts = item.split('-')
-                    if len(parts) == 3:
-                        year, month, day = parts
-                        if self.db.insert_date(year, month, day):
-                            imported_counts['dates'] += 1
-
-    def _process_list_data(self, data, imported_counts):
+            dates = [date for date in (self._date_value(item) for item in data['dates']) if date]
+            imported_counts['dates'] += self.db.insert_dates(dates)
+            self._advance(progress, rows=len(data['dates']))
+
+        # Журнал
+        if 'journal' in data and isinstance(data['journal'], list):
+            self._import_journal(data['journal'], imported_counts, progress)
+
+    def _process_list_data(self, data, imported_counts, progress=None):
         """Обработка списковых данных"""
+        groups = []
+        students = []
+        records = []
         for item in data:
             # Если это строка - скорее всего группа
             if isinstance(item, str):
-                if self._import_group(item):
-                    imported_counts['groups'] += 1
+                groups.append(item)
+
+            # Кортеж/список из 7 элементов - запись журнала
+            elif isinstance(item, (list, tuple)) and len(item) == len(self.JOURNAL_FIELDS):
+                records.append(item)
 
             # Если это кортеж/список из 4 элементов - студент
             elif isinstance(item, (list, tuple)) and len(item) >= 4:
-                if self.db.insert_student(item[0], item[1], item[2], item[3]):
-                    imported_counts['students'] += 1
+                students.append(item)
+
+        imported_counts['groups'] += self._import_groups(groups)
+        imported_counts['students'] += self._import_students(students)
+        self._advance(progress, rows=len(data) - len(records))
+        self._import_journal(records, imported_counts, progress)
+
+    # --- ПАКЕТНЫЙ ИМПОРТ ---
+
+    @staticmethod
+    def _valid_rows(rows):
+        """Непустые строки без повторов, в порядке первого появления"""
+        return list(dict.fromkeys(row for row in rows if row and all(row)))
+
+    # Отбор новых строк выполняет база: пакет загружается во временную таблицу
+    # и переносится одним INSERT ... SELECT, число добавленных берётся из changes()
+
+    def _import_groups(self, items):
+        """Импорт пакета групп, возвращает количество добавленных"""
+        groups = self._valid_rows((self._group_name(item),) for item in items)
+        if not groups:
+            return 0
+        return self.db.insert_groups(group for group, in groups)
+
+    def _import_students(self, items):
+        """Импорт пакета студентов, возвращает количество добавленных"""
+        students = self._valid_rows(self._student_row(item) for item in items)
+        if not students:
+            return 0
+        return self.db.insert_students(students)
+
+    def _import_lessons(self, items):
+        """Импорт пакета занятий, возвращает количество добавленных"""
+        lessons = self._valid_rows((self._lesson_name(item),) for item in items)
+        if not lessons:
+            return 0
+        return self.db.insert_lessons(lesson for lesson, in lessons)
+
+    def _import_journal(self, items, imported_counts, progress=None):
+        """Импорт пакета записей журнала.
+
+        Недостающие группы, студенты, занятия и даты добавляются пакетно,
+        затем отметки записываются executemany (upsert_journal) по JOURNAL_BATCH_SIZE.
+        """
+        for start in range(0, len(items), self.JOURNAL_BATCH_SIZE):
+            chunk = items[start:start + self.JOURNAL_BATCH_SIZE]
+            records = [record for record in (self._journal_row(item) for item in chunk) if record]
+            if records:
+                imported_counts['groups'] += self._import_groups({record[1] for record in records})
+                imported_counts['students'] += self._import_students({record[1:5] for record in records})
+                imported_counts['lessons'] += self._import_lessons({record[5] for record in records})
+                imported_counts['dates'] += self.db.insert_dates({record[0] for record in records})
+                imported_counts['journal'] += self.db.upsert_journal(records)
+            self._advance(progress, rows=len(chunk))
 
     # --- ВСПОМОГАТЕЛЬНЫЕ МЕТОДЫ ---
 
-    def _import_group(self, group_name):
-        """Импорт группы"""
-        if group_name and not self.db.select_where("Groups", ["group"], {"group": group_name}):
-            return self.db.insert_group(group_name)
-        return False
-
-    def _import_group_item(self, item):
-        """Импорт группы из любого формата"""
+    @staticmethod
+    def _rows_total(data):
+        """Число строк в загруженных данных (для оценки хода импорта)"""
+        if isinstance(data, dict):
+            return sum(len(value) for value in data.values() if isinstance(value, list))
+        if isinstance(data, list):
+            return len(data)
+        return 0
+
+    @staticmethod
+    def _date_value(item):
+        """Дата "YYYY-MM-DD" из строки, кортежа (date,) или словаря; None, если формат не распознан"""
+        if isinstance(item, (list, tuple)) and len(item) > 0:
+            item = item[0]
+        elif isinstance(item, dict):
+            item = item.get('date')
+        if not isinstance(item, str):
+            return None
+        parts = item.strip().split('-')
+        if len(parts) != 3:
+            return None
+        year, month, day = parts
+        try:
+            return f"{year}-{int(month):02d}-{int(day):02d}"
+        except ValueError:
+            return None
+
+    @classmethod
+    def _journal_row(cls, item):
+        """Кортеж (date, group, surname, name, patronymic, lesson, missed_hours) из любого формата"""
+        if isinstance(item, dict):
+            # В XML теги приводятся к нижнему регистру: MissedHours -> missedhours
+            if 'missed_hours' not in item and 'missedhours' in item:
+                item = {**item, 'missed_hours': item['missedhours']}
+            item = [item.get(key) for key in cls.JOURNAL_FIELDS]
+        if not isinstance(item, (list, tuple)) or len(item) < len(cls.JOURNAL_FIELDS):
+            return None
+
+        date = cls._date_value(item[0])
+        names = tuple(str(value).strip() if value is not None else None for value in item[1:6])
+        if not date or not all(names):
+            return None
+
+        missed_hours = item[6]
+        if isinstance(missed_hours, str):
+            missed_hours = missed_hours.strip()
+            missed_hours = int(missed_hours) if missed_hours.isdigit() else (missed_hours or "-")
+        elif missed_hours is None:
+            missed_hours = "-"
+        return (date, *names, missed_hours)
+
+    @staticmethod
+    def _group_name(item):
+        """Название группы из любого формата"""
         if isinstance(item, str):
-            group_name = item
+            return item
         elif isinstance(item, (list, tuple)) and len(item) > 0:
-            group_name = item[0]
+            return item[0]
         elif isinstance(item, dict):
-            group_name = item.get('text') or item.get('name') or item.get('group')
-        else:
-            return False
-
-        return self._import_group(group_name)
+            return item.get('text') or item.get('name') or item.get('group')
+        return None
 
-    def _import_student_item(self, item):
-        """Импорт студента из любого формата"""
+    @staticmethod
+    def _student_row(item):
+        """Кортеж (group, surname, name, patronymic) из любого формата"""
         if isinstance(item, (list, tuple)) and len(item) >= 4:
-            return self.db.insert_student(item[0], item[1], item[2], item[3])
+            return tuple(item[:4])
         elif isinstance(item, dict):
             if all(key in item for key in ['group', 'surname', 'name', 'patronymic']):
-                return self.db.insert_student(
-                    item['group'], item['surname'], item['name'], item['patronymic']
-                )
-        return False
+                return item['group'], item['surname'], item['name'], item['patronymic']
+        return None
 
-    def _import_lesson_item(self, item):
-        """Импорт занятия из любого формата"""
+    @staticmethod
+    def _lesson_name(item):
+        """Название занятия из любого формата"""
         if isinstance(item, str):
-            lesson_name = item
+            return item
         elif isinstance(item, (list, tuple)) and len(item) > 0:
-            lesson_name = item[0]
+            return item[0]
         elif isinstance(item, dict):
-            lesson_name = item.get('text') or item.get('name') or item.get('lesson')
-        else:
-            return False
+            return item.get('text') or item.get('name') or item.get('lesson')
+        return None
 
-        if lesson_name and not self.db.select_where("Lessons", ["lesson"], {"lesson": lesson_name}):
-            return self.db.insert_lesson(lesson_name)
-        return False
+    def _import_group(self, group_name):
+        """Импорт группы"""
+        return self._import_groups([group_name]) == 1
+
+    def _import_group_item(self, item):
+        """Импорт группы из любого формата"""
+        return self._import_groups([item]) == 1
+
+    def _import_student_item(self, item):
+        """Импорт студента из любого формата"""
+        return self._import_students([item]) == 1
+
+    def _import_lesson_item(self, item):
+        """Импорт занятия из любого формата"""
+        return self._import_lessons([item]) == 1
 
     def _generate_import_report(self, imported_counts):
         """Генерация отчета об импорте"""
@@ -299,4 +584,4 @@ class DataImporter:
 
     def get_supported_formats(self):
         """Возвращает список поддерживаемых форматов импорта"""
-        return ['json', 'xml', 'pickle', 'msgpack']
\ No newline at end of file
+        return ['json', 'xml', 'ndjson', 'pickle', 'msgpack']
\ No newline at end of file
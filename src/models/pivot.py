@@ -0,0 +1,284 @@
+import queue
+import threading
+from collections import OrderedDict
+from typing import Any, Iterable, List, Sequence
+
+from src.utils.logger import setup_logger
+
+logger = setup_logger()
+
+# Колонки выборки журнала, из которой строится таблица "ученики x дни"
+JOURNAL_PIVOT_COLUMNS = ["date", "group", "surname", "name", "patronymic", "lesson", "missed_hours",
+                         "id_date", "id_person", "id_lesson"]
+JOURNAL_PIVOT_ORDER = ["surname", "name", "patronymic", "date"]
+
+# Значения, которые можно выбрать в ячейке
+CELL_CHOICES = ("-", 0, 1, 2)
+
+
+class JournalPivot:
+    """Таблица "ученики x дни", построенная из строк журнала.
+
+    Значения лежат в одном плоском списке построчно (cells[r * width + c]),
+    строки и столбцы адресуются индексами, ids - идентификаторами из базы.
+    """
+
+    __slots__ = ("rows_headers", "rows_ids", "columns_headers", "columns_ids", "id_lesson", "cells")
+
+    def __init__(self, rows_headers: List[str], rows_ids: List[Any],
+                 columns_headers: List[str], columns_ids: List[Any],
+                 cells: List[Any], id_lesson: Any = None):
+        self.rows_headers = rows_headers
+        self.rows_ids = rows_ids
+        self.columns_headers = columns_headers
+        self.columns_ids = columns_ids
+        self.cells = cells
+        self.id_lesson = id_lesson
+
+    @property
+    def height(self) -> int:
+        return len(self.rows_ids)
+
+    @property
+    def width(self) -> int:
+        return len(self.columns_ids)
+
+    def get(self, r: int, c: int) -> Any:
+        return self.cells[r * self.width + c]
+
+    def row(self, r: int) -> List[Any]:
+        return self.cells[r * self.width:(r + 1) * self.width]
+
+    def set_values(self) -> List[List[Any]]:
+        """Значения по строкам, в формате CustomSpreadsheet"""
+        return [self.row(r) for r in range(self.height)]
+
+    def cells_values(self, choices: Sequence = CELL_CHOICES) -> tuple:
+        """Варианты выбора для каждой ячейки (один общий кортеж на все ячейки)"""
+        return ((tuple(choices),) * self.width,) * self.height
+
+    def __bool__(self):
+        return bool(self.cells)
+
+    def __repr__(self):
+        return f"JournalPivot({self.height}x{self.width}, id_lesson={self.id_lesson!r})"
+
+
+def pivot_journal(rows: Iterable[Sequence], missing: Any = "-") -> JournalPivot:
+    """Построить JournalPivot из строк с колонками JOURNAL_PIVOT_COLUMNS.
+
+    Один проход по строкам со словарями индексов вместо поиска в списках.
+    Ученики идут в порядке первого появления (порядок сортировки запроса),
+    дни - по возрастанию даты. Ячейки без строки журнала получают missing.
+    """
+    students = {}
+    days = {}
+    rows_headers = []
+    entries = []
+    id_lesson = None
+
+    for row in rows:
+        date, id_date, id_person = row[0], row[7], row[8]
+        r = students.get(id_person)
+        if r is None:
+            r = students[id_person] = len(students)
+            rows_headers.append(f"{row[2]} {row[3]} {row[4]}")
+        if id_date not in days:
+            days[id_date] = date
+        if id_lesson is None:
+            id_lesson = row[9]
+        entries.append((r, id_date, row[6]))
+
+    # Дни упорядочиваются по дате независимо от того, у какого ученика встретились первыми
+    columns_ids = sorted(days, key=days.__getitem__)
+    columns = {id_date: c for c, id_date in enumerate(columns_ids)}
+    width = len(columns_ids)
+
+    cells = [missing] * (len(students) * width)
+    for r, id_date, value in entries:
+        cells[r * width + columns[id_date]] = value
+
+    return JournalPivot(
+        rows_headers=rows_headers,
+        rows_ids=list(students),
+        columns_headers=[days[id_date].split("-")[-1] for id_date in columns_ids],
+        columns_ids=columns_ids,
+        cells=cells,
+        id_lesson=id_lesson,
+    )
+
+
+def load_pivot(db, month: str, group: str, lesson: str) -> JournalPivot:
+    """Выбрать журнал за месяц "YYYY-MM" для группы и предмета и построить таблицу"""
+    rows = db.select_where("Journal", JOURNAL_PIVOT_COLUMNS,
+                           {"date": month, "group": group, "lesson": lesson},
+                           JOURNAL_PIVOT_ORDER)
+    return pivot_journal(rows)
+
+
+class PivotCache:
+    """LRU-кэш построенных таблиц по ключу (month "YYYY-MM", group, lesson).
+
+    Подписывается на изменения DatabaseWork: записи, затронувшие месяц, группу
+    или предмет, удаляют соответствующие таблицы, а изменения отдельных ячеек
+    (upsert_journal_cells) вносятся в закэшированные таблицы на месте.
+    """
+
+    def __init__(self, db, maxsize: int = 16):
+        self.db = db
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        # key -> (pivot, {id_person: r}, {id_date: c})
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # Растёт при каждом изменении базы; таблица, прочитанная до изменения, не кэшируется
+        self._generation = 0
+        db.add_listener(self.invalidate)
+
+    @staticmethod
+    def key(year: str | int, month: str | int, group: str, lesson: str) -> tuple:
+        return f"{year}-{month}", group, lesson
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key: tuple) -> bool:
+        # Проверка без учёта в статистике попаданий
+        return key in self._entries
+
+    def get(self, key: tuple) -> JournalPivot | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        logger.info(f"Pivot cache {'hit' if entry else 'miss'} {key}: hits={self.hits}, misses={self.misses}")
+        return entry[0] if entry else None
+
+    def put(self, key: tuple, pivot: JournalPivot, generation: int = None) -> bool:
+        """Положить таблицу в кэш.
+
+        generation - значение self.generation до начала чтения из базы: если с тех пор
+        база менялась, таблица могла устареть и не сохраняется. Пустые таблицы не кэшируются.
+        """
+        if not pivot:
+            return False
+        rows = {id_person: r for r, id_person in enumerate(pivot.rows_ids)}
+        columns = {id_date: c for c, id_date in enumerate(pivot.columns_ids)}
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return False
+            self._entries[key] = (pivot, rows, columns)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return True
+
+    def fetch(self, key: tuple) -> JournalPivot:
+        """Прочитать таблицу из базы и положить в кэш (можно вызывать из фонового потока)"""
+        generation = self._generation
+        pivot = load_pivot(self.db, *key)
+        self.put(key, pivot, generation)
+        return pivot
+
+    def load(self, key: tuple) -> JournalPivot:
+        """Таблица из кэша, а при промахе - из базы"""
+        pivot = self.get(key)
+        return self.fetch(key) if pivot is None else pivot
+
+    @staticmethod
+    def _matches(key: tuple, scope: tuple) -> bool:
+        return all(value is None or value == part for part, value in zip(key, scope))
+
+    def invalidate(self, scopes: Iterable[tuple] = ((None, None, None),), cells: Iterable[tuple] = ()):
+        """Сбросить таблицы, попадающие в scopes, и обновить в кэше значения cells"""
+        scopes = list(scopes)
+        with self._lock:
+            self._generation += 1
+            stale = [key for key in self._entries if any(self._matches(key, scope) for scope in scopes)]
+            for key in stale:
+                del self._entries[key]
+            for id_date, id_person, id_lesson, value in cells:
+                for pivot, rows, columns in self._entries.values():
+                    if pivot.id_lesson == id_lesson and id_person in rows and id_date in columns:
+                        pivot.cells[rows[id_person] * pivot.width + columns[id_date]] = value
+        if stale:
+            logger.info(f"Pivot cache: {len(stale)} tables invalidated")
+
+    def clear(self):
+        self.invalidate()
+
+
+class PivotPrefetcher:
+    """Фоновая подгрузка таблиц в PivotCache.
+
+    Один рабочий поток выполняет последнее задание prefetch(); новое задание
+    или cancel() отменяют предыдущее перед загрузкой следующей таблицы
+    (уже начатый запрос дорабатывает до конца).
+    """
+
+    def __init__(self, cache: PivotCache):
+        self.cache = cache
+        self._jobs = queue.SimpleQueue()
+        self._token = 0
+        self._lock = threading.Lock()
+        self._thread = None
+        self._idle = threading.Event()
+        self._idle.set()
+
+    def prefetch(self, keys: Iterable[tuple]):
+        """Заменить текущее задание загрузкой keys (уже закэшированные пропускаются)"""
+        with self._lock:
+            self._token += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="pivot-prefetch", daemon=True)
+                self._thread.start()
+            self._idle.clear()
+            self._jobs.put((self._token, list(keys)))
+
+    def cancel(self):
+        with self._lock:
+            self._token += 1
+
+    def wait(self, timeout: float = None) -> bool:
+        """Дождаться выполнения (или отмены) всех заданий"""
+        return self._idle.wait(timeout)
+
+    def close(self):
+        """Отменить задание и дождаться остановки рабочего потока"""
+        with self._lock:
+            self._token += 1
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._jobs.put(None)
+            thread.join()
+
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            token, keys = job
+            loaded = 0
+            for key in keys:
+                if token != self._token:
+                    break
+                if key in self.cache:
+                    continue
+                try:
+                    if self.cache.fetch(key):
+                        loaded += 1
+                except Exception as e:
+                    logger.error(f"Pivot prefetch of {key} failed: {e}")
+            if loaded:
+                logger.info(f"Pivot prefetch: {loaded} tables loaded")
+            with self._lock:
+                if self._jobs.empty():
+                    self._idle.set()
@@ -0,0 +1,105 @@
+import queue
+import threading
+
+from src.utils.logger import setup_logger
+
+logger = setup_logger()
+
+_STOP = object()
+# Повторить запись ячеек, не записанных из-за ошибки
+_RETRY = object()
+
+
+class WriteBehindQueue:
+    """Отложенная запись изменений ячеек журнала.
+
+    Изменения ставятся в ограниченную очередь и сразу возвращают управление;
+    фоновый поток забирает их пачками и пишет через db.upsert_journal_cells одной
+    транзакцией на пачку. Повторные изменения одной ячейки в пачке схлопываются.
+    Пачка, которую не удалось записать, остаётся в pending и пишется повторно
+    вместе со следующей пачкой, при flush() и при close().
+    Запись: (id_date, id_person, id_lesson, missed_hours).
+    """
+
+    def __init__(self, db, maxsize: int = 10000, batch_size: int = 500):
+        self.db = db
+        self.batch_size = batch_size
+        # Ошибка последней неудачной записи; сбрасывается, когда все ячейки записаны
+        self.last_error = None
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._pending = 0
+        # Не записанные из-за ошибки ячейки: (id_date, id_person, id_lesson) -> запись
+        self._failed = {}
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+
+    @property
+    def pending(self) -> int:
+        """Количество изменений, ещё не записанных в базу (включая не записанные из-за ошибки)"""
+        return self._pending
+
+    @property
+    def failed(self) -> list[tuple]:
+        """Ячейки, которые не удалось записать и которые ждут повторной записи"""
+        with self._lock:
+            return list(self._failed.values())
+
+    def put(self, record) -> None:
+        """Поставить изменение в очередь (ждёт, если очередь заполнена)"""
+        if not self._thread.is_alive():
+            raise RuntimeError("Write-behind queue is closed")
+        with self._lock:
+            self._pending += 1
+        self._queue.put(tuple(record))
+
+    def flush(self) -> None:
+        """Дождаться записи всех поставленных изменений, повторив неудачные"""
+        if self._failed and self._thread.is_alive():
+            self._queue.put(_RETRY)
+        self._queue.join()
+
+    def close(self) -> list[tuple]:
+        """Записать оставшиеся изменения и остановить фоновый поток.
+
+        Возвращает ячейки, которые так и не удалось записать.
+        """
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+        return self.failed
+
+    def _take_batch(self) -> tuple[list, bool]:
+        """Забрать из очереди пачку: первую запись ждём, остальные берём без ожидания"""
+        batch = [self._queue.get()]
+        while len(batch) < self.batch_size and batch[-1] is not _STOP:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        stop = batch[-1] is _STOP
+        return (batch[:-1] if stop else batch), stop
+
+    def _run(self):
+        stop = False
+        while not stop:
+            batch, stop = self._take_batch()
+            taken = [record for record in batch if record is not _RETRY]
+            with self._lock:
+                failed, self._failed = self._failed, {}
+            # Последнее значение ячейки побеждает, в том числе над не записанным ранее
+            records = {**failed, **{record[:3]: record for record in taken}}
+            try:
+                if records:
+                    self.db.upsert_journal_cells(list(records.values()))
+                self.last_error = None
+            except Exception as e:
+                self.last_error = e
+                with self._lock:
+                    self._failed = records
+                logger.error(f"Write-behind failed for {len(records)} cells, kept for retry: {e}")
+            finally:
+                with self._lock:
+                    self._pending += len(self._failed) - len(failed) - len(taken)
+                for _ in range(len(batch) + stop):
+                    self._queue.task_done()
@@ -0,0 +1,63 @@
+import json
+from typing import Any, Dict, Iterable, Iterator, Tuple
+
+# Поля записей каждого вида в порядке кортежей базы
+NDJSON_KINDS = {
+    'group': ('group',),
+    'student': ('group', 'surname', 'name', 'patronymic'),
+    'lesson': ('lesson',),
+    'date': ('date',),
+    'journal': ('date', 'group', 'surname', 'name', 'patronymic', 'lesson', 'missed_hours'),
+}
+
+
+class NDJSONSerializer:
+    """Построчный JSON (NDJSON): одна запись {"kind": ..., поля...} на строку.
+
+    Запись и чтение идут через генераторы, файл целиком в памяти не держится.
+    Такие файлы можно делить по строкам, дописывать и склеивать.
+    """
+
+    @staticmethod
+    def to_record(kind: str, values: Iterable) -> Dict[str, Any]:
+        """Запись вида kind из кортежа значений в порядке NDJSON_KINDS[kind]"""
+        return {'kind': kind, **dict(zip(NDJSON_KINDS[kind], values))}
+
+    @staticmethod
+    def save_to_ndjson(records: Iterable[Tuple[str, Iterable]], filename: str, append: bool = False) -> int | None:
+        """Записывает пары (kind, values) по одной на строку.
+
+        Возвращает число записанных строк или None при ошибке.
+        """
+        try:
+            count = 0
+            with open(filename, 'a' if append else 'w', encoding='utf-8', newline='\n') as f:
+                for kind, values in records:
+                    f.write(json.dumps(NDJSONSerializer.to_record(kind, values), ensure_ascii=False))
+                    f.write('\n')
+                    count += 1
+            return count
+        except Exception as e:
+            print(f"NDJSON serialization error: {e}")
+            return None
+
+    @staticmethod
+    def iter_ndjson(source) -> Iterator[Dict[str, Any]]:
+        """Потоково читает NDJSON (имя файла или открытый двоичный файл), по записи на строку.
+
+        Пустые строки пропускаются. Ошибки разбора не перехватываются,
+        в сообщении указывается номер строки.
+        """
+        f = open(source, 'rb') if isinstance(source, str) else source
+        try:
+            for number, line in enumerate(iter(f.readline, b''), 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError as e:
+                    raise ValueError(f"NDJSON line {number}: {e}") from e
+        finally:
+            if f is not source:
+                f.close()
@@ -0,0 +1,87 @@
+import asyncio
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Callable
+
+from src.utils.logger import setup_logger
+
+logger = setup_logger()
+
+
+class TkAsyncBridge:
+    """Доставка результатов фоновых вызовов БД в поток Tk.
+
+    Tk нельзя трогать из рабочих потоков, поэтому готовые результаты складываются
+    в очередь, а поток Tk забирает их через root.after и вызывает callback/errback.
+    """
+
+    def __init__(self, root, async_db, interval: int = 20):
+        self.root = root
+        self.async_db = async_db
+        self.interval = interval
+        self._results = queue.SimpleQueue()
+        self._pending = 0
+        self._polling = False
+        self._loop = None
+        self._loop_lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        """Количество вызовов, результат которых ещё не доставлен"""
+        return self._pending
+
+    def call(self, method: str, *args, callback: Callable = None, errback: Callable = None, **kwargs) -> Future:
+        """Вызвать метод DatabaseWork в фоне, результат передать в callback в потоке Tk"""
+        return self._watch(self.async_db.submit(method, *args, **kwargs), callback, errback)
+
+    def run(self, coroutine, callback: Callable = None, errback: Callable = None) -> Future:
+        """Выполнить корутину (например, asyncio.gather нескольких запросов) в фоновом цикле событий"""
+        return self._watch(asyncio.run_coroutine_threadsafe(coroutine, self._event_loop()), callback, errback)
+
+    def _event_loop(self) -> asyncio.AbstractEventLoop:
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="db-asyncio", daemon=True).start()
+            return self._loop
+
+    def _watch(self, future: Future, callback: Callable, errback: Callable) -> Future:
+        self._pending += 1
+        future.add_done_callback(lambda done: self._results.put((done, callback, errback)))
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.interval, self._poll)
+        return future
+
+    def _poll(self):
+        while True:
+            try:
+                future, callback, errback = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._pending -= 1
+            if future.cancelled():
+                continue
+            try:
+                error = future.exception()
+                if error is None:
+                    if callback:
+                        callback(future.result())
+                elif errback:
+                    errback(error)
+                else:
+                    logger.error(f"Background database call failed: {error}")
+            except Exception as e:
+                logger.error(f"Error in database callback: {e}", exc_info=True)
+
+        if self._pending:
+            self.root.after(self.interval, self._poll)
+        else:
+            self._polling = False
+
+    def close(self):
+        """Остановить фоновый цикл событий и пул потоков"""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        self.async_db.shutdown(wait=False)
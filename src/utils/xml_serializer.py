@@ -1,7 +1,7 @@
 import xml.etree.ElementTree as ET
 from xml.dom import minidom
 import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator
 
 
 class XMLSerializer:
@@ -89,6 +89,35 @@ class XMLSerializer:
             print(f"XML journal serialization error: {e}")
             return False
 
+    @staticmethod
+    def iter_xml(source) -> Iterator[Dict[str, Any]]:
+        """Потоково читает XML (имя файла или открытый двоичный файл), возвращая элементы верхнего уровня
+        в формате load_from_xml()['data'].
+
+        Разобранные элементы сразу удаляются из дерева, поэтому память
+        не зависит от размера файла. Ошибки разбора не перехватываются.
+        """
+        root = None
+        depth = 0
+        for event, elem in ET.iterparse(source, events=("start", "end")):
+            if event == "start":
+                if root is None:
+                    root = elem
+                depth += 1
+                continue
+
+            depth -= 1
+            if depth == 1:
+                yield {
+                    'tag': elem.tag,
+                    'attrs': dict(elem.attrib),
+                    'text': elem.text if elem.text else '',
+                    'children': [{'tag': subchild.tag, 'text': subchild.text if subchild.text else ''}
+                                 for subchild in elem]
+                }
+                # Освобождаем уже обработанные элементы
+                root.clear()
+
     @staticmethod
     def load_from_xml(filename: str) -> Dict[str, Any]:
         """Загружает данные из XML файла (базовый парсинг)."""
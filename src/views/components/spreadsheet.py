@@ -1,5 +1,6 @@
-from typing import List, Dict, Iterable
+from typing import Callable, Dict, Iterable
 import tkinter as tk
+import tkinter.font as tkfont
 
 class AutoHidingScrollbar(tk.Scrollbar):
 
@@ -26,87 +27,96 @@ class AutoHidingScrollbar(tk.Scrollbar):
         raise (tk.TclError, "place cannot be used  with this widget")
 
 
-class CustomLabel(tk.Label):
-    def __init__(self,
-                 master: tk.Misc = None,
-                 set_value: str = None,
-                 menu_values: List = None,
-                 custom_info: dict = None,
-                 **kwargs):
-        super().__init__(master, **kwargs)
-        self._info = custom_info if custom_info else {}
-        self._colors = {}
-        self._default_bg = None
-        var = tk.StringVar()
-        var.set(set_value)
-        self["textvariable"] = var
-        # self.bind("<Button-1>", lambda e: print(self._info))  # TODO: remove
-        self.bind("<Button-1>", lambda e: self.create_menu(e, var, menu_values))
-
-    def create_menu(self, main_event: tk.Event, main_variable: tk.Variable, variables_list: List):
-        def _variable_set(value):
-            main_variable.set(value)
-            if str(value) in self._colors:
-                self.config(bg=self._colors[str(value)])
-            else:
-                self.config(bg=self._default_bg if self._default_bg else self.cget("bg"))
-            main_menu.destroy()
-
-        def _destroy_menu(event):  # noqa
-            pass
-            # if event.widget is main_menu:
-            #     print(event.widget)  # TODO: some stuff needed here, if one of the variables is bigger than the others
-            # event.widget.destroy()
-
-        main_menu = tk.Toplevel()
-        # TODO: choose between <Button-1> and <Leave>
-        # main_menu.bind("<Button-1>", lambda e: e.widget.destroy())  # For destroying menu on clicking outside
-        main_menu.bind("<Leave>", lambda e: _destroy_menu(e))  # For destroying menu when leaving it
-        main_menu.overrideredirect(True)  # Removes border
-
-        default_bg = main_menu.cget("bg")  # Store default background color
-
-        for txt in variables_list:
-            my_lab = tk.Label(main_menu, text=txt, padx=10, pady=6,
-                              borderwidth=2, relief="solid",
-                              font=("Noto Sans Mono", 15))  # TkFixedFont if needed
-            my_lab.pack(side='top')
-            my_lab.bind('<Enter>', lambda _e: _e.widget.config(bg='gray'))
-            my_lab.bind('<Leave>', lambda _e: _e.widget.config(bg=default_bg))
-            my_lab.bind('<Button-1>', lambda _e: _variable_set(_e.widget.cget("text")))
-
-        main_menu.update_idletasks()
-        main_menu.grab_set()
-        w = main_menu.winfo_width()
-        h = main_menu.winfo_height()
-        main_menu.geometry("%dx%d+%d+%d" % (w, h, main_event.x_root, main_event.y_root + 10))
+class CellValuePicker:
+    """Всплывающий список значений для ячейки.
 
-    @property
-    def colors(self):
-        return self._colors
+    Окно одно на всё приложение (на каждое верхнее окно): оно создаётся при первом
+    клике, затем только перемещается, заполняется новыми значениями и скрывается,
+    поэтому число окон и меток не растёт от количества кликов.
+    """
 
-    @colors.setter
-    def colors(self, colors: Dict[str, str]):
-        self._colors = colors
+    FONT = ("Noto Sans Mono", 15)  # TkFixedFont if needed
 
-    @property
-    def default_bg(self):
-        return self._default_bg
+    def __init__(self, master: tk.Misc):
+        self._master = master
+        self._window = None
+        self._labels = []
+        self._default_bg = None
+        self._on_select = None
+
+    @classmethod
+    def for_widget(cls, widget: tk.Misc) -> "CellValuePicker":
+        """Общий выборщик для верхнего окна, в котором находится widget"""
+        toplevel = widget.winfo_toplevel()
+        picker = getattr(toplevel, "_cell_value_picker", None)
+        if picker is None:
+            picker = cls(toplevel)
+            toplevel._cell_value_picker = picker
+        return picker
+
+    def _build(self):
+        self._window = tk.Toplevel(self._master)
+        self._window.withdraw()
+        self._window.overrideredirect(True)  # Removes border
+        self._default_bg = self._window.cget("bg")
+        self._labels = []
+        # Привязка окна срабатывает и для меток внутри него, и (во время grab) для кликов снаружи
+        self._window.bind("<Button-1>", self._press)
+        self._window.bind("<Escape>", lambda _e: self.hide())
+
+    def _label(self, index: int) -> tk.Label:
+        while len(self._labels) <= index:
+            label = tk.Label(self._window, padx=10, pady=6, borderwidth=2, relief="solid", font=self.FONT)
+            label.bind('<Enter>', lambda _e: _e.widget.config(bg='gray'))
+            label.bind('<Leave>', lambda _e: _e.widget.config(bg=self._default_bg))
+            self._labels.append(label)
+        return self._labels[index]
+
+    def show(self, event: tk.Event, values: Iterable, on_select: Callable):
+        """Показать значения рядом с курсором; on_select(value) вызывается при выборе"""
+        if self._window is None or not self._window.winfo_exists():
+            self._build()
+        self._on_select = on_select
+
+        values = list(values)
+        for index, value in enumerate(values):
+            label = self._label(index)
+            label.config(text=value, bg=self._default_bg)
+            label.pack(side='top')
+        for label in self._labels[len(values):]:
+            label.pack_forget()
+
+        self._window.geometry("+%d+%d" % (event.x_root, event.y_root + 10))
+        self._window.deiconify()
+        self._window.lift()
+        self._window.focus_set()
+        self._window.grab_set()
+
+    def hide(self):
+        if self._window is not None and self._window.winfo_exists():
+            self._window.grab_release()
+            self._window.withdraw()
+        self._on_select = None
+
+    def _press(self, event: tk.Event):
+        on_select = self._on_select
+        value = event.widget.cget("text") if event.widget in self._labels else None
+        self.hide()
+        if value is not None and on_select:
+            on_select(value)
 
-    @default_bg.setter
-    def default_bg(self, value: str):
-        self._default_bg = value
 
-    @property
-    def custom_info(self) -> dict:
-        return self._info if self._info else {"info": None}
+class CustomSpreadsheet(tk.Frame):
+    """Таблица, нарисованная на Canvas.
 
-    @custom_info.setter
-    def custom_info(self, value: dict) -> None:
-        self._info = value
+    Ячейки - прямоугольники и тексты холста, причём создаются только для видимой
+    области: при прокрутке элементы ушедших из вида ячеек переиспользуются для
+    появившихся. Поэтому время открытия не зависит от размера таблицы.
+    """
 
+    CELL_FONT = ("Arial", 15)
+    HOVER_COLOR = "gray"
 
-class CustomSpreadsheet(tk.Frame):
     def __init__(self,
                  master: tk.Misc = None,
                  columns: int = 0,
@@ -118,14 +128,40 @@ class CustomSpreadsheet(tk.Frame):
                  cells_colors: Dict[str, str] = None,
                  **kwargs):
         super().__init__(master, **kwargs)
-        self._cells = {}
+        # on_change(row_id, column_id, value) - вызывается при изменении ячейки
+        self.on_change = None
+        self._info = {}
 
         self._canvas = None
-
-        self._frame = None
         self._ver_scrollbar = None
         self._hor_scrollbar = None
 
+        # Модель таблицы
+        self._rows = 0
+        self._columns = 0
+        self._rows_headers = ()
+        self._columns_headers = ()
+        self._rows_ids = ()
+        self._columns_ids = ()
+        self._set_values = ()
+        self._values = []
+        self._cells_values = ()
+        self._colors = {}
+
+        # Геометрия
+        self._cell_width = 0
+        self._cell_height = 0
+        self._header_width = 0
+        self._header_height = 0
+
+        # Нарисованные элементы: (r, c) -> (rect, text), r -> text, c -> text; и свободные элементы
+        self._visible_cells = {}
+        self._visible_rows = {}
+        self._visible_columns = {}
+        self._free_cells = []
+        self._free_headers = []
+        self._hover = None
+
         self.create(columns=columns,
                     rows=rows,
                     columns_headers=columns_headers,
@@ -143,12 +179,10 @@ class CustomSpreadsheet(tk.Frame):
                set_values: Iterable[Iterable] = None,
                cells_values: Iterable[Iterable[Iterable]] = None,
                cells_colors: Dict[str, str] = None,
-               ignore_errors: bool = False) -> bool:
-        def custom_cell_color(value):
-            if str(value) in cells_colors:
-                return cells_colors[str(value)]
-            return None
-
+               ignore_errors: bool = False,
+               rows_ids: Iterable = None,
+               columns_ids: Iterable = None,
+               info: dict = None) -> bool:
         errors = []
         critical_error = False
         if columns == 0 or rows == 0:
@@ -168,6 +202,9 @@ class CustomSpreadsheet(tk.Frame):
             cells_values = tuple()
         if cells_colors is None:
             cells_colors = {}
+        # Стабильные идентификаторы строк и столбцов (например, id_person и id_date)
+        rows_ids = tuple(rows_ids) if rows_ids is not None else tuple(rows_headers)
+        columns_ids = tuple(columns_ids) if columns_ids is not None else tuple(columns_headers)
 
         if not ignore_errors:
             for i in errors:
@@ -176,70 +213,339 @@ class CustomSpreadsheet(tk.Frame):
         if critical_error:
             return False
 
-        self._canvas = tk.Canvas(self)
-
-        self._frame = tk.Frame(self._canvas)
-
-        self._ver_scrollbar = AutoHidingScrollbar(self._canvas, command=self._canvas.yview, orient="vertical")
-        self._hor_scrollbar = AutoHidingScrollbar(self._canvas, command=self._canvas.xview, orient="horizontal")
-
+        if self._canvas:
+            # Повторное создание без clear() - убираем старый холст
+            self.clear()
+        self._info = dict(info) if info else {}
+
+        self._rows = rows
+        self._columns = columns
+        self._rows_headers = tuple(rows_headers)
+        self._columns_headers = tuple(columns_headers)
+        self._rows_ids = rows_ids
+        self._columns_ids = columns_ids
+        self._set_values = set_values
+        self._values = [list(row) for row in set_values]
+        self._cells_values = cells_values
+        self._colors = cells_colors
+
+        self._canvas = tk.Canvas(self, highlightthickness=0)
+        self._ver_scrollbar = AutoHidingScrollbar(self._canvas, command=self._yview, orient="vertical")
+        self._hor_scrollbar = AutoHidingScrollbar(self._canvas, command=self._xview, orient="horizontal")
         self._canvas.configure(xscrollcommand=self._hor_scrollbar.set,
                                yscrollcommand=self._ver_scrollbar.set)
 
-        self._canvas.create_window((0, 0), window=self._frame, anchor="nw")
-
         self._ver_scrollbar.pack(side="right", fill="y")
         self._hor_scrollbar.pack(side="bottom", fill="x")
         self._canvas.pack(side="top", fill="both", expand=True)
 
-        for r in range(rows):
-            tk.Label(self._frame, text=rows_headers[r]).grid(row=r + 1, column=0, sticky="w")
-            self._cells[f"{r}__{rows_headers[r]}"] = {}
-            for c in range(columns):
-                if r == 0:
-                    tk.Label(self._frame, text=columns_headers[c]).grid(row=0, column=c + 1)
-                if str(set_values[r][c]) in cells_colors:
-                    bg = cells_colors[str(set_values[r][c])]
-                else:
-                    bg = None
-                entry = CustomLabel(self._frame,
-                                    width=3,
-                                    justify="center",
-                                    borderwidth=1,
-                                    relief="solid",
-                                    font=("Arial", 15),
-                                    set_value=set_values[r][c],
-                                    menu_values=cells_values[r][c])
-                default_bg = entry.cget("bg")
-                entry.colors = cells_colors
-                entry.default_bg = default_bg
-                entry.config(bg=bg if bg else default_bg)
-                entry.bind('<Enter>', lambda _e: _e.widget.config(bg='gray'))
-                entry.bind('<Leave>', lambda _e:
-                _e.widget.config(
-                    bg=custom_cell_color(_e.widget.cget("text"))
-                    if str(_e.widget.cget("text")) in cells_colors
-                    else default_bg
-                ))
-                entry.grid(row=r + 1, column=c + 1)
-                self._cells[f"{r}__{rows_headers[r]}"][f"{c}__{columns_headers[c]}"] = entry
-
-        tk.Label(self._frame, text="", padx=8).grid(row=9998, column=9998)
-
-        self._canvas.update_idletasks()
-        self._canvas.configure(scrollregion=self._canvas.bbox("all"))
+        # Размеры ячеек считаем по шрифту, а не по создаваемым виджетам
+        font = tkfont.Font(font=self.CELL_FONT)
+        header_font = tkfont.nametofont("TkDefaultFont")
+        self._cell_width = font.measure("000") + 8
+        self._cell_height = font.metrics("linespace") + 6
+        self._header_width = max((header_font.measure(str(i)) for i in self._rows_headers), default=0) + 12
+        self._header_height = header_font.metrics("linespace") + 6
+        self._canvas.configure(scrollregion=(0, 0,
+                                             self._header_width + self._columns * self._cell_width + 8,
+                                             self._header_height + self._rows * self._cell_height),
+                               xscrollincrement=self._cell_width,
+                               yscrollincrement=self._cell_height)
+
+        self._canvas.bind("<Configure>", self._render)
+        self._canvas.bind("<Button-1>", self._click)
+        self._canvas.bind("<Motion>", self._motion)
+        self._canvas.bind("<Leave>", lambda _e: self._set_hover(None))
+        self._canvas.bind("<MouseWheel>", self._wheel)
+        self._canvas.bind("<Shift-MouseWheel>", self._wheel)
+        self._canvas.bind("<Button-4>", self._wheel)
+        self._canvas.bind("<Button-5>", self._wheel)
+        self._canvas.bind("<Shift-Button-4>", self._wheel)
+        self._canvas.bind("<Shift-Button-5>", self._wheel)
+
+        self._render()
+        return True
 
+    def update_values(self,
+                      set_values: Iterable[Iterable],
+                      columns_headers: Iterable = None,
+                      rows_headers: Iterable = None,
+                      cells_values: Iterable[Iterable[Iterable]] = None,
+                      cells_colors: Dict[str, str] = None,
+                      rows_ids: Iterable = None,
+                      columns_ids: Iterable = None,
+                      info: dict = None) -> bool:
+        """Обновить таблицу на месте, не пересоздавая холст.
+
+        Нарисованные ячейки переиспользуются: меняются только отличающиеся тексты
+        и цвета, лишние строки и столбцы скрываются, недостающие дорисовываются.
+        Заголовки, меню и цвета, которые не переданы, остаются прежними.
+        (Название update занято tk.Misc.update.)
+        """
+        set_values = [list(row) for row in set_values]
+        rows = len(set_values)
+        columns = len(set_values[0]) if rows else 0
+        rows_headers = tuple(rows_headers) if rows_headers is not None else self._rows_headers
+        columns_headers = tuple(columns_headers) if columns_headers is not None else self._columns_headers
+        cells_values = cells_values if cells_values is not None else self._cells_values
+        cells_colors = cells_colors if cells_colors is not None else self._colors
+        if not rows or not columns:
+            self.clear()
+            return False
+        if (not self._canvas or
+                len(rows_headers) != rows or len(columns_headers) != columns or
+                len(cells_values) < rows):
+            # Нечего переиспользовать или форма задана не полностью - строим заново
+            return self.create(columns=columns, rows=rows,
+                               columns_headers=columns_headers, rows_headers=rows_headers,
+                               set_values=set_values, cells_values=cells_values, cells_colors=cells_colors,
+                               rows_ids=rows_ids, columns_ids=columns_ids, info=info)
+
+        old_values, old_colors = self._values, self._colors
+        old_rows_headers, old_columns_headers = self._rows_headers, self._columns_headers
+
+        self._rows = rows
+        self._columns = columns
+        self._rows_headers = rows_headers
+        self._columns_headers = columns_headers
+        self._rows_ids = tuple(rows_ids) if rows_ids is not None else rows_headers
+        self._columns_ids = tuple(columns_ids) if columns_ids is not None else columns_headers
+        self._set_values = set_values
+        self._values = [list(row) for row in set_values]
+        self._cells_values = cells_values
+        self._colors = cells_colors
+        self._info = dict(info) if info else self._info
+
+        header_font = tkfont.nametofont("TkDefaultFont")
+        header_width = max((header_font.measure(str(i)) for i in rows_headers), default=0) + 12
+        if header_width != self._header_width:
+            # Сдвинулись все столбцы - раскладываем видимые элементы заново
+            self._header_width = header_width
+            self._release_all()
+        self._canvas.configure(scrollregion=(0, 0,
+                                             self._header_width + self._columns * self._cell_width + 8,
+                                             self._header_height + self._rows * self._cell_height))
+
+        # Ячейки и заголовки, которые остались в таблице, обновляем только при отличии
+        colors_changed = old_colors != cells_colors
+        for (r, c), (rect, text) in list(self._visible_cells.items()):
+            if r >= rows or c >= columns:
+                del self._visible_cells[(r, c)]
+                self._hide(rect, text)
+                self._free_cells.append((rect, text))
+                continue
+            value = str(self._values[r][c])
+            if value != str(old_values[r][c]):
+                self._canvas.itemconfigure(text, text=value)
+            if (value != str(old_values[r][c]) or colors_changed) and (r, c) != self._hover:
+                self._canvas.itemconfigure(rect, fill=self._cell_color(r, c))
+        for headers, old_headers, visible in ((rows_headers, old_rows_headers, self._visible_rows),
+                                              (columns_headers, old_columns_headers, self._visible_columns)):
+            for index, item in list(visible.items()):
+                if index >= len(headers):
+                    del visible[index]
+                    self._hide(item)
+                    self._free_headers.append(item)
+                elif str(headers[index]) != str(old_headers[index]):
+                    self._canvas.itemconfigure(item, text=str(headers[index]))
+        if self._hover and (self._hover[0] >= rows or self._hover[1] >= columns):
+            self._hover = None
+
+        # Появившиеся строки и столбцы
+        self._render()
         return True
 
+    def _release_all(self):
+        """Скрыть все нарисованные элементы и вернуть их в свободные"""
+        for items in self._visible_cells.values():
+            self._hide(*items)
+            self._free_cells.append(items)
+        for item in (*self._visible_rows.values(), *self._visible_columns.values()):
+            self._hide(item)
+            self._free_headers.append(item)
+        self._visible_cells.clear()
+        self._visible_rows.clear()
+        self._visible_columns.clear()
+
     def clear(self):
         if self._canvas:
             self._canvas.destroy()
-        if self._cells:
-            self._cells.clear()
+            self._canvas = None
+        self._visible_cells.clear()
+        self._visible_rows.clear()
+        self._visible_columns.clear()
+        self._free_cells.clear()
+        self._free_headers.clear()
+        self._hover = None
+        self._rows = self._columns = 0
+        self._set_values = ()
+        self._values = []
+
+    # --- ОТРИСОВКА ---
+
+    def _xview(self, *args):
+        self._canvas.xview(*args)
+        self._render()
+
+    def _yview(self, *args):
+        self._canvas.yview(*args)
+        self._render()
+
+    def _wheel(self, event):
+        if event.num == 4:
+            step = -1
+        elif event.num == 5:
+            step = 1
+        else:
+            step = -1 if event.delta > 0 else 1
+        if event.state & 0x0001:  # Shift - горизонтальная прокрутка
+            self._xview("scroll", step, "units")
+        else:
+            self._yview("scroll", step, "units")
+
+    def _visible_range(self) -> tuple[range, range]:
+        """Строки и столбцы, попадающие в видимую область холста"""
+        left = self._canvas.canvasx(0)
+        top = self._canvas.canvasy(0)
+        right = left + self._canvas.winfo_width()
+        bottom = top + self._canvas.winfo_height()
+        first_c = max(0, int((left - self._header_width) // self._cell_width))
+        last_c = min(self._columns, int((right - self._header_width) // self._cell_width) + 1)
+        first_r = max(0, int((top - self._header_height) // self._cell_height))
+        last_r = min(self._rows, int((bottom - self._header_height) // self._cell_height) + 1)
+        return range(first_r, last_r), range(first_c, last_c)
+
+    def _render(self, _event=None):
+        """Нарисовать видимые ячейки, переиспользуя элементы ушедших из вида"""
+        if not self._canvas or not self._rows or not self._columns:
+            return
+        rows, columns = self._visible_range()
+        cells = {(r, c) for r in rows for c in columns}
+
+        for key in [key for key in self._visible_cells if key not in cells]:
+            items = self._visible_cells.pop(key)
+            self._hide(*items)
+            self._free_cells.append(items)
+        for r in [r for r in self._visible_rows if r not in rows]:
+            item = self._visible_rows.pop(r)
+            self._hide(item)
+            self._free_headers.append(item)
+        for c in [c for c in self._visible_columns if c not in columns]:
+            item = self._visible_columns.pop(c)
+            self._hide(item)
+            self._free_headers.append(item)
+
+        for r, c in cells:
+            if (r, c) not in self._visible_cells:
+                self._visible_cells[(r, c)] = self._draw_cell(r, c)
+        for r in rows:
+            if r not in self._visible_rows:
+                self._visible_rows[r] = self._draw_header(
+                    6, self._header_height + r * self._cell_height + self._cell_height / 2,
+                    self._rows_headers[r], "w")
+        for c in columns:
+            if c not in self._visible_columns:
+                self._visible_columns[c] = self._draw_header(
+                    self._header_width + c * self._cell_width + self._cell_width / 2,
+                    self._header_height / 2, self._columns_headers[c], "center")
+
+    def _hide(self, *items):
+        for item in items:
+            self._canvas.itemconfigure(item, state="hidden")
+
+    def _cell_color(self, r: int, c: int) -> str:
+        if (r, c) == self._hover:
+            return self.HOVER_COLOR
+        return self._colors.get(str(self._values[r][c]), self.cget("bg"))
+
+    def _draw_cell(self, r: int, c: int) -> tuple[int, int]:
+        x = self._header_width + c * self._cell_width
+        y = self._header_height + r * self._cell_height
+        if self._free_cells:
+            rect, text = self._free_cells.pop()
+            self._canvas.coords(rect, x, y, x + self._cell_width, y + self._cell_height)
+            self._canvas.coords(text, x + self._cell_width / 2, y + self._cell_height / 2)
+        else:
+            rect = self._canvas.create_rectangle(x, y, x + self._cell_width, y + self._cell_height,
+                                                 outline="black")
+            text = self._canvas.create_text(x + self._cell_width / 2, y + self._cell_height / 2,
+                                            font=self.CELL_FONT)
+        self._canvas.itemconfigure(rect, fill=self._cell_color(r, c), state="normal")
+        self._canvas.itemconfigure(text, text=str(self._values[r][c]), state="normal")
+        return rect, text
+
+    def _draw_header(self, x: float, y: float, text: str, anchor: str) -> int:
+        if self._free_headers:
+            item = self._free_headers.pop()
+            self._canvas.coords(item, x, y)
+            self._canvas.itemconfigure(item, text=str(text), anchor=anchor, state="normal")
+            return item
+        return self._canvas.create_text(x, y, text=str(text), anchor=anchor)
+
+    def _refresh_cell(self, r: int, c: int):
+        if (r, c) in self._visible_cells:
+            rect, text = self._visible_cells[(r, c)]
+            self._canvas.itemconfigure(rect, fill=self._cell_color(r, c))
+            self._canvas.itemconfigure(text, text=str(self._values[r][c]))
+
+    # --- ВЗАИМОДЕЙСТВИЕ ---
+
+    def _cell_at(self, event: tk.Event) -> tuple[int, int] | None:
+        """Ячейка под курсором (вместо привязок на каждом виджете)"""
+        x = self._canvas.canvasx(event.x) - self._header_width
+        y = self._canvas.canvasy(event.y) - self._header_height
+        if x < 0 or y < 0:
+            return None
+        r, c = int(y // self._cell_height), int(x // self._cell_width)
+        if r >= self._rows or c >= self._columns:
+            return None
+        return r, c
+
+    def _set_hover(self, cell: tuple[int, int] | None):
+        if cell == self._hover:
+            return
+        previous, self._hover = self._hover, cell
+        if previous:
+            self._refresh_cell(*previous)
+        if cell:
+            self._refresh_cell(*cell)
+
+    def _motion(self, event: tk.Event):
+        self._set_hover(self._cell_at(event))
+
+    def _click(self, event: tk.Event):
+        cell = self._cell_at(event)
+        if cell:
+            self._create_menu(event, *cell)
+
+    def _create_menu(self, main_event: tk.Event, r: int, c: int):
+        CellValuePicker.for_widget(self).show(main_event, self._cells_values[r][c],
+                                              lambda value: self.set_value(r, c, value))
+
+    def set_value(self, r: int, c: int, value):
+        """Изменить значение ячейки (как при выборе из меню).
+
+        on_change получает только действительно изменённые ячейки, адресованные
+        идентификаторами строки и столбца; их запись ведёт очередь write-behind.
+        """
+        if str(self._values[r][c]) == str(value):
+            return
+        self._values[r][c] = value
+        self._refresh_cell(r, c)
+        if self.on_change:
+            self.on_change(self._rows_ids[r], self._columns_ids[c], value)
+
+    @property
+    def info(self) -> dict:
+        """Дополнительные сведения о загруженной таблице (например, id_lesson)"""
+        return self._info
 
     @property
-    def cells(self) -> Dict[str, Dict[str, CustomLabel]]:
-        return self._cells
+    def cells(self) -> Dict[str, Dict[str, str]]:
+        """Значения ячеек в виде {"r__заголовок строки": {"c__заголовок столбца": значение}}"""
+        return {f"{r}__{self._rows_headers[r]}": {f"{c}__{self._columns_headers[c]}": self._values[r][c]
+                                                  for c in range(self._columns)}
+                for r in range(self._rows)}
 
 
 class Main:
@@ -262,8 +568,8 @@ class Main:
         def print_cells():
             # print(spreadsheet.cells)
             for row_header, row in spreadsheet.cells.items():
-                for column_header, cell in row.items():
-                    print(f"{cell.cget('text')}", end=" ;; ")
+                for column_header, value in row.items():
+                    print(f"{value}", end=" ;; ")
                 print()
 
         self.root = tk.Tk()
@@ -1,15 +1,21 @@
+import asyncio
 import subprocess
 import sys
 import tkinter as tk
 import os
 from calendar import monthrange
 from tkinter import ttk
-from datetime import datetime
+from datetime import date, datetime
 import platform
 from tkinter.messagebox import showerror, showinfo
 
 from src.views.components.spreadsheet import CustomSpreadsheet
+from src.models.async_database import AsyncDatabase
+from src.models.pivot import PivotCache
+from src.models.write_behind import WriteBehindQueue
 from src.utils.i18n import _
+from src.utils.tk_async import TkAsyncBridge
+from src.utils.validators import Validator
 from src.utils.logger import setup_logger
 from tkinter import filedialog
 
@@ -25,8 +31,17 @@ class MainWindow:
         #self.root.geometry("1000x500")
 
         self.root.title(_("app_title"))
+        # Закрытие окна завершает работу так же, как пункт меню "Выход"
+        self.root.protocol("WM_DELETE_WINDOW", self.close_program)
 
         self.spreadsheet = None
+        # Запросы к БД выполняются в фоне, результаты возвращаются в поток Tk
+        self.db_async = TkAsyncBridge(self.root, AsyncDatabase(self.controller.db))
+        # Изменения ячеек пишутся в базу фоновым потоком
+        self.write_behind = WriteBehindQueue(self.controller.db)
+        self._spreadsheet_request = None
+        # Запланированное обновление счётчика ожидающих записи ячеек (id root.after)
+        self._pending_after = None
 
         self._setup_menu()
         self._setup_main_frame()
@@ -60,6 +75,10 @@ class MainWindow:
             label=_("title_export_json"),
             command=self.controller.export_json
         )
+        export_menu.add_command(
+            label=_("title_export_ndjson"),
+            command=self.controller.export_ndjson
+        )
         export_menu.add_separator()
 
         # XML Export Submenu
@@ -309,6 +328,9 @@ class MainWindow:
                 if not year:
                     info_label["text"] = _("err_no_year")
                     return
+                if not Validator.is_valid_year(year):
+                    info_label["text"] = _("err_invalid_year")
+                    return
 
                 is_empty = not bool(self.controller.db.select_where("Dates", ["date"], {"date": f"{year}-{month}"}))
 
@@ -316,11 +338,10 @@ class MainWindow:
                     info_label["text"] = _("err_date_exists")
                     return
 
-                days = [i for i in range(1, monthrange(int(year), int(month))[1] + 1)]
-                for day in days:
-                    day = f"0{day}" if day < 10 else day
-                    self.controller.db.insert_date(year, month, day, autocommit=False)
-                self.controller.db._db.commit()
+                last_day = monthrange(int(year), int(month))[1]
+                self.controller.db.insert_dates(
+                    self.controller.db.date_range(date(int(year), int(month), 1),
+                                                  date(int(year), int(month), last_day)))
 
                 info_label["text"] = _("success_added")
 
@@ -328,21 +349,18 @@ class MainWindow:
                 def confirmation_window_yes(confirm_window):
                     _old_days = self._get_date("day", o_year, o_month)
                     _new_days = [i for i in range(1, monthrange(int(n_year), int(n_month))[1] + 1)]
-                    if len(_old_days) < len(_new_days):
-                        for _day in _new_days[len(_old_days):]:
-                            self.controller.db.insert_date(o_year, o_month, _day)
-                    for _day in _new_days:
-                        _day = f"0{_day}" if _day < 10 else _day
-                        self.controller.db.update_date(o_year, o_month, _day,
-                                                       n_year, n_month, _day,
-                                                       autocommit=False)
-                    self.controller.db._db.commit()
-                    is_has_old = self.controller.db.select_where("Dates", ["date"], {"date": o_date})
-                    if is_has_old:
+                    with self.controller.db.transaction():
+                        if len(_old_days) < len(_new_days):
+                            for _day in _new_days[len(_old_days):]:
+                                self.controller.db.insert_date(o_year, o_month, _day)
+                        for _day in _new_days:
+                            _day = f"0{_day}" if _day < 10 else _day
+                            self.controller.db.update_date(o_year, o_month, _day,
+                                                           n_year, n_month, _day)
+                        is_has_old = self.controller.db.select_where("Dates", ["date"], {"date": o_date})
                         for i in is_has_old:
                             j = i[0].split("-")
-                            self.controller.db.delete_date(j[0], j[1], j[2], autocommit=False)
-                        self.controller.db._db.commit()
+                            self.controller.db.delete_date(j[0], j[1], j[2])
 
                     confirm_window.destroy()
                     info_label["text"] = _("success_edited")
@@ -383,10 +401,10 @@ class MainWindow:
 
             if _action == _("btn_delete"):
                 def confirmation_window_yes(confirm_window):
-                    for i in self.controller.db.select_where("Dates", ["date"], {"date": f"{year}-{month}"}):
-                        j = i[0].split("-")
-                        self.controller.db.delete_date(j[0], j[1], j[2], autocommit=False)
-                    self.controller.db._db.commit()
+                    with self.controller.db.transaction():
+                        for i in self.controller.db.select_where("Dates", ["date"], {"date": f"{year}-{month}"}):
+                            j = i[0].split("-")
+                            self.controller.db.delete_date(j[0], j[1], j[2])
                     confirm_window.destroy()
                     info_label["text"] = _("success_deleted")
 
@@ -471,8 +489,9 @@ class MainWindow:
         filename = filedialog.askopenfilename(
             title="Select file to import",
             filetypes=[
-                ("All supported files", "*.json *.xml *.pkl *.pickle *.msgpack"),
+                ("All supported files", "*.json *.ndjson *.jsonl *.xml *.pkl *.pickle *.msgpack"),
                 ("JSON files", "*.json"),
+                ("NDJSON files", "*.ndjson *.jsonl"),
                 ("XML files", "*.xml"),
                 ("Pickle files", "*.pkl *.pickle"),
                 ("MessagePack files", "*.msgpack"),
@@ -486,21 +505,48 @@ class MainWindow:
                 self.controller.show_error("Import Error", f"Файл не найден: {filename}")
                 return
 
-            # Проверяем размер файла
-            try:
-                file_size = os.path.getsize(filename)
-                if file_size > 10 * 1024 * 1024:  # 10 MB
-                    confirm = self.controller.ask_confirmation(
-                        "Large File",
-                        f"Файл очень большой ({file_size / 1024 / 1024:.1f} MB). Продолжить импорт?"
-                    )
-                    if not confirm:
-                        return
-            except Exception as e:
-                self.controller.show_error("Import Error", f"Не удалось проверить файл: {str(e)}")
+            # Размер проверяет контроллер, импорт идёт в фоне
+            self.controller.auto_detect_and_import(filename)
+
+    def show_import_progress(self, progress):
+        """Окно хода импорта с кнопкой отмены; закрывается по завершении импорта.
+
+        Окно модальное: импорт держит блокировку записи до конца транзакции,
+        и диалоги, пишущие в базу, не должны ждать её в потоке интерфейса.
+        """
+        window = tk.Toplevel(self.root)
+        window.title(_("title_import_progress"))
+        window.resizable(False, False)
+        window.transient(self.root)
+        window.grab_set()
+
+        bar = ttk.Progressbar(window, length=int(300 * sys_multiplier), maximum=1.0)
+        bar.pack(padx=10, pady=(10, 5))
+        info_label = tk.Label(window, justify="left")
+        info_label.pack(padx=10)
+        cancel_button = tk.Button(window, text=_("btn_cancel"), command=progress.cancel)
+        cancel_button.pack(pady=(5, 10))
+        # Закрытие окна означает отмену импорта
+        window.protocol("WM_DELETE_WINDOW", progress.cancel)
+
+        def refresh():
+            if progress.finished:
+                window.destroy()
                 return
+            bar["value"] = progress.fraction
+            eta = progress.eta
+            info_label["text"] = _("label_import_progress").format(
+                read=progress.bytes_read / 1024 / 1024,
+                total=progress.total_bytes / 1024 / 1024,
+                rows=progress.rows,
+                eta="..." if eta is None else f"{eta:.0f}"
+            )
+            if progress.cancelled:
+                cancel_button.config(state="disabled")
+            window.after(200, refresh)
 
-            self.controller.auto_detect_and_import(filename)
+        refresh()
+        return window
 
     def group_window(self, action: str):
         window_geometry_x = f"{int(300 * sys_multiplier)}"
@@ -1076,7 +1122,21 @@ class MainWindow:
         if hasattr(self.controller, 'save_current_state'):
             self.controller.save_current_state()
 
-        # Закрываем БД и окно
+        if self._pending_after is not None:
+            self.root.after_cancel(self._pending_after)
+            self._pending_after = None
+
+        # Незавершённый импорт откатывается, чтобы не ждать его до конца
+        self.controller.cancel_import()
+
+        # Дописываем отложенные изменения, закрываем БД и окно
+        unwritten = self.write_behind.close()
+        if unwritten:
+            logger.error(f"Write-behind: {len(unwritten)} cells not saved on close: {unwritten}")
+            showerror(title=_("err_save_failed"),
+                      message=f"{_('err_unsaved_cells')}: {len(unwritten)}\n{self.write_behind.last_error}")
+        self.controller.prefetcher.close()
+        self.db_async.close()
         self.controller.db.close()
         self.root.destroy()
 
@@ -1090,91 +1150,85 @@ class MainWindow:
 
     def _setup_main_frame(self):
         def create_spreadsheet():
+            # Таблица берётся из кэша, а при промахе журнал загружается и сворачивается в фоне
+            selection = (self.year.get(), self.month.get(), self.groups.get(), self.lessons.get())
+            self._spreadsheet_request = selection
+            key = PivotCache.key(*selection)
+            pivot = self.controller.pivot_cache.get(key)
+            if pivot is not None:
+                show_spreadsheet(selection, pivot)
+                return
+            self.db_async.run(
+                asyncio.to_thread(self.controller.pivot_cache.fetch, key),
+                callback=lambda pivot: show_spreadsheet(selection, pivot),
+                errback=lambda e: showerror(title=_("err_no_data"), message=str(e))
+            )
+
+        def show_spreadsheet(selection, pivot):
+            if selection != self._spreadsheet_request:
+                # Пока шёл запрос, выбор изменился
+                return
+
             colors = {
                 "0": "#9EE2C0",
                 "1": "#F5E2B5",
                 "2": "#FF8477",
             }
 
-            temp_journal = self.controller.db.select_where(
-                "Journal",
-                ["date", "group", "surname", "name", "patronymic", "lesson", "missed_hours"],
-                {
-                    "date": f"{self.year.get()}-{self.month.get()}",
-                    "group": self.groups.get(),
-                    "lesson": self.lessons.get()
-                },
-                ["surname", "name", "patronymic", "date"]
-            )
-
-            if not temp_journal:
+            if not pivot:
+                self.spreadsheet.clear()
                 showerror(title=_("err_no_data"),
                           message=_("err_no_data") + "\n" + _("err_no_data") + ".")
                 self.root.focus_set()
                 return
 
-            days = []
-            students = []
-            spreadsheet_set_values = []
-            temp_student = 0
-
-            for i in temp_journal:
-                day = i[0].split("-")[-1]
-                student = f"{i[2]} {i[3]} {i[4]}"
-                if student != temp_student:
-                    temp_student = student
-                    spreadsheet_set_values.append([])
-                spreadsheet_set_values[-1].append(i[6])
-                if day not in days:
-                    days.append(day)
-                if student not in students:
-                    students.append(student)
-
-            spreadsheet_width = len(days)
-            spreadsheet_height = len(students)
-            spreadsheet_cells_values = tuple(
-                tuple(
-                    ("-", 0, 1, 2)
-                    for _ in range(spreadsheet_width)
-                )
-                for _ in range(spreadsheet_height)
+            # Таблица той же формы обновляется на месте, без пересоздания холста
+            self.spreadsheet.update_values(
+                pivot.set_values(),
+                columns_headers=pivot.columns_headers,
+                rows_headers=pivot.rows_headers,
+                cells_values=pivot.cells_values(),
+                cells_colors=colors,
+                rows_ids=pivot.rows_ids,
+                columns_ids=pivot.columns_ids,
+                info={"id_lesson": pivot.id_lesson}
             )
 
-            self.spreadsheet.create(
-                columns=spreadsheet_width,
-                rows=spreadsheet_height,
-                columns_headers=days,
-                rows_headers=students,
-                set_values=spreadsheet_set_values,
-                cells_values=spreadsheet_cells_values,
-                cells_colors=colors
-            )
+            # Пока интерфейс простаивает, подгружаем вероятные следующие таблицы
+            self.root.after_idle(prefetch_neighbours, selection)
+
+        def prefetch_neighbours(selection):
+            if selection == self._spreadsheet_request:
+                self.controller.prefetch_neighbours(*selection, lessons=self.lessons["values"])
+
+        def queue_cell_change(id_person, id_date, missed_hours):
+            # Ячейка адресуется идентификаторами, а не разбором заголовков
+            self.write_behind.put((id_date, id_person, self.spreadsheet.info["id_lesson"], missed_hours))
+            update_pending_label()
 
-            temp_journal.clear()
+        def update_pending_label():
+            # Опрос очереди всегда один: прежнее обновление заменяется новым
+            if self._pending_after is not None:
+                self.root.after_cancel(self._pending_after)
+                self._pending_after = None
+            pending = self.write_behind.pending
+            pending_label["text"] = f"{_('label_pending_writes')}: {pending}" if pending else ""
+            if pending:
+                self._pending_after = self.root.after(200, update_pending_label)
 
         def save_spreadsheet():
-            for row_header, row in self.spreadsheet.cells.items():
-                for column_header, cell in row.items():
-                    new_missed_hours = cell.cget("text")
-                    old_date = f"{self.year.get()}-{self.month.get()}-{column_header.split('__')[1]}"
-                    old_group = self.groups.get()
-                    old_surname = row_header.split("__")[1].split(" ")[0]
-                    old_name = row_header.split("__")[1].split(" ")[1]
-                    old_patronymic = row_header.split("__")[1].split(" ")[2]
-                    old_lesson = self.lessons.get()
-                    self.controller.db._db.execute(
-                        f"""
-                    UPDATE "Journal"
-                    SET "missed_hours" = "{new_missed_hours}"
-                    WHERE "date" = "{old_date}" AND
-                        "group" = "{old_group}" AND
-                        "surname" = "{old_surname}" AND
-                        "name" = "{old_name}" AND
-                        "patronymic" = "{old_patronymic}" AND
-                        "lesson" = "{old_lesson}"
-                    ;""")
-
-            self.controller.db._db.commit()
+            if self.controller.import_running:
+                # Базу держит импорт: ячейки остаются в очереди и запишутся после него
+                showinfo(title=_("title_import_progress"), message=_("info_import_running"))
+                return
+            # Изменения уже в очереди записи - дожидаемся, пока она опустеет
+            # (не записанные ранее ячейки при этом пишутся повторно)
+            self.write_behind.flush()
+            update_pending_label()
+            if self.write_behind.last_error:
+                # Ячейки остаются в очереди и будут записаны при следующей попытке
+                showerror(title=_("err_save_failed"), message=str(self.write_behind.last_error))
+                return
             showinfo(title=_("success_saved"), message=_("success_saved") + ".")
 
         def force_create_spreadsheet(self):
@@ -1184,8 +1238,12 @@ class MainWindow:
                 self.filtering()
 
         def filtering():
+            # Подгрузка для прежнего выбора больше не нужна
+            self.controller.cancel_prefetch()
             if self.year.get():
-                self.month["values"] = [""] + self._get_date("month", self.year.get())
+                year = self.year.get()
+                self.db_async.call("date_parts", "month", year,
+                                   callback=lambda months: self._set_months(year, months))
             else:
                 self.month.set("")
                 self.month["values"] = []
@@ -1201,9 +1259,10 @@ class MainWindow:
                 self.root.after(500, self.controller.save_current_state)
 
             if all([self.year.get(), self.month.get(), self.groups.get(), self.lessons.get()]):
-                self._update_spreadsheet_only()
+                # Таблица не очищается: новые значения лягут поверх текущих
                 create_spreadsheet()
             else:
+                self._spreadsheet_request = None
                 self._update_spreadsheet_only()
 
         filtering_frame = tk.Frame(self.root)
@@ -1234,6 +1293,7 @@ class MainWindow:
         filtering_frame.pack(fill="x", pady=5)
 
         self.spreadsheet = CustomSpreadsheet(self.root)
+        self.spreadsheet.on_change = queue_cell_change
         self.spreadsheet.pack(fill="both", expand=True)
 
         bottom = tk.Frame(self.root)
@@ -1247,6 +1307,8 @@ class MainWindow:
 
         tk.Button(bottom_buttons, text=_("btn_save"), command=save_spreadsheet).pack(side="left")
         tk.Button(bottom_buttons, text=_("btn_reset"), command=self.main_frame_reset).pack(side="right")
+        pending_label = tk.Label(bottom_buttons, text="")
+        pending_label.pack(side="right")
 
         color_placeholder = " " * 4
         tk.Label(bottom_color_labels, text=color_placeholder, bg="green").pack(side="left")
@@ -1263,25 +1325,33 @@ class MainWindow:
         """Обновить только таблицу без сброса значений комбобоксов"""
         self.spreadsheet.clear()
 
-    def _load_combobox_values(self):
-        """Загрузить доступные значения в комбобоксы"""
-        # Годы
-        self.year["values"] = [""] + [i for i in self._get_date()]
+    def _load_combobox_values(self, months: bool = True):
+        """Загрузить значения комбобоксов в фоне: годы, месяцы выбранного года, группы и предметы"""
+        db = self.db_async.async_db
+        year = self.year.get() if months else ""
+
+        async def load():
+            return await asyncio.gather(
+                db.date_parts("year"),
+                db.date_parts("month", year) if year else asyncio.sleep(0, None),
+                db.having_individual_return("Groups", ["group"], ["group"]),
+                db.having_individual_return("Lessons", ["lesson"], ["lesson"]),
+            )
 
-        # Месяцы (зависит от выбранного года)
-        selected_year = self.year.get()
-        if selected_year:
-            self.month["values"] = [""] + [i for i in self._get_date("month", selected_year)]
-        else:
-            self.month["values"] = []
+        def apply(result):
+            years, months_data, groups_data, lessons_data = result
+            self.year["values"] = [""] + years
+            if months_data is not None:
+                self._set_months(year, months_data)
+            self.groups["values"] = [""] + [i[0] for i in groups_data]
+            self.lessons["values"] = [""] + [i[0] for i in lessons_data]
 
-        # Группы
-        groups_data = self.controller.db.having_individual_return("Groups", ["group"], ["group"])
-        self.groups["values"] = [""] + [i[0] for i in groups_data] if groups_data else [""]
+        self.db_async.run(load(), callback=apply)
 
-        # Предметы
-        lessons_data = self.controller.db.having_individual_return("Lessons", ["lesson"], ["lesson"])
-        self.lessons["values"] = [""] + [i[0] for i in lessons_data] if lessons_data else [""]
+    def _set_months(self, year: str, months: list[str]):
+        """Показать месяцы года, если за время запроса выбор года не изменился"""
+        if self.year.get() == year:
+            self.month["values"] = [""] + months
 
     def _initial_main_frame_setup(self):
         """Начальная настройка основного фрейма без перезаписи сохраненного состояния"""
@@ -1289,25 +1359,14 @@ class MainWindow:
         self.spreadsheet.clear()
 
         # Загружаем доступные значения в комбобоксы
-        self.year["values"] = [""] + [i for i in self._get_date()]
         self.month["values"] = []  # Будет установлено при выборе года
-        groups_data = self.controller.db.having_individual_return("Groups", ["group"], ["group"])
-        self.groups["values"] = [""] + [i[0] for i in groups_data] if groups_data else [""]
-        lessons_data = self.controller.db.having_individual_return("Lessons", ["lesson"], ["lesson"])
-        self.lessons["values"] = [""] + [i[0] for i in lessons_data] if lessons_data else [""]
+        self._load_combobox_values(months=False)
 
     def main_frame_reset(self, only_spreadsheet: bool = False, only_combobox_values: bool = False):
         def clear_combobox_values():
-            self.year["values"] = [""] + [i for i in self._get_date()]
-            if self.year.get():
-                self.month["values"] = [""] + [i for i in self._get_date("month", self.year.get())]
-            else:
+            if not self.year.get():
                 self.month["values"] = []
-            self.groups["values"] = [""] + [i[0] for i in
-                                            self.controller.db.having_individual_return("Groups", ["group"], ["group"])]
-            self.lessons["values"] = [""] + [i[0] for i in
-                                             self.controller.db.having_individual_return("Lessons", ["lesson"],
-                                                                                         ["lesson"])]
+            self._load_combobox_values()
 
         if only_combobox_values:
             clear_combobox_values()
@@ -1332,24 +1391,5 @@ class MainWindow:
         self.root.mainloop()
 
     def _get_date(self, select_type: str = "year", year: str = None, month: str = None):
-        command_select = 'SELECT DISTINCT strftime("%Y", "date") AS "year"'
-        command_where = ""
-        command_order = ' ORDER BY "year"'
-        if select_type == "month" or select_type == "day":
-            command_select += ', strftime("%m", "date") AS "month"'
-            command_where += f' WHERE "year" IS "{year}"'
-            command_order += ', "month"'
-        if select_type == "day":
-            command_select += ', strftime("%d", "date") AS "day"'
-            command_where += f' AND "month" IS "{month}"'
-            command_order += ', "day"'
-        command = f'{command_select} FROM "Dates" {command_where} {command_order};'
-        cursor = self.controller.db._db.cursor()
-        cursor.execute(command)
-        result = cursor.fetchall()
-        cursor.close()
-        if select_type == "month":
-            return [i[1] for i in result]
-        if select_type == "day":
-            return [i[2] for i in result]
-        return [i[0] for i in result]
\ No newline at end of file
+        """Годы, месяцы или дни, для которых есть даты (синхронно, для окон редактирования)"""
+        return self.controller.db.date_parts(select_type, year, month)
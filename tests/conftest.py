@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """Путь к временной базе; каталог вместе с -wal/-shm и файлами экспорта удаляет pytest"""
+    return str(tmp_path / "journal.db")
@@ -0,0 +1,112 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.models.async_database import AsyncDatabase
+from src.models.database import DatabaseWork
+from src.utils.tk_async import TkAsyncBridge
+
+
+class FakeRoot:
+    """Замена tk.Tk: after() только запоминает отложенные вызовы"""
+
+    def __init__(self):
+        self.scheduled = []
+        self.thread = threading.get_ident()
+
+    def after(self, delay, function):
+        self.scheduled.append(function)
+
+    def run_pending(self, timeout=5.0):
+        """Прокрутить "главный цикл", пока есть отложенные вызовы"""
+        import time
+        deadline = time.monotonic() + timeout
+        while self.scheduled and time.monotonic() < deadline:
+            function = self.scheduled.pop(0)
+            function()
+            time.sleep(0.01)
+
+
+class TestAsyncDatabase:
+    """Тесты асинхронного фасада и моста в поток Tk"""
+
+    @pytest.fixture(autouse=True)
+    def setup_db(self, db_path):
+        self.db_path = db_path
+        self.db = DatabaseWork(self.db_path)
+        self.db.create()
+        self.db.insert_group("Группа А")
+        self.async_db = AsyncDatabase(self.db)
+        yield
+        self.async_db.shutdown()
+        self.db.close()
+
+    def test_coroutines(self):
+        """Запросы и изменения доступны как корутины"""
+        async def scenario():
+            assert await self.async_db.insert_group("Группа Б") is True
+            groups, lessons = await asyncio.gather(
+                self.async_db.having_individual_return("Groups", ["group"], ["group"]),
+                self.async_db.having_individual_return("Lessons", ["lesson"]),
+            )
+            return groups, lessons
+
+        groups, lessons = asyncio.run(scenario())
+        assert groups == [("Группа А",), ("Группа Б",)]
+        assert lessons == []
+
+    def test_runs_off_calling_thread(self):
+        """Методы выполняются в пуле потоков, а не в вызывающем потоке"""
+        self.db.thread_id = threading.get_ident
+        assert self.async_db.submit("thread_id").result() != threading.get_ident()
+        assert asyncio.run(self.async_db.call("_read", "SELECT 1;")) == [(1,)]
+
+    def test_unknown_method(self):
+        with pytest.raises(AttributeError):
+            self.async_db.drop_everything
+
+    def test_bridge_delivers_on_root_thread(self):
+        """Результат и ошибка приходят в callback через root.after"""
+        root = FakeRoot()
+        bridge = TkAsyncBridge(root, self.async_db)
+        results = []
+        errors = []
+
+        bridge.call("select_where", "Groups", ["group"], None,
+                    callback=lambda rows: results.append((threading.get_ident(), rows)))
+        bridge.call("delete_lesson", "Нет такого", errback=errors.append)
+        assert bridge.pending == 2
+        root.run_pending()
+
+        assert results == [(root.thread, [("Группа А",)])]
+        assert len(errors) == 1 and isinstance(errors[0], ValueError)
+        assert bridge.pending == 0
+        assert not root.scheduled
+
+    def test_bridge_runs_coroutines(self):
+        """Корутины выполняются в фоновом цикле событий"""
+        root = FakeRoot()
+        bridge = TkAsyncBridge(root, self.async_db)
+        results = []
+
+        async def both():
+            return await asyncio.gather(self.async_db.having("Groups", {"group": "Группа А"}),
+                                        self.async_db.having("Groups", {"group": "Группа Б"}))
+
+        bridge.run(both(), callback=results.append)
+        root.run_pending()
+        bridge.close()
+        assert results == [[True, False]]
+
+    def test_date_parts_query(self):
+        """Части дат доступны как корутина и передаются параметрами"""
+        self.db.insert_dates(["2023-12-31", "2024-01-02", "2024-02-01", "2024-02-03"])
+
+        async def parts():
+            return await asyncio.gather(self.async_db.date_parts("year"),
+                                        self.async_db.date_parts("month", "2024"),
+                                        self.async_db.date_parts("day", "2024", "02"),
+                                        self.async_db.date_parts("month", '2024" OR 1 IS 1 --'))
+
+        assert asyncio.run(parts()) == [["2023", "2024"], ["01", "02"], ["01", "03"], []]
@@ -0,0 +1,103 @@
+import sqlite3
+import threading
+
+import pytest
+
+from src.models.connections import ReaderPool
+from src.models.database import DatabaseWork
+
+
+class TestReaderPool:
+    """Тесты пула читающих соединений"""
+
+    @pytest.fixture(autouse=True)
+    def setup_db(self, db_path):
+        self.db_path = db_path
+        self.db = DatabaseWork(self.db_path, readers=2)
+        self.db.create()
+        self.db.insert_group("Группа А")
+        yield
+        self.db.close()
+
+    def test_pool_connections_are_read_only(self):
+        """Через читающее соединение нельзя изменить базу"""
+        with self.db._readers.connection() as connection:
+            with pytest.raises(sqlite3.OperationalError):
+                connection.execute('INSERT INTO "Groups" ("group") VALUES (?);', ("Группа Б",))
+
+    def test_pool_size_is_bounded(self):
+        """Соединений создаётся не больше размера пула"""
+        pool = ReaderPool(self.db_path, size=2)
+        try:
+            with pool.connection() as first, pool.connection() as second:
+                assert first is not second
+            with pool.connection() as third:
+                assert third in (first, second)
+            assert len(pool._all) == 2
+        finally:
+            pool.close()
+
+    def test_own_uncommitted_writes_are_visible(self):
+        """Внутри транзакции чтение видит собственные изменения"""
+        with self.db.transaction():
+            self.db.insert_group("Группа Б")
+            assert self.db.having("Groups", {"group": "Группа Б"})
+
+    def test_read_does_not_wait_for_writer(self):
+        """Чтение из другого потока не ждёт открытую транзакцию записи"""
+        started = threading.Event()
+        release = threading.Event()
+
+        def write():
+            with self.db.transaction():
+                self.db.insert_group("Группа Б")
+                started.set()
+                release.wait(5)
+
+        writer = threading.Thread(target=write)
+        writer.start()
+        try:
+            assert started.wait(5)
+            # Видны только зафиксированные данные
+            rows = []
+            reader = threading.Thread(target=lambda: rows.extend(
+                self.db.select_where("Groups", ["group"], None, ["group"])))
+            reader.start()
+            reader.join(2)
+            assert not reader.is_alive()
+            assert rows == [("Группа А",)]
+        finally:
+            release.set()
+            writer.join()
+        assert self.db.having("Groups", {"group": "Группа Б"})
+
+    def test_concurrent_reads_and_writes(self):
+        """Потоки читают и пишут одновременно без ошибок check_same_thread"""
+        errors = []
+
+        def work(index):
+            try:
+                for i in range(20):
+                    self.db.insert_lesson(f"Предмет {index}-{i}")
+                    self.db.select_where("Lessons", ["lesson"], {"lesson": f"Предмет {index}"})
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=work, args=(i,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert errors == []
+        assert len(self.db.having_individual_return("Lessons", ["lesson"])) == 80
+
+    def test_memory_database_without_pool(self):
+        """База в памяти работает через единственное соединение"""
+        db = DatabaseWork(":memory:")
+        try:
+            db.create()
+            assert db._readers is None
+            assert db.insert_group("Группа А") is True
+            assert db.having("Groups", {"group": "Группа А"})
+        finally:
+            db.close()
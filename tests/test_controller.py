@@ -170,6 +170,57 @@ class TestAppController:
         self.controller.auto_detect_and_import("test.json")
         self.controller.show_error.assert_called_with("Error", "Импортер не доступен")
 
+    def test_large_import_confirmed_once_and_run_in_background(self):
+        """Тест импорта: одно подтверждение, разбор файла в фоне"""
+        self.controller.importer = Mock()
+        self.controller.importer.inspect_file.return_value = ('json', 20 * 1024 * 1024)
+        self.controller.importer.needs_confirmation.return_value = True
+
+        progress = self.controller.auto_detect_and_import("big.json")
+
+        self.controller.ask_confirmation.assert_called_once()
+        self.mock_view.show_import_progress.assert_called_once_with(progress)
+        coroutine = self.mock_view.db_async.run.call_args.args[0]
+        coroutine.close()
+        self.controller.importer.import_file.assert_not_called()
+
+    def test_second_import_refused_while_running(self):
+        """Тест импорта: второй импорт не начинается, пока идёт первый"""
+        self.controller.importer = Mock()
+        self.controller.importer.inspect_file.return_value = ('xml', 100)
+        self.controller.importer.needs_confirmation.return_value = False
+
+        progress = self.controller.auto_detect_and_import("first.xml")
+        self.mock_view.db_async.run.call_args.args[0].close()
+        assert self.controller.import_running
+
+        assert self.controller.auto_detect_and_import("second.xml") is None
+        self.controller.show_error.assert_called_once()
+        assert self.mock_view.db_async.run.call_count == 1
+
+        self.controller.cancel_import()
+        assert progress.cancelled
+
+        # После завершения первого импорта можно начать следующий
+        progress.finished = True
+        self.controller._finish_import((False, "Импорт отменён, изменения не сохранены"))
+        assert not self.controller.import_running
+        assert self.controller.auto_detect_and_import("second.xml") is not None
+        self.mock_view.db_async.run.call_args.args[0].close()
+
+    def test_import_without_view_is_synchronous(self):
+        """Тест импорта без интерфейса"""
+        self.controller.view = None
+        self.controller.importer = Mock()
+        self.controller.importer.inspect_file.return_value = ('xml', 100)
+        self.controller.importer.needs_confirmation.return_value = False
+        self.controller.importer.import_file.return_value = (True, "ok")
+
+        self.controller.auto_detect_and_import("data.xml")
+
+        self.controller.ask_confirmation.assert_not_called()
+        self.controller.show_info.assert_called_once_with("Импорт завершен", "ok")
+
     def test_close_program(self):
         """Тест закрытия программы"""
         self.controller.close_program()
@@ -177,6 +228,17 @@ class TestAppController:
         self.mock_db.close.assert_called_once()
         self.mock_root.destroy.assert_called_once()
 
+    def test_prefetch_neighbours(self):
+        """Тест выбора таблиц для фоновой подгрузки"""
+        self.controller.prefetcher = Mock()
+
+        self.controller.prefetch_neighbours("2024", "12", "Group A", "Math", ["", "Math", "Physics"])
+
+        keys = self.controller.prefetcher.prefetch.call_args.args[0]
+        assert keys == [("2025-01", "Group A", "Math"),
+                        ("2024-11", "Group A", "Math"),
+                        ("2024-12", "Group A", "Physics")]
+
     def test_main_frame_reset(self):
         """Тест сброса главного фрейма"""
         self.controller.main_frame_reset(only_combobox_values=True)
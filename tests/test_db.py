@@ -1,7 +1,9 @@
 import os
 import tempfile
+import threading
 import pytest
 import sqlite3
+from unittest.mock import patch
 
 from src.models.database import DatabaseWork
 
@@ -193,16 +195,16 @@ class TestDatabaseWorkFixed:
             # Прямой SQL запрос для вставки
             cursor = self.db._db.cursor()
             cursor.execute(
-                '''INSERT OR IGNORE INTO "Journal" 
-                (date, "group", surname, name, patronymic, lesson, missed_hours)
-                VALUES ("2024-01-15", "Группа А", "Иванов", "Иван", "Иванович", "Математика", 2)'''
+                '''INSERT OR IGNORE INTO "Journal"
+                (id_date, id_person, id_lesson, missed_hours)
+                SELECT id_date, id_person, id_lesson, 2 FROM "Dates", "Students", "Lessons"'''
             )
             self.db._db.commit()
 
             # Проверяем вставку
             cursor.execute(
-                '''SELECT date, "group", surname, name, patronymic, lesson, missed_hours 
-                   FROM "Journal"'''
+                '''SELECT date, "group", surname, name, patronymic, lesson, missed_hours
+                   FROM "JournalView"'''
             )
             journal = cursor.fetchall()
             cursor.close()
@@ -321,4 +323,723 @@ class TestDatabaseWorkFixed:
         try:
             self.db.close()  # Второй вызов
         except:
-            pass  # Ожидаемо
\ No newline at end of file
+            pass  # Ожидаемо
+
+class TestJournalMigration:
+    """Тесты перехода журнала на целочисленные ключи"""
+
+    LEGACY_ROWS = [
+        ("2024-01-15", "Группа А", "Иванов", "Иван", "Иванович", "Математика", 2),
+        ("2024-01-16", "Группа А", "Иванов", "Иван", "Иванович", "Математика", "-"),
+        ("2024-01-15", "Группа Б", "Петров", "Пётр", "Петрович", "Физика", 1),
+    ]
+
+    @pytest.fixture(autouse=True)
+    def setup_db(self, db_path):
+        self.db_path = db_path
+        self._create_legacy()
+
+        self.db = DatabaseWork(self.db_path)
+        self.db.create()
+        yield
+        self.db.close()
+
+    def _create_legacy(self, extra: str = ""):
+        """Старая схема: журнал хранит строки вместо ключей"""
+        legacy = sqlite3.connect(self.db_path)
+        legacy.executescript("""
+        CREATE TABLE "Dates" ("id_date" INTEGER PRIMARY KEY AUTOINCREMENT, "date" DATE);
+        CREATE TABLE "Groups" ("id_group" INTEGER PRIMARY KEY AUTOINCREMENT, "group" varchar(255));
+        CREATE TABLE "Students" ("id_person" INTEGER PRIMARY KEY AUTOINCREMENT, "group" varchar(255),
+                                 "surname" varchar(255), "name" varchar(255), "patronymic" varchar(255));
+        CREATE TABLE "Lessons" ("id_lesson" INTEGER PRIMARY KEY AUTOINCREMENT, "lesson" varchar(255));
+        CREATE TABLE "Journal" ("id" INTEGER PRIMARY KEY AUTOINCREMENT, "date" DATE, "group" varchar(255),
+                                "surname" varchar(255), "name" varchar(255), "patronymic" varchar(255),
+                                "lesson" varchar(255), "missed_hours" INTEGER);
+        INSERT INTO "Dates" ("date") VALUES ('2024-01-15');
+        INSERT INTO "Groups" ("group") VALUES ('Группа А');
+        INSERT INTO "Students" ("group", "surname", "name", "patronymic")
+        VALUES ('Группа А', 'Иванов', 'Иван', 'Иванович');
+        INSERT INTO "Lessons" ("lesson") VALUES ('Математика');
+        """ + extra)
+        legacy.executemany('INSERT INTO "Journal" ("date", "group", "surname", "name", "patronymic", '
+                           '"lesson", "missed_hours") VALUES (?, ?, ?, ?, ?, ?, ?)', self.LEGACY_ROWS)
+        legacy.commit()
+        legacy.close()
+
+    def test_journal_uses_integer_keys(self):
+        """После миграции журнал ссылается на справочники по id"""
+        columns = self.db._journal_columns()
+        assert columns == ["id", "id_date", "id_person", "id_lesson", "missed_hours"]
+
+    def test_rows_preserved(self):
+        """Все записи журнала сохраняются, недостающие справочники дополняются"""
+        journal = self.db.having_individual_return(
+            "Journal",
+            ["date", "group", "surname", "name", "patronymic", "lesson", "missed_hours"]
+        )
+        assert sorted(journal, key=str) == sorted(self.LEGACY_ROWS, key=str)
+        assert self.db.having("Students", {"surname": "Петров"})
+        assert self.db.having("Lessons", {"lesson": "Физика"})
+        assert self.db.having("Dates", {"date": "2024-01-16"})
+
+    def test_groups_completed_from_journal(self):
+        """Группы, встречающиеся только в журнале, добавляются в справочник"""
+        assert self.db.having_individual_return("Groups", ["group"], ["group"]) == [("Группа А",), ("Группа Б",)]
+
+    def test_dropped_rows_are_logged(self):
+        """Строки, которые нельзя перенести, отбрасываются с предупреждением в логе"""
+        legacy = sqlite3.connect(self.db_path)
+        legacy.execute('DROP TABLE "Journal";')
+        legacy.execute('CREATE TABLE "Journal" ("id" INTEGER PRIMARY KEY AUTOINCREMENT, "date" DATE, '
+                       '"group" varchar(255), "surname" varchar(255), "name" varchar(255), '
+                       '"patronymic" varchar(255), "lesson" varchar(255), "missed_hours" INTEGER);')
+        legacy.executemany('INSERT INTO "Journal" ("date", "group", "surname", "name", "patronymic", '
+                           '"lesson", "missed_hours") VALUES (?, ?, ?, ?, ?, ?, ?)',
+                           [self.LEGACY_ROWS[0], self.LEGACY_ROWS[0], (None, *self.LEGACY_ROWS[0][1:])])
+        legacy.commit()
+        legacy.close()
+
+        with patch("src.models.database.logger") as mock_logger:
+            self.db.create()
+
+        assert self.db._db.execute('SELECT COUNT(*) FROM "Journal"').fetchone()[0] == 1
+        mock_logger.warning.assert_called_once()
+        assert "dropped 2 rows" in mock_logger.warning.call_args.args[0]
+
+    def test_null_in_directories_does_not_drop_rows(self):
+        """NULL в справочниках старой базы не мешает дополнить их из журнала"""
+        self.db.close()
+        os.remove(self.db_path)
+        self._create_legacy(extra="""
+        INSERT INTO "Dates" ("date") VALUES (NULL);
+        INSERT INTO "Lessons" ("lesson") VALUES (NULL);
+        """)
+
+        with patch("src.models.database.logger") as mock_logger:
+            self.db = DatabaseWork(self.db_path)
+            self.db.create()
+
+        journal = self.db.having_individual_return(
+            "Journal",
+            ["date", "group", "surname", "name", "patronymic", "lesson", "missed_hours"]
+        )
+        assert sorted(journal, key=str) == sorted(self.LEGACY_ROWS, key=str)
+        mock_logger.warning.assert_not_called()
+
+    def test_migration_runs_once(self):
+        """Повторный create() не трогает уже мигрированную базу"""
+        assert self.db._migrate_journal() is False
+        self.db.create()
+        assert self.db._db.execute('SELECT COUNT(*) FROM "Journal"').fetchone()[0] == len(self.LEGACY_ROWS)
+
+    def test_updates_follow_references(self):
+        """Переименование студента видно в журнале без обновления самого журнала"""
+        self.db.update_student("Группа А", "Иванов", "Иван", "Иванович",
+                               "Группа А", "Сидоров", "Иван", "Иванович")
+        rows = self.db.select_where("Journal", ["surname"], {"date": "2024-01", "surname": "Сидоров"})
+        assert len(rows) == 2
+
+    def test_delete_cascades_to_journal(self):
+        """Удаление даты удаляет её записи журнала"""
+        self.db.delete_date("2024", "01", "15")
+        assert self.db._db.execute('SELECT COUNT(*) FROM "Journal"').fetchone()[0] == 1
+
+
+class TestIndexes:
+    """Проверка планов запросов на горячих путях"""
+
+    @pytest.fixture(autouse=True)
+    def setup_db(self, db_path):
+        self.db_path = db_path
+        self.db = DatabaseWork(self.db_path)
+        self.db.create()
+        self.db.test_data()
+        yield
+        self.db.close()
+
+    def _plan(self, command: str, parameters: tuple = ()) -> str:
+        rows = self.db._db.execute(f"EXPLAIN QUERY PLAN {command}", parameters).fetchall()
+        return "\n".join(row[-1] for row in rows)
+
+    def test_indexes_created(self):
+        """Все управляемые индексы существуют"""
+        from src.models.database import DatabaseIndexes
+        names = {row[0] for row in self.db._db.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+        for name, _, _ in DatabaseIndexes.All:
+            assert name in names
+
+    def test_indexes_added_to_existing_database(self):
+        """Индексы появляются и у базы, созданной без них"""
+        self.db._db.execute('DROP INDEX "idx_journal_date"')
+        self.db._db.commit()
+        self.db.create()
+        names = {row[0] for row in self.db._db.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+        assert "idx_journal_date" in names
+
+    def test_stored_rows_query_uses_journal_key(self):
+        """Выборка сохранённых записей ищет журнал по ключу ячейки"""
+        plan = self._plan(
+            'SELECT "date", "surname", "name", "patronymic", "missed_hours" FROM "JournalView" '
+            'WHERE "date" LIKE ? AND "group" IS ? AND "lesson" IS ? '
+            'ORDER BY "surname", "name", "patronymic", "date"',
+            ("2007-09%", "10701123", "Философия")
+        )
+        assert "SEARCH Journal USING INDEX sqlite_autoindex_Journal_1" in plan
+        assert "INDEX idx_students_group_fio" in plan
+        assert "SCAN Journal" not in plan
+
+    def test_spreadsheet_query_uses_indexes(self):
+        """Выборка таблицы (через сетку ячеек) не сканирует журнал и студентов"""
+        plan = self._plan(
+            'SELECT "date", "surname", "name", "patronymic", "missed_hours" FROM "JournalGrid" '
+            'WHERE "date" LIKE ? AND "group" IS ? AND "lesson" IS ? '
+            'ORDER BY "surname", "name", "patronymic", "date"',
+            ("2007-09%", "10701123", "Философия")
+        )
+        assert "SEARCH Journal USING INDEX sqlite_autoindex_Journal_1" in plan
+        assert "INDEX idx_students_group_fio" in plan
+        assert "SCAN Journal" not in plan
+        assert "SCAN Students" not in plan
+
+    def test_delete_date_uses_index(self):
+        """Каскадное удаление даты находит записи журнала по индексу"""
+        plan = self._plan('DELETE FROM "Journal" WHERE "id_date" = ?', (1,))
+        assert "idx_journal_date" in plan
+
+    def test_student_lookup_uses_index(self):
+        """Поиск студента по кортежу использует индекс"""
+        plan = self._plan(
+            'SELECT COUNT(*) FROM "Students" '
+            'WHERE "group" IS ? AND "surname" IS ? AND "name" IS ? AND "patronymic" IS ?',
+            ("10701123", "Куцко", "Владислав", "Витальевич")
+        )
+        assert "idx_students_group_fio" in plan
+
+
+class TestInsertDates:
+    """Тесты массового добавления дат"""
+
+    @pytest.fixture(autouse=True)
+    def setup_db(self, db_path):
+        self.db_path = db_path
+        self.db = DatabaseWork(self.db_path)
+        self.db.create()
+        self.db.insert_student("Группа А", "Иванов", "Иван", "Иванович")
+        self.db.insert_student("Группа А", "Петров", "Пётр", "Петрович")
+        self.db.insert_lesson("Математика")
+        self.db.insert_lesson("Физика")
+        yield
+        self.db.close()
+
+    def _journal_count(self):
+        return self.db._db.execute('SELECT COUNT(*) FROM "Journal"').fetchone()[0]
+
+    def test_insert_date_fans_out_journal(self):
+        """Новая дата создаёт ячейку для каждой пары студент x предмет"""
+        assert self.db.insert_date("2024", "9", "1") is True
+        assert self._journal_count() == 4
+        assert self.db.having("Journal", {"date": "2024-09-01", "surname": "Петров", "lesson": "Физика"})
+
+    def test_insert_dates_semester(self):
+        """Семестр добавляется целиком, существующие даты пропускаются"""
+        self.db.insert_date("2024", "09", "10")
+        added = self.db.insert_dates(self.db.date_range("2024-09-01", "2024-12-31"))
+        assert added == 121
+        assert self._journal_count() == 122 * 4
+        assert self.db.insert_dates(["2024-09-01", "2024-09-02"]) == 0
+
+    def test_date_range(self):
+        """Диапазон дат включает обе границы"""
+        assert self.db.date_range("2024-02-27", "2024-03-01") == [
+            "2024-02-27", "2024-02-28", "2024-02-29", "2024-03-01"
+        ]
+
+
+class TestStudentJournalEntries:
+    """Тесты создания записей журнала для новых студентов"""
+
+    @pytest.fixture(autouse=True)
+    def setup_db(self, db_path):
+        self.db_path = db_path
+        self.db = DatabaseWork(self.db_path)
+        self.db.create()
+        self.db.insert_lesson("Математика")
+        self.db.insert_lesson("Физика")
+        self.db.insert_dates(self.db.date_range("2024-09-01", "2024-09-10"))
+        yield
+        self.db.close()
+
+    def _journal_count(self):
+        return self.db._db.execute('SELECT COUNT(*) FROM "Journal"').fetchone()[0]
+
+    def test_entries_created_for_new_student(self):
+        """Новый студент получает ячейку на каждую дату и предмет"""
+        self.db.insert_student("Группа А", "Иванов", "Иван", "Иванович")
+        assert self._journal_count() == 10 * 2
+
+    def test_only_missing_entries_created(self):
+        """Повторный вызов не создаёт дубликатов и сообщает число созданных записей"""
+        self.db.insert_student("Группа А", "Иванов", "Иван", "Иванович", create_journal_entries=False)
+        self.db._insert("Journal", ["2024-09-01", "Группа А", "Иванов", "Иван", "Иванович", "Физика", 2])
+        created = self.db._create_journal_entries_for_student("Группа А", "Иванов", "Иван", "Иванович")
+        assert created == 10 * 2 - 1
+        assert self.db._create_journal_entries_for_student("Группа А", "Иванов", "Иван", "Иванович") == 0
+        assert self.db.having("Journal", {"date": "2024-09-01", "lesson": "Физика", "missed_hours": 2})
+
+    def test_insert_students_roster(self):
+        """Список студентов добавляется целиком, существующие не дублируются"""
+        self.db.insert_student("Группа А", "Иванов", "Иван", "Иванович")
+        roster = [
+            ("Группа А", "Иванов", "Иван", "Иванович"),
+            ("Группа А", "Петров", "Пётр", "Петрович"),
+            ("Группа Б", "Сидоров", "Сидор", "Сидорович"),
+            ("Группа Б", "Сидоров", "Сидор", "Сидорович"),
+        ]
+        assert self.db.insert_students(roster) == 2
+        assert len(self.db.having_individual_return("Students", ["surname"])) == 3
+        assert self._journal_count() == 3 * 10 * 2
+
+    def test_insert_students_without_journal(self):
+        """Студенты добавляются без записей журнала, если это не требуется"""
+        self.db.insert_students([("Группа А", "Петров", "Пётр", "Петрович")], create_journal_entries=False)
+        assert self._journal_count() == 0
+
+
+class TestSparseJournal:
+    """Тесты разреженного хранения журнала"""
+
+    @pytest.fixture(autouse=True)
+    def setup_db(self, db_path):
+        self.db_path = db_path
+        self.db = DatabaseWork(self.db_path, sparse=True)
+        self.db.create()
+        self.db.insert_lesson("Математика")
+        self.db.insert_student("Группа А", "Иванов", "Иван", "Иванович")
+        self.db.insert_student("Группа А", "Петров", "Пётр", "Петрович")
+        self.db.insert_dates(self.db.date_range("2024-09-01", "2024-09-30"))
+        yield
+        self.db.close()
+
+    def _journal_count(self):
+        return self.db._db.execute('SELECT COUNT(*) FROM "Journal"').fetchone()[0]
+
+    def _sheet(self):
+        return self.db.select_where(
+            "Journal",
+            ["date", "surname", "missed_hours"],
+            {"date": "2024-09", "group": "Группа А", "lesson": "Математика"},
+            ["surname", "date"]
+        )
+
+    def test_no_rows_materialized(self):
+        """Даты и студенты не создают записей журнала"""
+        assert self._journal_count() == 0
+
+    def test_missing_cells_read_as_default(self):
+        """Отсутствующие ячейки читаются как "-" """
+        sheet = self._sheet()
+        assert len(sheet) == 2 * 30
+        assert all(row[2] == "-" for row in sheet)
+
+    def test_only_marks_are_stored(self):
+        """Хранятся только проставленные отметки, "-" удаляет запись"""
+        self.db.set_missed_hours("2024-09-02", "Группа А", "Петров", "Пётр", "Петрович", "Математика", 2)
+        assert self._journal_count() == 1
+        assert ("2024-09-02", "Петров", 2) in self._sheet()
+
+        self.db.set_missed_hours("2024-09-02", "Группа А", "Петров", "Пётр", "Петрович", "Математика", 1)
+        assert self._journal_count() == 1
+
+        self.db.set_missed_hours("2024-09-02", "Группа А", "Петров", "Пётр", "Петрович", "Математика", "-")
+        assert self._journal_count() == 0
+
+    def test_grid_survives_dense_reopen(self):
+        """Разреженная база, открытая в плотном режиме, получает все ячейки месяца"""
+        self.db.set_missed_hours("2024-09-02", "Группа А", "Петров", "Пётр", "Петрович", "Математика", 2)
+        self.db.close()
+
+        self.db = DatabaseWork(self.db_path)
+        self.db.create()
+        sheet = self._sheet()
+        assert len(sheet) == 2 * 30
+        assert self._journal_count() == 2 * 30
+        assert ("2024-09-02", "Петров", 2) in sheet
+        assert sum(row[2] == "-" for row in sheet) == 2 * 30 - 1
+
+        # Повторное открытие в плотном режиме ячеек не добавляет
+        self.db.close()
+        self.db = DatabaseWork(self.db_path)
+        self.db.create()
+        assert self._journal_count() == 2 * 30
+
+    def test_dense_database_compacted(self):
+        """Плотная база при открытии в разреженном режиме сжимается"""
+        self.db.close()
+        dense = DatabaseWork(self.db_path)
+        dense.create()
+        dense.insert_date("2024", "10", "01")
+        dense.set_missed_hours("2024-10-01", "Группа А", "Иванов", "Иван", "Иванович", "Математика", 1)
+        dense.close()
+
+        self.db = DatabaseWork(self.db_path, sparse=True)
+        self.db.create()
+        assert self._journal_count() == 1
+        assert self.db.having("Journal", {"date": "2024-10-01", "surname": "Иванов", "missed_hours": 1})
+
+
+class TestQueryLayer:
+    """Тесты параметризованных запросов having/select_where"""
+
+    @pytest.fixture(autouse=True)
+    def setup_db(self, db_path):
+        self.db_path = db_path
+        self.db = DatabaseWork(self.db_path)
+        self.db.create()
+        for group in ("Группа А", "Группа Б", "Группа В"):
+            self.db.insert_group(group)
+        self.db.insert_dates(self.db.date_range("2024-01-30", "2024-02-02"))
+        yield
+        self.db.close()
+
+    def test_values_are_not_inlined(self):
+        """Кавычки в значениях не ломают запрос"""
+        assert self.db.insert_group('Группа "Д"') is True
+        assert self.db.having("Groups", {"group": 'Группа "Д"'})
+        assert self.db.select_where("Groups", ["group"], {"group": 'Группа "Д"'}) == [('Группа "Д"',)]
+
+    def test_in_list(self):
+        """Список значений превращается в IN (...)"""
+        rows = self.db.select_where("Groups", ["group"], {"group": ["Группа А", "Группа В"]}, ["group"])
+        assert rows == [("Группа А",), ("Группа В",)]
+        assert not self.db.having("Groups", {"group": []})
+
+    def test_range(self):
+        """Between задаёт диапазон значений"""
+        from src.models.database import Between
+        rows = self.db.select_where("Dates", ["date"], {"date": Between("2024-01-31", "2024-02-01")}, ["date"])
+        assert rows == [("2024-01-31",), ("2024-02-01",)]
+
+    def test_prefix_match_on_first_condition(self):
+        """Первое условие select_where ищет по началу строки"""
+        assert len(self.db.select_where("Dates", ["date"], {"date": "2024-02"})) == 2
+
+    def test_empty_condition(self):
+        """Без условий возвращаются все строки"""
+        assert len(self.db.select_where("Groups", ["group"], None)) == 3
+
+    def test_statement_text_cached_per_shape(self):
+        """Запросы одной формы используют один и тот же текст"""
+        DatabaseWork._compile.cache_clear()
+        self.db.having("Groups", {"group": "Группа А"})
+        self.db.having("Groups", {"group": "Группа Б"})
+        self.db.having("Groups", {"group": "Группа В"})
+        info = DatabaseWork._compile.cache_info()
+        assert info.misses == 1
+        assert info.hits == 2
+
+
+class TestHavingMany:
+    """Тесты пакетной проверки существования having_many"""
+
+    @pytest.fixture(autouse=True)
+    def setup_db(self, db_path):
+        self.db_path = db_path
+        self.db = DatabaseWork(self.db_path)
+        self.db.create()
+        self.db.insert_group("Группа А")
+        self.db.insert_student("Группа А", "Иванов", "Иван", "Иванович")
+        yield
+        self.db.close()
+
+    def test_returns_existing_subset(self):
+        """Возвращаются только уже существующие строки"""
+        rows = [("Группа А", "Иванов", "Иван", "Иванович"),
+                ("Группа А", "Петров", "Пётр", "Петрович")]
+        existing = self.db.having_many("Students", ["group", "surname", "name", "patronymic"], rows)
+        assert existing == {("Группа А", "Иванов", "Иван", "Иванович")}
+
+    def test_exact_match(self):
+        """Проверка идёт по точному совпадению, а не по префиксу"""
+        assert self.db.having_many("Groups", ["group"], [("Группа",), ("Группа А",)]) == {("Группа А",)}
+
+    def test_empty_batch(self):
+        """Пустой пакет не выполняет запросов"""
+        assert self.db.having_many("Groups", ["group"], []) == set()
+
+    def test_large_batch_split_into_queries(self):
+        """Пакет больше предела параметров SQLite проверяется по частям"""
+        rows = [(f"Группа {i}",) for i in range(5000)] + [("Группа А",)]
+        assert self.db.having_many("Groups", ["group"], rows) == {("Группа А",)}
+
+    def test_read_only(self):
+        """Запрос не пишет в базу и не ждёт пишущее соединение"""
+        with self.db.transaction():
+            self.db.insert_group("Группа Б")
+            done = []
+            thread = threading.Thread(target=lambda: done.append(
+                self.db.having_many("Groups", ["group"], [("Группа А",), ("Группа Б",)])))
+            thread.start()
+            thread.join(timeout=5)
+            # Незафиксированная группа другому потоку не видна
+            assert done == [{("Группа А",)}]
+        assert not self.db._db.in_transaction
+
+
+class TestJournalBulk:
+    """Тесты пакетных insert_journal/upsert_journal/delete_journal"""
+
+    @pytest.fixture(autouse=True)
+    def setup_db(self, db_path):
+        self.db_path = db_path
+        self.db = DatabaseWork(self.db_path, sparse=True)
+        self.db.create()
+        self.db.insert_group("Группа А")
+        self.db.insert_student("Группа А", "Иванов", "Иван", "Иванович")
+        self.db.insert_student("Группа А", "Петров", "Пётр", "Петрович")
+        self.db.insert_lesson("Математика")
+        self.db.insert_dates(self.db.date_range("2024-09-01", "2024-09-03"))
+        self.student = ("Группа А", "Иванов", "Иван", "Иванович")
+        yield
+        self.db.close()
+
+    def _stored(self):
+        cursor = self.db._db.cursor()
+        cursor.execute('SELECT "date", "surname", "missed_hours" FROM "JournalView" ORDER BY "date", "surname"')
+        rows = cursor.fetchall()
+        cursor.close()
+        return rows
+
+    def test_insert_journal_counts_and_ignores_existing(self):
+        """insert_journal не перезаписывает существующие ячейки"""
+        records = [("2024-09-01", *self.student, "Математика", 1),
+                   ("2024-09-02", *self.student, "Математика", 2)]
+        assert self.db.insert_journal(records) == 2
+        assert self.db.insert_journal([("2024-09-01", *self.student, "Математика", 0)]) == 0
+        assert self._stored() == [("2024-09-01", "Иванов", 1), ("2024-09-02", "Иванов", 2)]
+
+    def test_unknown_keys_are_skipped(self):
+        """Записи с неизвестной датой или студентом не добавляются"""
+        assert self.db.insert_journal([("2030-01-01", *self.student, "Математика", 1),
+                                       ("2024-09-01", "Группа А", "Нет", "Нет", "Нет", "Математика", 1)]) == 0
+
+    def test_upsert_journal(self):
+        """upsert_journal обновляет, создаёт и в разреженном режиме удаляет ячейки"""
+        self.db.insert_journal([("2024-09-01", *self.student, "Математика", 1),
+                                ("2024-09-02", *self.student, "Математика", 1)])
+        changed = self.db.upsert_journal([("2024-09-01", *self.student, "Математика", 2),
+                                          ("2024-09-02", *self.student, "Математика", "-"),
+                                          ("2024-09-03", "Группа А", "Петров", "Пётр", "Петрович", "Математика", 0)])
+        assert changed == 3
+        assert self._stored() == [("2024-09-01", "Иванов", 2), ("2024-09-03", "Петров", 0)]
+
+    def test_upsert_journal_cells_by_ids(self):
+        """Ячейки по идентификаторам: одна изменённая ячейка - одна запись"""
+        id_date = self.db.select_where("Dates", ["id_date"], {"date": "2024-09-01"})[0][0]
+        id_person = self.db.select_where("Students", ["id_person"], {"surname": "Иванов"})[0][0]
+        id_lesson = self.db.select_where("Lessons", ["id_lesson"], {"lesson": "Математика"})[0][0]
+
+        assert self.db.upsert_journal_cells([(id_date, id_person, id_lesson, 2)]) == 1
+        assert self._stored() == [("2024-09-01", "Иванов", 2)]
+        assert self.db.upsert_journal_cells([(id_date, id_person, id_lesson, 1)]) == 1
+        assert self._stored() == [("2024-09-01", "Иванов", 1)]
+        # В разреженном режиме значение по умолчанию удаляет ячейку
+        assert self.db.upsert_journal_cells([(id_date, id_person, id_lesson, "-")]) == 1
+        assert self._stored() == []
+
+    def test_delete_journal(self):
+        """delete_journal удаляет записи по ключам и возвращает их число"""
+        self.db.insert_journal([(date, *self.student, "Математика", 1)
+                                for date in self.db.date_range("2024-09-01", "2024-09-03")])
+        deleted = self.db.delete_journal([("2024-09-01", *self.student, "Математика"),
+                                          ("2024-09-02", *self.student, "Математика"),
+                                          ("2030-01-01", *self.student, "Математика")])
+        assert deleted == 2
+        assert self._stored() == [("2024-09-03", "Иванов", 1)]
+
+    def test_failed_batch_is_rolled_back(self):
+        """Ошибка в пакете откатывает весь пакет"""
+        records = [("2024-09-01", *self.student, "Математика", 1), ("2024-09-02",)]
+        with pytest.raises(sqlite3.Error):
+            self.db.insert_journal(records)
+        assert self._stored() == []
+        assert not self.db._db.in_transaction
+
+
+class TestTransaction:
+    """Тесты единицы работы db.transaction()"""
+
+    @pytest.fixture(autouse=True)
+    def setup_db(self, db_path):
+        self.db_path = db_path
+        self.db = DatabaseWork(self.db_path)
+        self.db.create()
+        yield
+        self.db.close()
+
+    def _committed_groups(self):
+        """Группы, видимые из другого соединения (т.е. зафиксированные)"""
+        other = sqlite3.connect(self.db_path)
+        rows = [row[0] for row in other.execute('SELECT "group" FROM "Groups" ORDER BY "group"')]
+        other.close()
+        return rows
+
+    def test_intermediate_commits_suppressed(self):
+        """Изменения внутри блока фиксируются только на выходе"""
+        with self.db.transaction():
+            self.db.insert_group("Группа А")
+            self.db.insert_group("Группа Б")
+            assert self.db._db.in_transaction
+            assert self._committed_groups() == []
+        assert not self.db._db.in_transaction
+        assert self._committed_groups() == ["Группа А", "Группа Б"]
+
+    def test_rollback_on_error(self):
+        """Исключение откатывает весь блок"""
+        with pytest.raises(ValueError):
+            with self.db.transaction():
+                self.db.insert_group("Группа А")
+                self.db.delete_lesson("Нет такого")
+        assert not self.db.having("Groups", {"group": "Группа А"})
+        assert self._committed_groups() == []
+
+    def test_nested_blocks_join_outer(self):
+        """Вложенный блок не фиксирует изменения раньше внешнего"""
+        with self.db.transaction():
+            with self.db.transaction():
+                self.db.insert_group("Группа А")
+            assert self._committed_groups() == []
+            self.db.insert_lesson("Математика")
+        assert self._committed_groups() == ["Группа А"]
+        assert self.db.having("Lessons", {"lesson": "Математика"})
+
+    def test_close_waits_for_open_transaction(self):
+        """close() не закрывает соединение посреди транзакции другого потока"""
+        entered = threading.Event()
+        release = threading.Event()
+
+        def import_groups():
+            with self.db.transaction():
+                self.db.insert_group("Группа А")
+                entered.set()
+                release.wait(5)
+
+        worker = threading.Thread(target=import_groups)
+        worker.start()
+        assert entered.wait(5)
+        closer = threading.Thread(target=self.db.close)
+        closer.start()
+        closer.join(0.2)
+        assert closer.is_alive()
+
+        release.set()
+        worker.join(5)
+        closer.join(5)
+        assert not closer.is_alive()
+        assert self._committed_groups() == ["Группа А"]
+
+
+class TestProfiles:
+    """Тесты профилей PRAGMA"""
+
+    @pytest.fixture(autouse=True)
+    def setup_db(self, db_path):
+        self.db_path = db_path
+
+    def _pragma(self, db, name):
+        return db._db.execute(f"PRAGMA {name};").fetchone()[0]
+
+    @pytest.mark.parametrize("profile, journal_mode, synchronous", [
+        ("safe", "delete", 2),
+        ("balanced", "wal", 1),
+        ("fast", "wal", 0),
+    ])
+    def test_profile_applied(self, profile, journal_mode, synchronous):
+        """PRAGMA профиля применяются при подключении"""
+        db = DatabaseWork(self.db_path, profile=profile)
+        try:
+            assert self._pragma(db, "journal_mode") == journal_mode
+            assert self._pragma(db, "synchronous") == synchronous
+            assert self._pragma(db, "busy_timeout") > 0
+            assert self._pragma(db, "foreign_keys") == 1
+        finally:
+            db.close()
+
+    def test_unknown_profile(self):
+        with pytest.raises(ValueError):
+            DatabaseWork(self.db_path, profile="turbo")
+
+    def test_reader_does_not_block_writer(self):
+        """В WAL открытая читающая транзакция не мешает сохранению"""
+        db = DatabaseWork(self.db_path)
+        db.create()
+        reader = sqlite3.connect(self.db_path)
+        try:
+            reader.execute("BEGIN;")
+            reader.execute('SELECT COUNT(*) FROM "Groups";').fetchone()
+            assert db.insert_group("Группа А") is True
+            assert reader.execute('SELECT COUNT(*) FROM "Groups";').fetchone()[0] == 0
+        finally:
+            reader.close()
+            db.close()
+
+
+class TestStagedMerge:
+    """Тесты пакетного добавления через временные таблицы"""
+
+    @pytest.fixture(autouse=True)
+    def setup_db(self, db_path):
+        self.db_path = db_path
+        self.db = DatabaseWork(self.db_path)
+        self.db.create()
+        self.db.insert_group("Группа А")
+        self.db.insert_lesson("Математика")
+        yield
+        self.db.close()
+
+    def test_insert_groups_counts_only_new(self):
+        added = self.db.insert_groups(["Группа В", "Группа А", "Группа Б", "Группа В"])
+
+        assert added == 2
+        # Порядок первого появления в пакете сохраняется
+        assert self.db._db.execute('SELECT "group" FROM "Groups" ORDER BY "id_group";').fetchall() == [
+            ("Группа А",), ("Группа В",), ("Группа Б",)]
+
+    def test_insert_lessons(self):
+        assert self.db.insert_lessons(["Математика", "Физика", "Физика"]) == 1
+        assert self.db.insert_lessons(["Физика"]) == 0
+        assert len(self.db.having_individual_return("Lessons", ["lesson"])) == 2
+
+    def test_insert_students_counts_only_new(self):
+        self.db.insert_student("Группа А", "Иванов", "Иван", "Иванович")
+
+        added = self.db.insert_students([("Группа А", "Иванов", "Иван", "Иванович"),
+                                         ("Группа А", "Петров", "Пётр", "Петрович"),
+                                         ("Группа А", "Петров", "Пётр", "Петрович")])
+
+        assert added == 1
+        assert len(self.db.having_individual_return("Students", ["surname"])) == 2
+
+    def test_insert_dates_counts_only_new(self):
+        assert self.db.insert_dates(["2024-01-02", "2024-01-01"]) == 2
+        assert self.db.insert_dates(["2024-01-02", "2024-01-03"]) == 1
+        assert self.db.insert_dates(["2024-01-03"]) == 0
+        assert not self.db._db.in_transaction
+
+    def test_rolled_back_with_transaction(self):
+        with pytest.raises(RuntimeError):
+            with self.db.transaction():
+                self.db.insert_groups(["Группа Б"])
+                self.db.insert_lessons(["Физика"])
+                raise RuntimeError
+
+        assert self.db.having_individual_return("Groups", ["group"]) == [("Группа А",)]
+        assert self.db.having_individual_return("Lessons", ["lesson"]) == [("Математика",)]
+
+    def test_iter_rows_streams_in_batches(self):
+        self.db.insert_groups([f"Группа {i:03d}" for i in range(25)])
+
+        rows = self.db.iter_rows("Groups", ["group"], ["group"], batch_size=10)
+
+        assert next(rows) == ("Группа 000",)
+        assert len(list(rows)) == 25
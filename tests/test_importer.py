@@ -0,0 +1,366 @@
+import os
+from unittest.mock import Mock
+
+import pytest
+
+from src.models.database import DatabaseWork
+from src.models.importer import DataImporter, ImportProgress
+from src.utils.ndjson_serializer import NDJSONSerializer
+from src.utils.xml_serializer import XMLSerializer
+
+
+class TestBatchImport:
+    """Тесты пакетного импорта DataImporter"""
+
+    @pytest.fixture(autouse=True)
+    def setup_db(self, db_path):
+        self.db_path = db_path
+        self.db = DatabaseWork(self.db_path)
+        self.db.create()
+        self.db.insert_group("Группа А")
+        self.db.insert_lesson("Математика")
+        self.importer = DataImporter(self.db, Mock(), Mock())
+        yield
+        self.db.close()
+
+    @staticmethod
+    def _counts():
+        return {'groups': 0, 'students': 0, 'lessons': 0, 'dates': 0}
+
+    def test_dict_data_skips_existing_and_duplicates(self):
+        """Существующие и повторяющиеся в пакете записи не добавляются"""
+        counts = self._counts()
+        self.importer._process_dict_data({
+            'groups': ["Группа А", "Группа Б", ("Группа Б",)],
+            'students': [("Группа Б", "Иванов", "Иван", "Иванович"),
+                         {'group': "Группа Б", 'surname': "Иванов", 'name': "Иван", 'patronymic': "Иванович"}],
+            'lessons': ["Математика", "Физика"],
+            'dates': ["2024-1-5", "2024-01-05"],
+        }, counts)
+
+        assert counts == {'groups': 1, 'students': 1, 'lessons': 1, 'dates': 1}
+        assert len(self.db.select_where("Groups", ["group"], None)) == 2
+        assert len(self.db.select_where("Lessons", ["lesson"], None)) == 2
+
+    def test_list_data(self):
+        """Списковый формат: строки - группы, кортежи - студенты"""
+        counts = self._counts()
+        data = ["Группа А", "Группа В", ("Группа В", "Петров", "Пётр", "Петрович")]
+        self.importer._process_list_data(data, counts)
+        assert counts['groups'] == 1
+        assert counts['students'] == 1
+
+        # Повторный импорт ничего не добавляет
+        counts = self._counts()
+        self.importer._process_list_data(data, counts)
+        assert counts == self._counts()
+
+    def test_one_staged_merge_per_batch(self):
+        """Пакет переносится в таблицу одним запросом, без проверок по строкам"""
+        self.db._merge_staged = Mock(wraps=self.db._merge_staged)
+        self.db.having = Mock(wraps=self.db.having)
+        counts = self._counts()
+        self.importer._process_list_data([f"Группа {i}" for i in range(50)], counts)
+        assert counts['groups'] == 50
+        assert self.db._merge_staged.call_count == 1
+        assert self.db.having.call_count == 0
+
+
+class TestXMLStreamImport:
+    """Тесты потокового импорта XML"""
+
+    @pytest.fixture(autouse=True)
+    def setup_db(self, db_path):
+        self.db_path = db_path
+        self.xml_path = self.db_path + '.xml'
+
+        self.db = DatabaseWork(self.db_path)
+        self.db.create()
+        self.importer = DataImporter(self.db, Mock(), XMLSerializer())
+        self.importer.XML_BATCH_SIZE = 2
+        yield
+        self.db.close()
+
+    def test_iter_xml_matches_load_from_xml(self):
+        XMLSerializer.save_students_to_xml([("Группа А", "Иванов", "Иван", "Иванович")], self.xml_path)
+
+        assert list(XMLSerializer.iter_xml(self.xml_path)) == XMLSerializer.load_from_xml(self.xml_path)['data']
+
+    def test_groups_imported_in_batches(self):
+        XMLSerializer.save_groups_to_xml(["Группа А", "Группа Б", "Группа В", "Группа А"], self.xml_path)
+
+        success, message = self.importer.auto_detect_and_import(self.xml_path)
+
+        assert success, message
+        assert sorted(self.db.having_individual_return("Groups", ["group"])) == [
+            ("Группа А",), ("Группа Б",), ("Группа В",)]
+        assert "Групп: 3" in message
+
+    def test_students_imported(self):
+        students = [("Группа А", f"Фамилия{i}", "Имя", "Отчество") for i in range(5)]
+        XMLSerializer.save_students_to_xml(students, self.xml_path)
+
+        success, message = self.importer.auto_detect_and_import(self.xml_path)
+
+        assert success, message
+        assert "Студентов: 5" in message
+        assert len(self.db.having_individual_return("Students", ["surname"])) == 5
+
+    def test_broken_file_rolls_back(self):
+        XMLSerializer.save_groups_to_xml(["Группа А", "Группа Б", "Группа В"], self.xml_path)
+        with open(self.xml_path, 'a', encoding='utf-8') as f:
+            f.write("<Group><Name>Обрыв")
+
+        success, message = self.importer.auto_detect_and_import(self.xml_path)
+
+        assert not success
+        assert self.db.having_individual_return("Groups", ["group"]) == []
+
+
+class TestJournalImport:
+    """Тесты импорта записей журнала"""
+
+    RECORDS = [
+        ("2024-01-01", "Группа А", "Иванов", "Иван", "Иванович", "Математика", 1),
+        ("2024-01-02", "Группа А", "Иванов", "Иван", "Иванович", "Математика", "-"),
+        ("2024-01-01", "Группа Б", "Петров", "Пётр", "Петрович", "Физика", 2),
+    ]
+
+    @pytest.fixture(autouse=True)
+    def setup_db(self, db_path):
+        self.db_path = db_path
+        self.xml_path = self.db_path + '.xml'
+
+        self.db = DatabaseWork(self.db_path, sparse=True)
+        self.db.create()
+        self.importer = DataImporter(self.db, Mock(), XMLSerializer())
+        yield
+        self.db.close()
+
+    @staticmethod
+    def _counts():
+        return {'groups': 0, 'students': 0, 'lessons': 0, 'dates': 0, 'journal': 0}
+
+    def _marks(self):
+        return sorted(self.db.having_individual_return(
+            "JournalView", ["date", "surname", "lesson", "missed_hours"]))
+
+    def test_backup_dict_restores_journal(self):
+        """Бэкап (pickle/msgpack/JSON-объект): справочники кортежами и журнал"""
+        counts = self._counts()
+        self.importer._process_dict_data({
+            'groups': [("Группа А",), ("Группа Б",)],
+            'students': [("Группа А", "Иванов", "Иван", "Иванович")],
+            'lessons': [("Математика",)],
+            'dates': [("2024-01-01",)],
+            'journal': [list(record) for record in self.RECORDS],
+        }, counts)
+
+        assert counts['dates'] == 2
+        assert counts['students'] == 2
+        assert counts['lessons'] == 2
+        assert self._marks() == [("2024-01-01", "Иванов", "Математика", 1),
+                                 ("2024-01-01", "Петров", "Физика", 2)]
+
+    def test_single_executemany(self):
+        self.importer._process_dict_data({'journal': self.RECORDS}, self._counts())
+        self.db.upsert_journal = Mock(return_value=3)
+
+        counts = self._counts()
+        self.importer._process_dict_data({'journal': self.RECORDS * 100}, counts)
+
+        self.db.upsert_journal.assert_called_once()
+        assert len(self.db.upsert_journal.call_args.args[0]) == 300
+        assert counts['groups'] == counts['students'] == counts['dates'] == 0
+
+    def test_list_data_records(self):
+        counts = self._counts()
+        self.importer._process_list_data(self.RECORDS, counts)
+
+        assert counts['groups'] == 2
+        assert len(self._marks()) == 2
+
+    def test_xml_records_round_trip(self):
+        XMLSerializer.save_journal_to_xml(self.RECORDS, self.xml_path)
+
+        success, message = self.importer.auto_detect_and_import(self.xml_path)
+
+        assert success, message
+        assert "Записей журнала" in message
+        assert self._marks() == [("2024-01-01", "Иванов", "Математика", 1),
+                                 ("2024-01-01", "Петров", "Физика", 2)]
+
+    def test_reimport_overwrites_marks(self):
+        self.importer._process_dict_data({'journal': self.RECORDS}, self._counts())
+        changed = [("2024-01-01", "Группа А", "Иванов", "Иван", "Иванович", "Математика", "0")]
+
+        self.importer._process_dict_data({'journal': changed}, self._counts())
+
+        assert ("2024-01-01", "Иванов", "Математика", 0) in self._marks()
+
+
+class TestImportProgress:
+    """Тесты хода импорта и его отмены"""
+
+    RECORDS = TestJournalImport.RECORDS
+
+    @pytest.fixture(autouse=True)
+    def setup_db(self, db_path):
+        self.db_path = db_path
+        self.xml_path = self.db_path + '.xml'
+        self.json_path = self.db_path + '.json'
+
+        self.db = DatabaseWork(self.db_path, sparse=True)
+        self.db.create()
+        self.serializer = Mock()
+        self.importer = DataImporter(self.db, self.serializer, XMLSerializer())
+        yield
+        self.db.close()
+
+    def test_progress_counts_rows_and_bytes(self):
+        XMLSerializer.save_journal_to_xml(self.RECORDS, self.xml_path)
+        size = os.path.getsize(self.xml_path)
+        progress = ImportProgress(size)
+
+        success, message = self.importer.import_file(self.xml_path, 'xml', progress)
+
+        assert success, message
+        assert progress.finished
+        assert progress.rows == len(self.RECORDS)
+        assert progress.bytes_read == size
+        assert progress.fraction == 1.0
+        assert progress.eta == 0
+
+    def test_progress_is_per_call(self):
+        XMLSerializer.save_journal_to_xml(self.RECORDS, self.xml_path)
+        other_path = self.xml_path + '.other'
+        XMLSerializer.save_journal_to_xml(self.RECORDS[:1], other_path)
+        other = ImportProgress(os.path.getsize(other_path))
+
+        def import_other_once(progress):
+            # Второй импорт тем же импортером посреди первого
+            if not other.finished:
+                self.importer.import_file(other_path, 'xml', other)
+
+        progress = ImportProgress(os.path.getsize(self.xml_path), callback=import_other_once)
+        try:
+            success, message = self.importer.import_file(self.xml_path, 'xml', progress)
+        finally:
+            os.remove(other_path)
+
+        assert success, message
+        assert other.finished
+        assert other.rows == 1
+        assert progress.rows == len(self.RECORDS)
+        assert progress.bytes_read == progress.total_bytes
+
+    def test_cancel_rolls_back(self):
+        self.importer.XML_BATCH_SIZE = 1
+        XMLSerializer.save_groups_to_xml(["Группа А", "Группа Б", "Группа В"], self.xml_path)
+
+        def cancel_after_first_row(progress):
+            if progress.rows:
+                progress.cancel()
+
+        progress = ImportProgress(os.path.getsize(self.xml_path), callback=cancel_after_first_row)
+        success, message = self.importer.import_file(self.xml_path, 'xml', progress)
+
+        assert not success
+        assert "отменён" in message
+        assert progress.finished
+        assert self.db.having_individual_return("Groups", ["group"]) == []
+
+    def test_file_loaded_once(self):
+        with open(self.json_path, 'w') as f:
+            f.write("{}")
+        self.serializer.load_from_json.return_value = {'journal': self.RECORDS}
+
+        format_type, size = self.importer.inspect_file(self.json_path)
+        progress = ImportProgress(size)
+        success, message = self.importer.import_file(self.json_path, format_type, progress)
+
+        assert success, message
+        self.serializer.load_from_json.assert_called_once()
+        assert progress.total_rows == progress.rows == len(self.RECORDS)
+
+    def test_large_file_needs_confirmation(self):
+        big = DataImporter.LARGE_FILE_SIZE + 1
+
+        assert self.importer.needs_confirmation('json', big)
+        assert not self.importer.needs_confirmation('xml', big)
+        assert not self.importer.needs_confirmation('json', 100)
+
+
+class TestNDJSONImport:
+    """Тесты построчного JSON (NDJSON)"""
+
+    RECORDS = TestJournalImport.RECORDS
+
+    @pytest.fixture(autouse=True)
+    def setup_db(self, db_path):
+        self.db_path = db_path
+        self.ndjson_path = self.db_path + '.ndjson'
+
+        self.db = DatabaseWork(self.db_path, sparse=True)
+        self.db.create()
+        self.importer = DataImporter(self.db, Mock(), XMLSerializer(), ndjson_serializer=NDJSONSerializer())
+        yield
+        self.db.close()
+
+    def _marks(self):
+        return sorted(self.db.having_individual_return(
+            "JournalView", ["date", "surname", "lesson", "missed_hours"]))
+
+    def test_lines_are_tagged_records(self):
+        NDJSONSerializer.save_to_ndjson([('group', ("Группа А",)), ('journal', self.RECORDS[0])], self.ndjson_path)
+
+        with open(self.ndjson_path, encoding='utf-8') as f:
+            lines = f.read().splitlines()
+
+        assert len(lines) == 2
+        assert list(NDJSONSerializer.iter_ndjson(self.ndjson_path)) == [
+            {'kind': 'group', 'group': "Группа А"},
+            dict(zip(('kind',) + DataImporter.JOURNAL_FIELDS, ('journal',) + self.RECORDS[0])),
+        ]
+
+    def test_round_trip_through_database(self):
+        self.importer._process_dict_data({'journal': self.RECORDS}, {
+            'groups': 0, 'students': 0, 'lessons': 0, 'dates': 0, 'journal': 0})
+        marks = self._marks()
+        records = [('student', row) for row in self.db.iter_rows("Students", ["group", "surname", "name", "patronymic"])]
+        records += [('journal', row) for row in self.db.iter_rows("JournalView", list(DataImporter.JOURNAL_FIELDS))]
+        NDJSONSerializer.save_to_ndjson(records, self.ndjson_path)
+        self.db.clear()
+
+        success, message = self.importer.auto_detect_and_import(self.ndjson_path)
+
+        assert success, message
+        assert self._marks() == marks
+        assert "Студентов: 2" in message
+
+    def test_appended_files_import_in_batches(self):
+        self.importer.NDJSON_BATCH_SIZE = 2
+        NDJSONSerializer.save_to_ndjson([('group', ("Группа А",)), ('lesson', ("Математика",))], self.ndjson_path)
+        NDJSONSerializer.save_to_ndjson([('journal', record) for record in self.RECORDS], self.ndjson_path,
+                                        append=True)
+        with open(self.ndjson_path, 'a', encoding='utf-8') as f:
+            f.write('\n{"kind": "unknown"}\n')
+        progress = ImportProgress(os.path.getsize(self.ndjson_path))
+
+        success, message = self.importer.import_file(self.ndjson_path, 'ndjson', progress)
+
+        assert success, message
+        assert len(self._marks()) == 2
+        assert progress.bytes_read == progress.total_bytes
+        assert progress.rows == 5
+
+    def test_broken_line_rolls_back(self):
+        NDJSONSerializer.save_to_ndjson([('group', ("Группа А",))], self.ndjson_path)
+        with open(self.ndjson_path, 'a', encoding='utf-8') as f:
+            f.write('{"kind": "group", "gro')
+
+        success, message = self.importer.auto_detect_and_import(self.ndjson_path)
+
+        assert not success
+        assert "line 2" in message
+        assert self.db.having_individual_return("Groups", ["group"]) == []
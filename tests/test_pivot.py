@@ -0,0 +1,283 @@
+import threading
+
+import pytest
+
+from src.models.database import DatabaseWork
+from src.models.pivot import JOURNAL_PIVOT_COLUMNS, JOURNAL_PIVOT_ORDER, PivotCache, PivotPrefetcher, pivot_journal
+
+
+def journal_row(date, student, value, id_date, id_person, id_lesson=1):
+    surname, name, patronymic = student.split()
+    return (date, "Группа А", surname, name, patronymic, "Математика", value, id_date, id_person, id_lesson)
+
+
+class TestPivotJournal:
+    """Тесты построения таблицы "ученики x дни" из строк журнала"""
+
+    def test_full_grid(self):
+        rows = [
+            journal_row("2024-01-01", "Иванов Иван Иванович", 0, 1, 10),
+            journal_row("2024-01-02", "Иванов Иван Иванович", 2, 2, 10),
+            journal_row("2024-01-01", "Петров Пётр Петрович", 1, 1, 20),
+            journal_row("2024-01-02", "Петров Пётр Петрович", "-", 2, 20),
+        ]
+        pivot = pivot_journal(rows)
+
+        assert (pivot.height, pivot.width) == (2, 2)
+        assert pivot.rows_headers == ["Иванов Иван Иванович", "Петров Пётр Петрович"]
+        assert pivot.rows_ids == [10, 20]
+        assert pivot.columns_headers == ["01", "02"]
+        assert pivot.columns_ids == [1, 2]
+        assert pivot.set_values() == [[0, 2], [1, "-"]]
+        assert pivot.id_lesson == 1
+
+    def test_missing_cells_are_filled(self):
+        # У первого ученика нет второго дня, у второго - первого
+        rows = [
+            journal_row("2024-01-01", "Иванов Иван Иванович", 1, 1, 10),
+            journal_row("2024-01-03", "Петров Пётр Петрович", 2, 3, 20),
+        ]
+        pivot = pivot_journal(rows)
+
+        assert pivot.columns_headers == ["01", "03"]
+        assert pivot.set_values() == [[1, "-"], ["-", 2]]
+        assert pivot.get(1, 1) == 2
+
+    def test_days_sorted_by_date(self):
+        rows = [
+            journal_row("2024-01-05", "Иванов Иван Иванович", 0, 5, 10),
+            journal_row("2024-01-02", "Петров Пётр Петрович", 0, 2, 20),
+        ]
+        pivot = pivot_journal(rows)
+
+        assert pivot.columns_ids == [2, 5]
+
+    def test_namesakes_are_separate_rows(self):
+        rows = [
+            journal_row("2024-01-01", "Иванов Иван Иванович", 0, 1, 10),
+            journal_row("2024-01-01", "Иванов Иван Иванович", 1, 1, 11),
+        ]
+        pivot = pivot_journal(rows)
+
+        assert pivot.rows_ids == [10, 11]
+        assert pivot.set_values() == [[0], [1]]
+
+    def test_empty(self):
+        pivot = pivot_journal([])
+
+        assert not pivot
+        assert pivot.set_values() == []
+        assert pivot.cells_values() == ()
+
+    def test_cells_values_shape(self):
+        pivot = pivot_journal([journal_row("2024-01-01", "Иванов Иван Иванович", 0, 1, 10)])
+
+        assert pivot.cells_values() == ((("-", 0, 1, 2),),)
+
+
+class TestPivotFromDatabase:
+    """Построение таблицы по выборке из базы"""
+
+    @pytest.fixture(autouse=True)
+    def setup_db(self, db_path):
+        self.db_path = db_path
+        self.db = DatabaseWork(self.db_path, sparse=True)
+        self.db.create()
+        self.db.insert_group("Группа А")
+        self.db.insert_student("Группа А", "Иванов", "Иван", "Иванович")
+        self.db.insert_student("Группа А", "Петров", "Пётр", "Петрович")
+        self.db.insert_lesson("Математика")
+        self.db.insert_dates(["2024-01-01", "2024-01-02", "2024-01-03"])
+        yield
+        self.db.close()
+
+    def test_pivot_of_selection(self):
+        self.db.upsert_journal([
+            ("2024-01-02", "Группа А", "Петров", "Пётр", "Петрович", "Математика", 2),
+        ])
+
+        rows = self.db.select_where(
+            "Journal", JOURNAL_PIVOT_COLUMNS,
+            {"date": "2024-01", "group": "Группа А", "lesson": "Математика"},
+            JOURNAL_PIVOT_ORDER
+        )
+        pivot = pivot_journal(rows)
+
+        assert pivot.rows_headers == ["Иванов Иван Иванович", "Петров Пётр Петрович"]
+        assert pivot.columns_headers == ["01", "02", "03"]
+        assert pivot.set_values() == [["-", "-", "-"], ["-", 2, "-"]]
+
+
+class TestPivotCache:
+    """Тесты кэша построенных таблиц"""
+
+    @pytest.fixture(autouse=True)
+    def setup_db(self, db_path):
+        self.db_path = db_path
+        self.db = DatabaseWork(self.db_path, sparse=True)
+        self.db.create()
+        for group in ["Группа А", "Группа Б"]:
+            self.db.insert_group(group)
+        self.db.insert_students([("Группа А", "Иванов", "Иван", "Иванович"),
+                                 ("Группа Б", "Петров", "Пётр", "Петрович")])
+        for lesson in ["Математика", "Физика"]:
+            self.db.insert_lesson(lesson)
+        self.db.insert_dates(["2024-01-01", "2024-01-02", "2024-02-01"])
+
+        self.cache = PivotCache(self.db)
+        self.key = PivotCache.key("2024", "01", "Группа А", "Математика")
+        yield
+        self.db.close()
+
+    def test_hit_after_miss(self):
+        first = self.cache.load(self.key)
+        second = self.cache.load(self.key)
+
+        assert second is first
+        assert (self.cache.hits, self.cache.misses) == (1, 1)
+
+    def test_empty_selection_not_cached(self):
+        self.cache.load(PivotCache.key("2023", "01", "Группа А", "Математика"))
+
+        assert len(self.cache) == 0
+
+    def test_lru_eviction(self):
+        self.cache.maxsize = 2
+        keys = [PivotCache.key("2024", "01", group, lesson)
+                for group, lesson in [("Группа А", "Математика"), ("Группа А", "Физика"), ("Группа Б", "Физика")]]
+        for key in keys:
+            self.cache.load(key)
+
+        assert len(self.cache) == 2
+        assert self.cache.get(keys[0]) is None
+        assert self.cache.get(keys[2]) is not None
+
+    def test_journal_write_invalidates_only_its_scope(self):
+        other = PivotCache.key("2024", "01", "Группа Б", "Математика")
+        self.cache.load(self.key)
+        self.cache.load(other)
+
+        self.db.upsert_journal([("2024-01-02", "Группа А", "Иванов", "Иван", "Иванович", "Математика", 1)])
+
+        assert self.cache.get(self.key) is None
+        assert self.cache.get(other) is not None
+        assert self.cache.load(self.key).set_values() == [["-", 1]]
+
+    def test_new_date_invalidates_month(self):
+        february = PivotCache.key("2024", "02", "Группа А", "Математика")
+        self.cache.load(self.key)
+        self.cache.load(february)
+
+        self.db.insert_dates(["2024-01-03"])
+
+        assert self.cache.get(self.key) is None
+        assert self.cache.get(february) is not None
+
+    def test_renames_invalidate(self):
+        self.cache.load(self.key)
+        self.db.update_lesson("Математика", "Алгебра")
+        assert self.cache.get(self.key) is None
+
+        self.cache.load(PivotCache.key("2024", "01", "Группа А", "Физика"))
+        self.db.insert_student("Группа А", "Сидоров", "Сидор", "Сидорович")
+        assert len(self.cache) == 0
+
+    def test_cell_write_updates_cached_table(self):
+        pivot = self.cache.load(self.key)
+        id_person, id_date = pivot.rows_ids[0], pivot.columns_ids[1]
+
+        self.db.upsert_journal_cells([(id_date, id_person, pivot.id_lesson, 2)])
+
+        cached = self.cache.get(self.key)
+        assert cached is pivot
+        assert cached.set_values() == [["-", 2]]
+
+    def test_rollback_does_not_notify(self):
+        self.cache.load(self.key)
+        try:
+            with self.db.transaction():
+                self.db.upsert_journal([("2024-01-01", "Группа А", "Иванов", "Иван", "Иванович", "Математика", 1)])
+                raise RuntimeError
+        except RuntimeError:
+            pass
+
+        assert self.cache.get(self.key) is not None
+
+    def test_transaction_notifies_on_commit(self):
+        self.cache.load(self.key)
+        with self.db.transaction():
+            self.db.upsert_journal([("2024-01-01", "Группа А", "Иванов", "Иван", "Иванович", "Математика", 1)])
+            assert self.cache.get(self.key) is not None
+
+        assert self.cache.get(self.key) is None
+
+    def test_stale_read_not_cached(self):
+        generation = self.cache.generation
+        pivot = pivot_journal(self.db.select_where(
+            "Journal", JOURNAL_PIVOT_COLUMNS,
+            {"date": "2024-01", "group": "Группа А", "lesson": "Математика"}, JOURNAL_PIVOT_ORDER
+        ))
+        self.db.upsert_journal([("2024-01-01", "Группа А", "Иванов", "Иван", "Иванович", "Математика", 1)])
+
+        assert not self.cache.put(self.key, pivot, generation)
+        assert len(self.cache) == 0
+
+
+class TestPivotPrefetcher:
+    """Тесты фоновой подгрузки таблиц"""
+
+    @pytest.fixture(autouse=True)
+    def setup_db(self, db_path):
+        self.db_path = db_path
+        self.db = DatabaseWork(self.db_path, sparse=True)
+        self.db.create()
+        self.db.insert_group("Группа А")
+        self.db.insert_student("Группа А", "Иванов", "Иван", "Иванович")
+        for lesson in ["Математика", "Физика", "Химия"]:
+            self.db.insert_lesson(lesson)
+        self.db.insert_dates(["2024-01-01", "2024-02-01"])
+
+        self.cache = PivotCache(self.db)
+        self.prefetcher = PivotPrefetcher(self.cache)
+        yield
+        self.prefetcher.close()
+        self.db.close()
+
+    def test_prefetched_tables_are_cached(self):
+        keys = [PivotCache.key("2024", "02", "Группа А", "Математика"),
+                PivotCache.key("2024", "01", "Группа А", "Физика")]
+        self.prefetcher.prefetch(keys)
+        assert self.prefetcher.wait(5)
+
+        assert all(key in self.cache for key in keys)
+        assert self.cache.misses == 0
+
+    def test_new_job_cancels_previous(self):
+        started = threading.Event()
+        release = threading.Event()
+        fetch = self.cache.fetch
+
+        def slow_fetch(key):
+            started.set()
+            release.wait(5)
+            return fetch(key)
+
+        self.cache.fetch = slow_fetch
+        first = [PivotCache.key("2024", "01", "Группа А", lesson) for lesson in ["Математика", "Физика"]]
+        second = [PivotCache.key("2024", "01", "Группа А", "Химия")]
+        self.prefetcher.prefetch(first)
+        started.wait(5)
+        # Выбор изменился, пока загружалась первая таблица
+        self.prefetcher.prefetch(second)
+        release.set()
+        assert self.prefetcher.wait(5)
+
+        assert first[0] in self.cache
+        assert first[1] not in self.cache
+        assert second[0] in self.cache
+
+    def test_cancel(self):
+        self.prefetcher.cancel()
+        self.prefetcher.close()
+
+        assert len(self.cache) == 0
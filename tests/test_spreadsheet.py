@@ -0,0 +1,194 @@
+import tkinter as tk
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+import pytest
+
+from src.views.components import spreadsheet as spreadsheet_module
+from src.views.components.spreadsheet import CustomSpreadsheet
+
+
+class FakeCanvas:
+    """Холст без дисплея: хранит опции элементов и положение прокрутки"""
+
+    def __init__(self, *args, width: int = 100, height: int = 60, **kwargs):
+        self.items = {}
+        self.left = 0
+        self.top = 0
+        self.width = width
+        self.height = height
+
+    def _create(self, **options):
+        item = len(self.items) + 1
+        self.items[item] = dict(options)
+        return item
+
+    def create_rectangle(self, *coords, **options):
+        return self._create(**options)
+
+    def create_text(self, *coords, **options):
+        return self._create(**options)
+
+    def itemconfigure(self, item, **options):
+        self.items[item].update(options)
+
+    def canvasx(self, x):
+        return self.left + x
+
+    def canvasy(self, y):
+        return self.top + y
+
+    def winfo_width(self):
+        return self.width
+
+    def winfo_height(self):
+        return self.height
+
+    def coords(self, *args): pass
+    def configure(self, **options): pass
+    def bind(self, *args): pass
+    def pack(self, **options): pass
+    def destroy(self): pass
+
+
+class FakeFont:
+    """Шрифт фиксированной ширины: ячейка 20x10, заголовки по 2 пикселя на символ"""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def measure(self, text):
+        return 12 if text == "000" else 2 * len(text)
+
+    def metrics(self, name):
+        return 4
+
+
+def values(rows, columns, value=0):
+    return [[value] * columns for _ in range(rows)]
+
+
+class TestCustomSpreadsheetLogic:
+    """Логика таблицы на холсте (геометрия и изменённые ячейки) без дисплея"""
+
+    @pytest.fixture(autouse=True)
+    def no_display(self):
+        with patch.object(tk.Frame, "__init__", lambda self, master=None, **kwargs: None), \
+                patch.object(spreadsheet_module.tk, "Canvas", FakeCanvas), \
+                patch.object(spreadsheet_module, "AutoHidingScrollbar", Mock()), \
+                patch.object(spreadsheet_module.tkfont, "Font", FakeFont), \
+                patch.object(spreadsheet_module.tkfont, "nametofont", lambda name: FakeFont()), \
+                patch.object(CustomSpreadsheet, "cget", lambda self, key: "white", create=True):
+            yield
+
+    def _sheet(self, rows=3, columns=4, **kwargs):
+        sheet = CustomSpreadsheet()
+        sheet.create(columns=columns, rows=rows,
+                     columns_headers=[f"{c + 1:02d}" for c in range(columns)],
+                     rows_headers=[f"R{r}" for r in range(rows)],
+                     set_values=values(rows, columns),
+                     cells_values=[[("-", 0, 1, 2)] * columns] * rows,
+                     cells_colors={"1": "yellow"},
+                     rows_ids=[10 * (r + 1) for r in range(rows)],
+                     columns_ids=[100 + c for c in range(columns)],
+                     **kwargs)
+        return sheet
+
+    def test_geometry(self):
+        sheet = self._sheet()
+
+        # Ячейка 20x10, заголовки строк 4+12 пикселей, столбцов 4+6
+        assert (sheet._cell_width, sheet._cell_height) == (20, 10)
+        assert (sheet._header_width, sheet._header_height) == (16, 10)
+
+    def test_visible_range_clipped_to_table(self):
+        sheet = self._sheet(rows=100, columns=100)
+
+        # Холст 100x60: столбцы 0..4, строки 0..5
+        assert sheet._visible_range() == (range(0, 6), range(0, 5))
+        assert set(sheet._visible_cells) == {(r, c) for r in range(6) for c in range(5)}
+
+        small = self._sheet(rows=2, columns=3)
+        assert small._visible_range() == (range(0, 2), range(0, 3))
+
+    def test_scroll_reuses_drawn_cells(self):
+        sheet = self._sheet(rows=100, columns=100)
+        items = len(sheet._canvas.items)
+
+        sheet._canvas.top = 500
+        sheet._render()
+
+        assert sheet._visible_range()[0] == range(49, 56)
+        assert min(r for r, _ in sheet._visible_cells) == 49
+        # Новые строки нарисованы элементами ушедших из вида
+        assert len(sheet._canvas.items) - items <= 5 * 2 + 1
+
+    def test_cell_at(self):
+        sheet = self._sheet()
+
+        assert sheet._cell_at(SimpleNamespace(x=16, y=10)) == (0, 0)
+        assert sheet._cell_at(SimpleNamespace(x=16 + 20 * 3 + 5, y=10 + 10 * 2 + 5)) == (2, 3)
+        # Заголовки и область за таблицей
+        assert sheet._cell_at(SimpleNamespace(x=5, y=15)) is None
+        assert sheet._cell_at(SimpleNamespace(x=20, y=5)) is None
+        assert sheet._cell_at(SimpleNamespace(x=16 + 20 * 4, y=15)) is None
+
+    def test_cell_at_follows_scroll(self):
+        sheet = self._sheet(rows=100, columns=100)
+        sheet._canvas.left, sheet._canvas.top = 200, 100
+
+        assert sheet._cell_at(SimpleNamespace(x=0, y=0)) == (9, 9)
+
+    def test_set_value_reports_change_by_ids(self):
+        sheet = self._sheet()
+        changes = []
+        sheet.on_change = lambda *change: changes.append(change)
+
+        sheet.set_value(1, 2, 1)
+
+        assert changes == [(20, 102, 1)]
+        rect, text = sheet._visible_cells[(1, 2)]
+        assert sheet._canvas.items[rect]["fill"] == "yellow"
+        assert sheet._canvas.items[text]["text"] == "1"
+
+    def test_set_value_same_value_not_reported(self):
+        sheet = self._sheet()
+        sheet.on_change = Mock()
+
+        sheet.set_value(0, 0, 2)
+        sheet.set_value(0, 0, "2")
+        sheet.set_value(0, 0, 0)
+
+        assert sheet.on_change.call_count == 2
+
+    def test_update_values_changes_only_differing_cells(self):
+        sheet = self._sheet()
+        sheet.set_value(0, 0, 2)
+        rect, text = sheet._visible_cells[(2, 3)]
+        new = values(3, 4)
+        new[2][3] = 1
+
+        assert sheet.update_values(new, rows_ids=[10, 20, 30], columns_ids=[100, 101, 102, 103])
+
+        assert sheet._visible_cells[(2, 3)] == (rect, text)
+        assert sheet._canvas.items[text]["text"] == "1"
+        assert sheet._canvas.items[rect]["fill"] == "yellow"
+
+    def test_update_values_shrinks_and_grows(self):
+        sheet = self._sheet()
+
+        assert sheet.update_values(values(2, 2, "-"), columns_headers=["01", "02"], rows_headers=["A", "B"])
+        assert set(sheet._visible_cells) == {(0, 0), (0, 1), (1, 0), (1, 1)}
+        assert len(sheet._free_cells) == 8
+
+        assert sheet.update_values(values(3, 4), columns_headers=["01", "02", "03", "04"],
+                                   rows_headers=["A", "B", "C"])
+        assert len(sheet._visible_cells) == 12
+        assert sheet._free_cells == []
+
+    def test_update_values_empty_clears(self):
+        sheet = self._sheet()
+
+        assert not sheet.update_values([])
+        assert sheet._canvas is None
+        assert sheet._visible_cells == {}
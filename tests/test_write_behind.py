@@ -0,0 +1,152 @@
+import threading
+from unittest.mock import Mock
+
+import pytest
+
+from src.models.database import DatabaseWork
+from src.models.write_behind import WriteBehindQueue
+
+
+class TestWriteBehindQueue:
+    """Тесты отложенной записи изменений ячеек"""
+
+    @pytest.fixture(autouse=True)
+    def setup_db(self, db_path):
+        self.db_path = db_path
+        self.db = DatabaseWork(self.db_path)
+        self.db.create()
+        self.db.insert_group("Группа А")
+        self.db.insert_lesson("Математика")
+        self.db.insert_dates(self.db.date_range("2024-09-01", "2024-09-30"))
+        self.db.insert_student("Группа А", "Иванов", "Иван", "Иванович")
+        # Ячейки адресуются идентификаторами
+        self.dates = dict(self.db.select_where("Dates", ["date", "id_date"], None))
+        self.person = self.db.select_where("Students", ["id_person"], {"surname": "Иванов"})[0][0]
+        self.lesson = self.db.select_where("Lessons", ["id_lesson"], {"lesson": "Математика"})[0][0]
+        yield
+        self.db.close()
+
+    def _cell(self, date, missed_hours):
+        return self.dates[date], self.person, self.lesson, missed_hours
+
+    def _hours(self, date):
+        rows = self.db.select_where("Journal", ["missed_hours"],
+                                    {"date": date, "surname": "Иванов", "lesson": "Математика"})
+        return rows[0][0]
+
+    def test_flush_writes_all_edits(self):
+        """После flush все изменения в базе, последнее значение ячейки побеждает"""
+        queue = WriteBehindQueue(self.db)
+        try:
+            for day in range(1, 31):
+                queue.put(self._cell(f"2024-09-{day:02d}", day % 3))
+            queue.put(self._cell("2024-09-01", 2))
+            queue.flush()
+            assert queue.pending == 0
+            assert self._hours("2024-09-01") == 2
+            assert self._hours("2024-09-30") == 0
+        finally:
+            queue.close()
+
+    def test_edits_are_batched(self):
+        """Накопившиеся изменения пишутся одной пачкой"""
+        gate = threading.Event()
+        db = Mock()
+        db.upsert_journal_cells.side_effect = lambda records: gate.wait(5)
+        queue = WriteBehindQueue(db)
+        queue.put(self._cell("2024-09-01", 1))
+        for day in range(2, 12):
+            queue.put(self._cell(f"2024-09-{day:02d}", 1))
+        assert queue.pending == 11
+        gate.set()
+        queue.close()
+        assert queue.pending == 0
+        # Первая запись и пачка из остальных десяти
+        assert db.upsert_journal_cells.call_count <= 2
+        assert sum(len(call.args[0]) for call in db.upsert_journal_cells.call_args_list) == 11
+
+    def test_close_flushes_pending(self):
+        """close() дописывает очередь перед остановкой"""
+        queue = WriteBehindQueue(self.db)
+        queue.put(self._cell("2024-09-05", 1))
+        queue.close()
+        assert self._hours("2024-09-05") == 1
+
+    def test_error_is_reported(self):
+        """Ошибка записи не останавливает поток и сохраняется в last_error"""
+        db = Mock()
+        db.upsert_journal_cells.side_effect = [RuntimeError("disk full"), 1]
+        queue = WriteBehindQueue(db)
+        try:
+            queue.put(self._cell("2024-09-01", 1))
+            queue._queue.join()
+            assert isinstance(queue.last_error, RuntimeError)
+            queue.put(self._cell("2024-09-02", 1))
+            queue.flush()
+            assert db.upsert_journal_cells.call_count == 2
+            assert queue.last_error is None
+        finally:
+            queue.close()
+
+    @staticmethod
+    def _locked_db():
+        """База, запись в которую падает, пока установлен locked"""
+        locked = threading.Event()
+        locked.set()
+
+        def upsert(records):
+            if locked.is_set():
+                raise RuntimeError("database is locked")
+            return len(records)
+
+        db = Mock()
+        db.upsert_journal_cells.side_effect = upsert
+        return db, locked
+
+    def test_failed_cells_kept_and_retried(self):
+        """Не записанные ячейки остаются в pending и пишутся повторно при flush()"""
+        db, locked = self._locked_db()
+        queue = WriteBehindQueue(db)
+        try:
+            queue.put(self._cell("2024-09-01", 1))
+            queue.put(self._cell("2024-09-01", 2))
+            queue._queue.join()
+            locked.clear()
+            assert queue.pending == 1
+            assert queue.failed == [self._cell("2024-09-01", 2)]
+
+            queue.flush()
+
+            assert queue.pending == 0
+            assert queue.failed == []
+            assert db.upsert_journal_cells.call_args.args[0] == [self._cell("2024-09-01", 2)]
+        finally:
+            queue.close()
+
+    def test_newer_edit_wins_over_failed(self):
+        """Новое значение ячейки заменяет не записанное ранее"""
+        db, locked = self._locked_db()
+        queue = WriteBehindQueue(db)
+        queue.put(self._cell("2024-09-01", 1))
+        queue._queue.join()
+        locked.clear()
+        queue.put(self._cell("2024-09-01", 0))
+        queue.put(self._cell("2024-09-02", 2))
+        queue.close()
+
+        assert sorted(db.upsert_journal_cells.call_args.args[0]) == sorted(
+            [self._cell("2024-09-01", 0), self._cell("2024-09-02", 2)])
+        assert queue.pending == 0
+
+    def test_close_reports_unwritten_cells(self):
+        """close() возвращает ячейки, которые так и не удалось записать"""
+        db = Mock()
+        db.upsert_journal_cells.side_effect = RuntimeError("disk full")
+        queue = WriteBehindQueue(db)
+        queue.put(self._cell("2024-09-01", 1))
+
+        unwritten = queue.close()
+
+        assert unwritten == [self._cell("2024-09-01", 1)]
+        assert queue.pending == 1
+        assert isinstance(queue.last_error, RuntimeError)